@@ -1,6 +1,8 @@
 from .gp_defaults import GPDefaults
 from .evolution_state import EvolutionState
 from .evaluator import Evaluator
+from .process_evaluator import ProcessEvaluator
+from .auto_evaluator import AutoEvaluator
 from .fitness import Fitness
 from .gp_data import GPData
 from .gp_node_parent import GPNodeParent
@@ -17,7 +19,11 @@ from .breeding_source import BreedingSource
 from .breeding_pipeline import BreedingPipeline
 from .selection_method import SelectionMethod
 from .gp_species import GPSpecies
+from .exchanger import Exchanger
+from .island_exchanger import IslandExchanger
+from .run_batch import RunBatch
 from .evolve import Evolve
+from .steady_state_evolution_state import SteadyStateEvolutionState
 from .statistics.statistics import Statistics
 from .statistics.simple_statistics import SimpleStatistics
 from .statistics.simple_short_statistics import SimpleShortStatistics
@@ -25,7 +31,10 @@ from .statistics.simple_short_statistics import SimpleShortStatistics
 __author__ = "Zhixing Huang"
 __all__ = [
     "EvolutionState",
+    "SteadyStateEvolutionState",
     "Evaluator",
+    "ProcessEvaluator",
+    "AutoEvaluator",
     "Fitness",
     "GPBuilder",
     "GPData",
@@ -46,6 +55,9 @@ __all__ = [
     "Population",
     "Subpopulation",
     "Evolve",
+    "RunBatch",
+    "Exchanger",
+    "IslandExchanger",
     "Statistics",
     "SimpleStatistics",
     "SimpleShortStatistics"
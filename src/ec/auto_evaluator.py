@@ -0,0 +1,201 @@
+from src.ec import EvolutionState
+from src.ec.process_evaluator import ProcessEvaluator
+from src.ec.util import Parameter
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import cpu_count
+import math
+import time
+
+class AutoEvaluator(ProcessEvaluator):
+    """
+    picking the fastest way of evaluating the population by a short benchmark. The unevaluated individuals of a
+    calibration generation are split into slices of about the same cost, and every slice is evaluated (for real) in
+    another way, whose time per effective instruction is measured:
+        threads     the population is split between evaluation threads (at most `evalthreads`, as every thread
+                    draws from its own random number generator)
+        processes   the population is split between worker processes, as by ProcessEvaluator
+        rows        the individuals are evaluated one after another, each executed over slices of the rows by the
+                    row threads of the problem (if it has them)
+    with 2, 4, 8, ... up to `max-workers` workers, or without any. The chunk size of the problem (if it has one) is
+    chosen first, without workers. The decision is logged, and kept until the next calibration, every
+    `recalibrate` generations (as the programs grow) or only at the first generation if it is 0.
+
+    parameters:
+        eval = src.ec.AutoEvaluator
+        eval.max-workers = 8     (the number of cores by default)
+        eval.recalibrate = 10    (0 by default)
+    """
+
+    P_MAX_WORKERS = "max-workers"
+    P_RECALIBRATE = "recalibrate"
+
+    S_THREADS = "threads"
+    S_PROCESSES = "processes"
+    S_ROWS = "rows"
+
+    # the individuals evaluated before the benchmark, so that the one-off costs (e.g., compiling the execution
+    # kernels) are not charged to the first way
+    WARMUP = 4
+
+    # the minimum number of unevaluated individuals per slice of the benchmark
+    MIN_SLICE = 2
+
+    def __init__(self, p_problem=None, numTests=1, cloneProblem=False):
+        super().__init__(p_problem, numTests, cloneProblem)
+        self.maxWorkers = 1
+        self.recalibrate = 0
+        self.way = (self.S_THREADS, 1, None)  # the strategy, the number of workers and the chunk size
+        self.calibrated = -1  # the generation of the last calibration
+
+    def setup(self, state:EvolutionState, base:Parameter):
+        super().setup(state, base)
+        self.maxWorkers = state.parameters.getIntWithDefault(base.push(self.P_MAX_WORKERS), None, cpu_count())
+        if self.maxWorkers < 1:
+            state.output.fatal(f"The maximum number of evaluation workers must be >= 1: {base.push(self.P_MAX_WORKERS)}")
+        self.recalibrate = state.parameters.getIntWithDefault(base.push(self.P_RECALIBRATE), None, 0)
+        if self.recalibrate < 0:
+            state.output.fatal(f"The calibration interval must be >= 0: {base.push(self.P_RECALIBRATE)}")
+        self.way = (self.S_THREADS, 1, getattr(self.p_problem, 'chunkSize', None))
+
+    def evaluateIndividuals(self, state:EvolutionState):
+        groups = [(subpop.individuals, pop_index) for pop_index, subpop in enumerate(state.population.subpops)]
+        if self.calibrated < 0 or (self.recalibrate > 0 and state.generation - self.calibrated >= self.recalibrate):
+            if self.calibrate(state, groups):
+                self.calibrated = state.generation
+                return
+        self.evaluateWith(state, self.way, groups)
+
+    def chunkSizes(self, groups:list) -> list:
+        '''
+        the chunk sizes to benchmark, one per distinct way of splitting the rows of the unevaluated individuals into
+        blocks (e.g., 0 and "auto" are the same on small data)
+        '''
+        if not hasattr(self.p_problem, 'chunkSize'):
+            return [None]
+        sizes = [self.way[2], 0, self.p_problem.C_AUTO]
+        if not hasattr(self.p_problem, 'chunkRows'):
+            return [c for i, c in enumerate(sizes) if c not in sizes[:i]]
+
+        inds = [ind for inds, _ in groups for ind in inds if not ind.evaluated]
+        current = self.p_problem.chunkSize
+        chunks = {}
+        try:
+            for c in sizes:
+                self.p_problem.chunkSize = c
+                chunks.setdefault(tuple(self.p_problem.chunkRows(ind) for ind in inds), c)
+        finally:
+            self.p_problem.chunkSize = current
+        return list(chunks.values())
+
+    def strategies(self, state:EvolutionState, chunk) -> list[tuple]:
+        '''the ways with workers'''
+        ways = []
+        counts = [2 ** i for i in range(1, self.maxWorkers.bit_length()) if 2 ** i < self.maxWorkers]
+        if self.maxWorkers > 1:
+            counts.append(self.maxWorkers)
+        for n in counts:
+            if n <= len(state.random):
+                ways.append((self.S_THREADS, n, chunk))
+            ways.append((self.S_PROCESSES, n, chunk))
+            if hasattr(self.p_problem, 'rowThreads'):
+                ways.append((self.S_ROWS, n, chunk))
+        return ways
+
+    def calibrate(self, state:EvolutionState, groups:list) -> bool:
+        '''
+        evaluate the individuals while timing the ways of evaluating them, and keep the fastest way.
+        return False if there are too few individuals to evaluate for a benchmark
+        '''
+        chunks = self.chunkSizes(groups)
+        numslices = len(chunks) + len(self.strategies(state, None))
+        unevaluated = sum(1 for inds, _ in groups for ind in inds if not ind.evaluated)
+        if unevaluated < self.WARMUP + numslices * self.MIN_SLICE:
+            return False
+
+        # the ways set the chunk size and the row threads of the problem, which are restored whatever the outcome,
+        # the chosen way being set by the next evaluation
+        settings = {name: getattr(self.p_problem, name) for name in ('chunkSize', 'rowThreads')
+                    if hasattr(self.p_problem, name)}
+        timings = {}
+        try:
+            # the warm-up
+            self.evaluateWith(state, (self.S_THREADS, 1, self.way[2]), [(inds[:self.WARMUP], p) for inds, p in groups])
+            groups = [(inds[self.WARMUP:], p) for inds, p in groups]
+            bounds = [self.partition(inds, numslices) for inds, _ in groups]
+            slices = iter([[(inds[b[k]:b[k + 1]], p) for (inds, p), b in zip(groups, bounds)] for k in range(numslices)])
+
+            for chunk in chunks:
+                way = (self.S_THREADS, 1, chunk)
+                timings[way] = self.timeWith(state, way, next(slices))
+            chunk = min(timings, key=timings.get)[2]
+            for way in self.strategies(state, chunk):
+                timings[way] = self.timeWith(state, way, next(slices))
+        finally:
+            for name, value in settings.items():
+                setattr(self.p_problem, name, value)
+
+        if all(math.isinf(t) for t in timings.values()):
+            if self.way[0] != self.S_PROCESSES:
+                self.closeWorkers()
+            return False
+        self.way = min(timings, key=timings.get)
+        if self.way[0] != self.S_PROCESSES:
+            self.closeWorkers()
+
+        state.output.message(f"Evaluation by {self.describe(self.way)} (calibrated at generation {state.generation}, "
+                             + ", ".join(f"{self.describe(way)}: {t * 1e6:.2f}" for way, t in timings.items())
+                             + " microseconds per instruction)")
+        return True
+
+    def describe(self, way:tuple) -> str:
+        strategy, workers, chunk = way
+        if workers == 1:
+            text = "one thread"
+        elif strategy == self.S_ROWS:
+            text = f"{workers} row threads"
+        else:
+            text = f"{workers} {strategy}"
+        return text if chunk is None else f"{text} with chunk size {chunk}"
+
+    def timeWith(self, state:EvolutionState, way:tuple, groups:list) -> float:
+        '''the time per unit of evaluation cost of evaluating the individuals in the given way'''
+        cost = sum(self.evaluationCost(ind) for inds, _ in groups for ind in inds)
+        if cost <= 0:
+            return math.inf
+        # the worker processes are started before the timing, as they are kept for the next generations
+        self.prepare(state, way)
+        start = time.perf_counter()
+        self.evaluateWith(state, way, groups)
+        return (time.perf_counter() - start) / cost
+
+    def prepare(self, state:EvolutionState, way:tuple):
+        strategy, workers, chunk = way
+        if chunk is not None:
+            self.p_problem.chunkSize = chunk
+        if hasattr(self.p_problem, 'rowThreads'):
+            self.p_problem.rowThreads = workers if strategy == self.S_ROWS else 1
+        if strategy == self.S_PROCESSES:
+            self.startWorkers(state, workers)
+
+    def evaluateWith(self, state:EvolutionState, way:tuple, groups:list):
+        '''evaluate the individuals of the groups (individuals, subpopulation index) in the given way'''
+        self.prepare(state, way)
+        strategy, workers, _ = way
+
+        if strategy == self.S_PROCESSES:
+            for inds, pop_index in groups:
+                self.evaluateSubpopulation(state, inds, pop_index, workers)
+        elif strategy == self.S_THREADS and workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = []
+                for inds, pop_index in groups:
+                    bounds = self.partition(inds, workers)
+                    for t in range(workers):
+                        if bounds[t] < bounds[t + 1]:
+                            futures.append(executor.submit(self.p_problem.threadCopy().evaluateBatch, state,
+                                                           inds[bounds[t]:bounds[t + 1]], pop_index, t))
+                for future in futures:
+                    future.result()
+        else:
+            for inds, pop_index in groups:
+                self.p_problem.evaluateBatch(state, inds, pop_index, 0)
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+class DiskCache:
+    """
+    the fitness of evaluated phenotypes kept in a file, so that the runs on the same machine (e.g., the seeds of a batch
+    experiment, or the jobs of parallel processes) share the programs they already evaluated. The fitness objects are
+    kept whole, pickled, and are unpickled when they are read, so the file must only be shared by trusted runs. The
+    entries are keyed by the digests of the data fingerprint and of the phenotype (see Problem.dataFingerprint and
+    Problem.phenotypeKey), so the runs on other data or settings do not see them. The file is an SQLite database in
+    write-ahead log mode, which many processes can read and write at the same time. About `size` entries are kept:
+    every EVICTION_INTERVAL writes of a process, the least recently used entries over the size are evicted.
+
+    parameters:
+        eval.disk-cache = fitness.db           (no disk cache by default)
+        eval.disk-cache-size = 1000000         (the number of phenotypes, 1000000 by default)
+    """
+
+    # the time in seconds to wait for another process writing into the file
+    TIMEOUT = 60.
+
+    # the number of writes between two checks of the number of entries, which is counted without the lock of the file
+    EVICTION_INTERVAL = 10
+
+    def __init__(self, path:str, size:int):
+        self.path = path
+        self.size = size
+        self.writes = 0
+        self.local = threading.local()  # the connection of every thread
+
+    def __getstate__(self):
+        # the connections are not copied, e.g., into the worker processes
+        state = self.__dict__.copy()
+        del state['local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.local = threading.local()
+
+    def connection(self) -> sqlite3.Connection:
+        '''the connection of the current thread and process to the file'''
+        con = getattr(self.local, 'con', None)
+        if con is None or self.local.pid != os.getpid():
+            con = sqlite3.connect(self.path, timeout=self.TIMEOUT, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("CREATE TABLE IF NOT EXISTS fitness (data BLOB, phenotype BLOB, fitness BLOB, used REAL, "
+                        "PRIMARY KEY (data, phenotype)) WITHOUT ROWID")
+            con.execute("CREATE INDEX IF NOT EXISTS fitness_used ON fitness (used)")
+            self.local.con = con
+            self.local.pid = os.getpid()
+        return con
+
+    @staticmethod
+    def digest(key) -> bytes:
+        '''a digest of a key made of tuples, strings, numbers and bytes, which is the same in every process'''
+        return hashlib.blake2b(pickle.dumps(key, protocol=4), digest_size=16).digest()
+
+    def get(self, fingerprint, keys:list) -> dict:
+        '''the cached fitness of the phenotypes by key, for the keys that are in the file'''
+        data = self.digest(fingerprint)
+        digests = {self.digest(key): key for key in keys}
+        found = {}
+        con = self.connection()
+        items = list(digests)
+        for i in range(0, len(items), 500):
+            part = items[i:i + 500]
+            rows = con.execute("SELECT phenotype, fitness FROM fitness WHERE data = ? AND phenotype IN "
+                               f"({','.join('?' * len(part))})", [data] + part).fetchall()
+            for phenotype, fitness in rows:
+                found[digests[phenotype]] = pickle.loads(fitness)
+        if found:
+            now = time.time()
+            with self.transaction() as con:
+                con.executemany("UPDATE fitness SET used = ? WHERE data = ? AND phenotype = ?",
+                                [(now, data, phenotype) for phenotype, key in digests.items() if key in found])
+        return found
+
+    def put(self, fingerprint, values:dict):
+        '''write the fitness of the phenotypes by key, checking the size of the file every EVICTION_INTERVAL writes'''
+        if not values:
+            return
+        data = self.digest(fingerprint)
+        now = time.time()
+        with self.transaction() as con:
+            con.executemany("INSERT OR REPLACE INTO fitness VALUES (?, ?, ?, ?)",
+                            [(data, self.digest(key), pickle.dumps(fitness, protocol=4), now)
+                             for key, fitness in values.items()])
+        self.writes += 1
+        if self.writes % self.EVICTION_INTERVAL == 0:
+            self.evict()
+
+    def evict(self):
+        '''
+        evict the least recently used entries over the size. The entries are counted outside of a write transaction,
+        so the processes evicting at the same time may evict a few more
+        '''
+        excess = self.connection().execute("SELECT COUNT(*) FROM fitness").fetchone()[0] - self.size
+        if excess > 0:
+            with self.transaction() as con:
+                con.execute("DELETE FROM fitness WHERE (data, phenotype) IN "
+                            "(SELECT data, phenotype FROM fitness ORDER BY used LIMIT ?)", (excess,))
+
+    @contextmanager
+    def transaction(self):
+        '''a write transaction, which takes the lock of the file at once so that it does not fail halfway'''
+        con = self.connection()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
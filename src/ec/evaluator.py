@@ -1,9 +1,11 @@
 
 from tasks.problem import Problem
 from src.ec import EvolutionState
+from src.ec.disk_cache import DiskCache
+from src.ec.fitness_cache import FitnessCache
 from src.ec.util import Parameter, ParameterDatabase
 from concurrent.futures import ThreadPoolExecutor
-import copy
+import numpy as np
 
 class Evaluator:
     """defining how to evaluate the individuals in the population"""
@@ -11,11 +13,15 @@ class Evaluator:
     P_EVALUATOR = "evaluator"
     P_PROBLEM = "problem"
     P_CLONE_PROBLEM = "clone-problem"
+    P_CACHE_SIZE = "cache-size"
+    P_DISK_CACHE = "disk-cache"
+    P_DISK_CACHE_SIZE = "disk-cache-size"
 
     def __init__(self, p_problem=None, numTests=1, cloneProblem=False):
         self.p_problem:Problem = p_problem
         self.numTests = numTests
         self.cloneProblem = cloneProblem
+        self.fitnessCache:FitnessCache = None
 
     def setup(self, state:EvolutionState, base:Parameter):
         
@@ -30,6 +36,20 @@ class Evaluator:
         if not self.cloneProblem and state.breedthreads > 1:
             state.output.fatal(f"The Evaluator is not cloning its Problem, but you have more than one thread: {base.push(self.P_CLONE_PROBLEM)} or {def_base.push(self.P_CLONE_PROBLEM)}.")
 
+        # the number of phenotypes whose fitness is cached, 0 for no cache
+        cacheSize = state.parameters.getIntWithDefault(base.push(self.P_CACHE_SIZE), def_base.push(self.P_CACHE_SIZE), 0)
+        if cacheSize < 0:
+            state.output.fatal(f"The size of the fitness cache must be >= 0: {base.push(self.P_CACHE_SIZE)} or {def_base.push(self.P_CACHE_SIZE)}")
+        # the file of the fitness cache shared by the runs on the same machine, none by default
+        disk = None
+        path = state.parameters.getString(base.push(self.P_DISK_CACHE), def_base.push(self.P_DISK_CACHE))
+        if path is not None and path.lower() != "none":
+            diskSize = state.parameters.getIntWithDefault(base.push(self.P_DISK_CACHE_SIZE), def_base.push(self.P_DISK_CACHE_SIZE), 1000000)
+            if diskSize < 1:
+                state.output.fatal(f"The size of the disk cache must be >= 1: {base.push(self.P_DISK_CACHE_SIZE)} or {def_base.push(self.P_DISK_CACHE_SIZE)}")
+            disk = DiskCache(path, diskSize)
+        self.fitnessCache = FitnessCache(cacheSize, disk) if cacheSize > 0 or disk is not None else None
+
         # self.numTests = state.parameters.get_int(base.push("num-tests"), None, 1)
         # if self.numTests < 1:
         #     self.numTests = 1
@@ -59,6 +79,17 @@ class Evaluator:
 
 
     def evaluatePopulation(self, state:EvolutionState):
+        if self.fitnessCache is None:
+            return self.evaluateIndividuals(state)
+
+        # the individuals whose phenotype was evaluated before take the cached fitness, and are skipped
+        individuals = [ind for subpop in state.population.subpops for ind in subpop.individuals]
+        pending, copies = self.fitnessCache.lookup(self.p_problem, individuals)
+        self.evaluateIndividuals(state)
+        self.fitnessCache.store(pending, copies)
+
+    def evaluateIndividuals(self, state:EvolutionState):
+        '''evaluate the unevaluated individuals of the population'''
         # if self.numTests > 1:
         #     self.expand(state)
 
@@ -67,17 +98,23 @@ class Evaluator:
 
         subpops = state.population.subpops
         num_subpops = len(subpops)
-        numinds = [len(subpop.individuals) for subpop in subpops]
-        from_index = [0] * num_subpops
 
         if state.evalthreads == 1:
-            prob = copy.deepcopy(self.p_problem) if self.cloneProblem else self.p_problem
+            numinds = [len(subpop.individuals) for subpop in subpops]
+            from_index = [0] * num_subpops
+            prob = self.p_problem.threadCopy() if self.cloneProblem else self.p_problem
             self.evalPopChunk(state, numinds, from_index, 0, prob)
         else:
+            # every thread evaluates its own chunk of each subpopulation, with its own light copy of the problem
+            chunks = [self.partition(subpop.individuals, state.evalthreads) for subpop in subpops]
             with ThreadPoolExecutor(max_workers=state.evalthreads) as executor:
                 futures = []
                 for i in range(state.evalthreads):
-                    prob = copy.deepcopy(self.p_problem) if self.cloneProblem else self.p_problem
+                    numinds = [chunks[p][i + 1] - chunks[p][i] for p in range(num_subpops)]
+                    from_index = [chunks[p][i] for p in range(num_subpops)]
+                    if sum(numinds) == 0:
+                        continue
+                    prob = self.p_problem.threadCopy()
                     futures.append(
                         executor.submit(self.evalPopChunk, state, numinds, from_index, i, prob)
                     )
@@ -87,6 +124,28 @@ class Evaluator:
         # if self.numTests > 1:
         #     self.contract(state)
 
+    def evaluationCost(self, ind) -> float:
+        '''the estimated cost of evaluating an individual, used to balance the chunks of the threads'''
+        if ind.evaluated:
+            return 0.
+        if hasattr(ind, 'getEffTreesLength'):
+            # the ineffective instructions are not executed
+            return 1. + ind.getEffTreesLength()
+        return 1.
+
+    def partition(self, individuals:list, numchunks:int) -> list[int]:
+        '''
+        split the individuals into `numchunks` contiguous chunks of about the same evaluation cost.
+        return the numchunks+1 boundaries of the chunks, i.e., chunk i is individuals[bounds[i]:bounds[i+1]]
+        '''
+        costs = np.cumsum([self.evaluationCost(ind) for ind in individuals])
+        total = costs[-1] if len(costs) > 0 else 0.
+        if total <= 0:
+            # split evenly by number
+            return [len(individuals) * i // numchunks for i in range(numchunks + 1)]
+        bounds = np.searchsorted(costs, total * np.arange(1, numchunks) / numchunks, side='left') + 1
+        return [0] + [int(b) for b in np.minimum(bounds, len(individuals))] + [len(individuals)]
+
     def evalPopChunk(self, state:EvolutionState, numinds, from_index, threadnum, problem:Problem):
         # problem.prepare_to_evaluate(state, threadnum)
 
@@ -95,8 +154,7 @@ class Evaluator:
             upperbound = fp + numinds[pop_index]
             individuals = subpop.individuals[fp:upperbound]
 
-            for ind in individuals:
-                problem.evaluate(state, ind, pop_index, threadnum)
+            problem.evaluateBatch(state, individuals, pop_index, threadnum)
 
         # problem.finish_evaluating(state, threadnum)
 
@@ -106,6 +164,15 @@ class Evaluator:
     # def contract(self, state):
     #     pass  # stub for numTests > 1 case
 
+    def evaluationReport(self, state:EvolutionState) -> str:
+        '''the lines about the evaluation of the last generation for the statistics, or an empty string'''
+        lines = [self.fitnessCache.report() if self.fitnessCache is not None else "", self.p_problem.evaluationReport()]
+        return "\n".join(line for line in lines if line)
+
+    def closeContacts(self, state:EvolutionState, result:int):
+        '''called at the end of a run to release the resources of the evaluation'''
+        pass
+
     def runComplete(self, state:EvolutionState)->bool:
         for sp in state.population.subpops:
             for ind in sp.individuals:
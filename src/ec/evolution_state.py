@@ -33,6 +33,7 @@ class EvolutionState:
     def __init__(self):
         from src.ec import Statistics
         from src.ec.breeder import Breeder
+        from src.ec.exchanger import Exchanger
 
         # ParameterDatabase
         self.parameters:ParameterDatabase = None
@@ -57,6 +58,7 @@ class EvolutionState:
         # self.initializer = None  # Initializer instance
         self.breeder:Breeder = None  # Breeder instance
         self.statistics:Statistics = None  # Statistics instance
+        self.exchanger:Exchanger = Exchanger()  # exchanges nothing, unless the parameters define an exchanger
 
         self.builder = None
         self.primitive_sets = None
@@ -143,8 +145,12 @@ class EvolutionState:
         self.statistics = self.parameters.getInstanceForParameter(self.P_STATISTICS, None, Statistics)
         self.statistics.setup(self, Parameter(self.P_STATISTICS))
 
-        # self.exchanger = self.parameters.getInstanceForParameter(self.P_EXCHANGER, None, Exchanger)
-        # self.exchanger.setup(self, self.P_EXCHANGER)
+        from src.ec.exchanger import Exchanger
+        if self.parameters.exists(self.P_EXCHANGER):
+            self.exchanger = self.parameters.getInstanceForParameter(self.P_EXCHANGER, None, Exchanger)
+        else:
+            self.exchanger = Exchanger()
+        self.exchanger.setup(self, Parameter(self.P_EXCHANGER))
 
         from src.ec.gp_builder import GPBuilder
         if self.parameters.exists(self.P_BUILDER):
@@ -176,8 +182,8 @@ class EvolutionState:
     def finish(self, result: int):
         self.statistics.finalStatistics(self, result)
         # self.finisher.finishPopulation(self, result)
-        # self.exchanger.closeContacts(self, result)
-        # self.evaluator.closeContacts(self, result)
+        self.exchanger.closeContacts(self, result)
+        self.evaluator.closeContacts(self, result)
 
     def startFresh(self):
         self.output.message("Setting up a new run")
@@ -211,7 +217,7 @@ class EvolutionState:
 
             self.output.message(f"Generations will be {self.numGenerations}")
 
-        # self.exchanger.initializeContacts(self)
+        self.exchanger.initializeContacts(self)
         # self.evaluator.initializeContacts(self)
 
     def evolve(self):
@@ -249,13 +255,13 @@ class EvolutionState:
 
         # PRE-BREEDING EXCHANGING
         # self.statistics.prePreBreedingExchangeStatistics(self)
-        # self.population = self.exchanger.preBreedingExchangePopulation(self)
+        self.population = self.exchanger.preBreedingExchangePopulation(self)
         # self.statistics.postPreBreedingExchangeStatistics(self)
 
-        # exchanger_msg = self.exchanger.runComplete(self)
-        # if exchanger_msg is not None:
-        #     self.output.message(exchanger_msg)
-        #     return self.R_SUCCESS
+        exchanger_msg = self.exchanger.runComplete(self)
+        if exchanger_msg is not None:
+            self.output.message(exchanger_msg)
+            return self.R_SUCCESS
 
         # BREEDING
         self.statistics.preBreedingStatistics(self)
@@ -263,9 +269,9 @@ class EvolutionState:
         self.statistics.postBreedingStatistics(self)
 
         # POST-BREEDING EXCHANGING
-        # self.statistics.prePostBreedingExchangeStatistics(self)
-        # self.population = self.exchanger.postBreedingExchangePopulation(self)
-        # self.statistics.postPostBreedingExchangeStatistics(self)
+        self.statistics.prePostBreedingExchangeStatistics(self)
+        self.population = self.exchanger.postBreedingExchangePopulation(self)
+        self.statistics.postPostBreedingExchangeStatistics(self)
 
         # INCREMENT GENERATION AND CHECKPOINT
         self.generation += 1
@@ -1,12 +1,18 @@
 import sys
 import os
 import time
+import copy
 import random
 import numpy as np
 from typing import List, Optional, Dict, Any, Tuple
 from multiprocessing import cpu_count
+from concurrent.futures import ProcessPoolExecutor
 from src.ec import *
 from src.ec.util import *
+from src.ec.island_exchanger import IslandExchanger
+from src.ec.run_batch import RunBatch
+from src.ec.statistics.statistics import Statistics
+from tasks.problem import Problem
 
 class Evolve:
     """Python implementation maintaining original ECJ names"""
@@ -50,6 +56,12 @@ class Evolve:
     # Should we muzzle stdout and stderr? [deprecated]
     P_MUZZLE = "muzzle"
 
+    # the number of processes running the jobs at the same time ('auto' for the number of cores)
+    P_PARALLEL_JOBS = "parallel-jobs"
+
+    # the number of jobs evolved together in lockstep in one process
+    P_BATCH_RUNS = "batch-runs"
+
     @staticmethod
     def checkForHelp(args: List[str]) -> None:
         """Optionally prints the help message."""
@@ -249,6 +261,52 @@ Format:
     #     """Cleanup resources"""
     #     pass  # Would implement actual cleanup
 
+    @staticmethod
+    def determineParallelJobs(parameters: ParameterDatabase, numJobs: int) -> int:
+        """The number of processes running the jobs at the same time, 1 to run them one after another."""
+        tmp_s = parameters.getString(Parameter(Evolve.P_PARALLEL_JOBS))
+        if tmp_s is None or tmp_s.lower() == "false":
+            return 1
+        if tmp_s.lower() in (Evolve.V_THREADS_AUTO, "true"):
+            return min(numJobs, cpu_count())
+        try:
+            n = int(tmp_s)
+        except ValueError:
+            n = 0
+        if n < 1:
+            print(f"The '{Evolve.P_PARALLEL_JOBS}' parameter must be 'auto' or an integer >= 1")
+            sys.exit(1)
+        return min(numJobs, n)
+
+    @staticmethod
+    def runParallelJobs(args: List[str], parameters: ParameterDatabase, batches: List[List[int]], numProcesses: int) -> None:
+        """
+        Runs the batches of jobs in a pool of processes. Each job gets the random seeds of its job number and writes
+        its statistics to files suffixed with '.job<job>'. The data of the problem are loaded here once, so that the
+        forked processes share them instead of reading them again.
+        """
+        base = Parameter(EvolutionState.P_EVALUATOR).push(Evaluator.P_PROBLEM)
+        problem:Problem = parameters.getInstanceForParameter(base, Parameter(Evaluator.P_EVALUATOR).push(Evaluator.P_PROBLEM), Problem)
+        problem.preloadData(parameters, base)
+
+        with ProcessPoolExecutor(max_workers=numProcesses) as executor:
+            futures = {executor.submit(_runJobs, args, parameters, batch): batch for batch in batches}
+            failed = []
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Jobs {', '.join(map(str, futures[future]))} failed: {e!r}")
+                    failed.extend(futures[future])
+        if failed:
+            print(f"The jobs {', '.join(map(str, failed))} failed")
+            sys.exit(1)
+
+    @staticmethod
+    def jobParameters(parameters: ParameterDatabase, job: int) -> ParameterDatabase:
+        """Makes the statistics files of the parameters specific to a job."""
+        return Statistics.suffixFiles(parameters, f".job{job}")
+
     @staticmethod
     def main() -> None:
         """Top-level evolutionary loop."""
@@ -288,11 +346,36 @@ Format:
             print("The 'jobs' parameter must be >= 1 (or not exist, which defaults to 1)")
             sys.exit(1)
                 
+        batchRuns = parameters.getIntWithDefault(Parameter(Evolve.P_BATCH_RUNS), None, 1)
+        if batchRuns < 1:
+            print(f"The '{Evolve.P_BATCH_RUNS}' parameter must be >= 1 (or not exist, which defaults to 1)")
+            sys.exit(1)
+        jobs = list(range(currentJob, numJobs))
+        batches = [jobs[i:i + batchRuns] for i in range(0, len(jobs), batchRuns)]
+
+        # the jobs of an island model run one after another, as every job already runs its islands in parallel
+        if IslandExchanger.numIslands(parameters) == 0:
+            parallelJobs = Evolve.determineParallelJobs(parameters, len(batches))
+            if parallelJobs > 1:
+                Evolve.runParallelJobs(args, parameters, batches, parallelJobs)
+                return
+            if batchRuns > 1:
+                for batch in batches:
+                    _runJobs(args, Evolve.loadParameterDatabase(args), batch)
+                return
+
         # Run jobs
         for job in range(currentJob, numJobs):
             # try:
             if job > currentJob:
                 parameters = Evolve.loadParameterDatabase(args)
+
+            # the island model runs every subpopulation in its own process
+            numIslands = IslandExchanger.numIslands(parameters)
+            if numIslands > 0:
+                IslandExchanger.runIslands(args, job, numIslands)
+                parameters = None
+                continue
                         
             state:EvolutionState = Evolve.initialize(parameters, job)
             state.output.message(f"Job: {job}")
@@ -310,5 +393,36 @@ Format:
             #     print(f"Error in job {job}: {e}")
                 # Continue to next job
 
+
+def _runJob(args: List[str], parameters: ParameterDatabase, job: int) -> None:
+    state:EvolutionState = Evolve.initialize(Evolve.jobParameters(parameters, job), job)
+    state.output.message(f"Job: {job}")
+    state.job = [job]
+    state.runtimeArguments = args
+    state.startFresh()
+    state.run()
+
+
+def _runJobs(args: List[str], parameters: ParameterDatabase, jobs: List[int]) -> None:
+    if len(jobs) == 1:
+        return _runJob(args, parameters, jobs[0])
+
+    states = []
+    for job in jobs:
+        state:EvolutionState = Evolve.initialize(Evolve.jobParameters(copy.deepcopy(parameters), job), job)
+        state.output.message(f"Job: {job}")
+        state.job = [job]
+        state.runtimeArguments = args
+        states.append(state)
+
+    if not RunBatch.supports(states[0]):
+        states[0].output.warning(f"{type(states[0]).__name__} does not evaluate its population generation by generation, so the jobs {', '.join(map(str, jobs))} run one after another.")
+        for state in states:
+            state.startFresh()
+            state.run()
+        return
+    RunBatch(states).run()
+
+
 if __name__ == "__main__":
     Evolve.main()
\ No newline at end of file
@@ -0,0 +1,30 @@
+from src.ec import EvolutionState
+from src.ec.population import Population
+from src.ec.util import Parameter
+
+class Exchanger:
+    """
+    exchanging individuals between the subpopulations of a run, or between several runs, before and after breeding.
+    The default exchanger exchanges nothing.
+    """
+
+    def setup(self, state:EvolutionState, base:Parameter):
+        pass
+
+    def initializeContacts(self, state:EvolutionState):
+        '''called once at the start of a run, after the initial population is created'''
+        pass
+
+    def preBreedingExchangePopulation(self, state:EvolutionState) -> Population:
+        return state.population
+
+    def postBreedingExchangePopulation(self, state:EvolutionState) -> Population:
+        return state.population
+
+    def runComplete(self, state:EvolutionState) -> str:
+        '''a message if the exchanger wants the run to stop, otherwise None'''
+        return None
+
+    def closeContacts(self, state:EvolutionState, result:int):
+        '''called at the end of a run'''
+        pass
@@ -0,0 +1,184 @@
+from collections import OrderedDict
+
+class FitnessCache:
+    """
+    the fitness of the recently evaluated phenotypes, so that the individuals whose effective program was already
+    evaluated (e.g., the offspring of neutral or intron-only variations, reproduced individuals and re-evaluated elites)
+    are not executed again. The phenotypes are given by Problem.phenotypeKey, and the cache is cleared whenever the
+    fingerprint of the data of the problem (Problem.dataFingerprint) changes. At most `size` phenotypes are kept,
+    the least recently used ones are evicted first. The phenotypes missing from memory are looked up in the `disk`
+    cache if there is one (see DiskCache), which keeps the fitness of the runs on the same data across processes.
+
+    The individuals whose phenotype is not cached are then looked up by their semantics on a few probe rows
+    (Problem.semanticKeys) if the problem gives them, so that the programs computing the same outputs in another way
+    (e.g., with commuted operands or other registers) take the fitness of the first one evaluated. As the outputs on
+    the other rows are not compared, the fitness taken by semantics may differ from the real one, so it is not cached
+    under the phenotype of the individual, in memory or on disk.
+    """
+
+    def __init__(self, size:int, disk:'DiskCache'=None):
+        self.size = size
+        self.disk = disk
+        self.entries = OrderedDict()  # the fitness by phenotype
+        self.semantics = OrderedDict()  # the fitness by semantics on the probe rows
+        self.fingerprint = None
+        self.hits = 0
+        self.lookups = 0
+        self.generationHits = 0
+        self.generationLookups = 0
+        self.diskHits = 0
+        self.generationDiskHits = 0
+        self.probeHits = 0
+        self.generationProbeHits = 0
+
+    def startGeneration(self):
+        '''start counting the hits of the next generation reported by report()'''
+        self.generationHits = self.generationLookups = self.generationDiskHits = self.generationProbeHits = 0
+
+    def lookup(self, problem, individuals:list, newGeneration:bool=True) -> tuple[list, list]:
+        '''
+        give the unevaluated individuals whose phenotype or semantics is cached their cached fitness. return the
+        individuals to evaluate with their phenotypes and semantics (None if they cannot be cached), and the copies of
+        their phenotypes or semantics within the individuals with the individual to take the fitness from, to pass to
+        store() once they are evaluated. The individuals are a generation unless newGeneration is False (e.g., one
+        offspring of a steady-state evolution), in which case the hits are added to those of the current generation
+        '''
+        fingerprint = problem.dataFingerprint()
+        if fingerprint != self.fingerprint:
+            self.entries.clear()
+            self.semantics.clear()
+            self.fingerprint = fingerprint
+
+        if newGeneration:
+            self.startGeneration()
+        # the hits of this lookup are counted from 0, and added to those of the generation at the end
+        counts = (self.generationHits, self.generationLookups, self.generationDiskHits, self.generationProbeHits)
+        self.startGeneration()
+        pending = []
+        copies = []
+        leaders = {}
+        for ind in individuals:
+            if ind.evaluated:
+                continue
+            key = problem.phenotypeKey(ind) if fingerprint is not None else None
+            if key is None:
+                pending.append((ind, None, None))
+                continue
+            self.generationLookups += 1
+            fitness = self.entries.get(key)
+            if fitness is not None:
+                self.entries.move_to_end(key)
+                ind.fitness = fitness.clone()
+                ind.evaluated = True
+                self.generationHits += 1
+            elif key in leaders:
+                # evaluated once, by the first individual of the phenotype
+                ind.evaluated = True
+                copies.append((ind, leaders[key]))
+                self.generationHits += 1
+            else:
+                leaders[key] = ind
+                pending.append((ind, key, None))
+
+        if self.disk is not None:
+            found = self.disk.get(fingerprint, [key for _, key, _ in pending if key is not None])
+            for i, (ind, key, _) in enumerate(pending):
+                if key in found:
+                    ind.fitness = found[key]
+                    ind.evaluated = True
+                    # the fitness is not written back to the disk
+                    pending[i] = (ind, None, None)
+                    self.entries[key] = ind.fitness.clone()
+            self.generationDiskHits = len(found)
+            self.generationHits += len(found)
+            self.diskHits += len(found)
+
+        # the leader of a phenotype may take its fitness from the leader of its semantics, so the copies of the
+        # semantics are made first
+        copies = self.lookupSemantics(problem, pending) + copies
+
+        self.hits += self.generationHits
+        self.lookups += self.generationLookups
+        self.generationHits += counts[0]
+        self.generationLookups += counts[1]
+        self.generationDiskHits += counts[2]
+        self.generationProbeHits += counts[3]
+        return pending, copies
+
+    def lookupSemantics(self, problem, pending:list[tuple]) -> list[tuple]:
+        '''
+        give the individuals to evaluate whose semantics is cached, or is the same as the semantics of another one,
+        the fitness of that semantics and drop their phenotypes from pending, and record the semantics of the others in
+        pending. return the copies of the semantics within the individuals
+        '''
+        indices = [i for i, (ind, key, _) in enumerate(pending) if key is not None and not ind.evaluated]
+        if len(indices) == 0:
+            return []
+        keys = problem.semanticKeys([pending[i][0] for i in indices])
+        if all(sem is None for sem in keys):
+            return []
+
+        found = {}
+        if self.disk is not None:
+            missing = [('probe', sem) for sem in keys if sem is not None and sem not in self.semantics]
+            found = {key[1]: value for key, value in self.disk.get(self.fingerprint, missing).items()}
+
+        copies = []
+        leaders = {}
+        for i, sem in zip(indices, keys):
+            if sem is None:
+                continue
+            ind, key, _ = pending[i]
+            fitness = self.semantics.get(sem)
+            if fitness is not None:
+                self.semantics.move_to_end(sem)
+                ind.fitness = fitness.clone()
+                ind.evaluated = True
+            elif sem in found:
+                ind.fitness = found[sem]
+                ind.evaluated = True
+                self.semantics[sem] = ind.fitness.clone()
+            elif sem in leaders:
+                ind.evaluated = True
+                copies.append((ind, leaders[sem]))
+            else:
+                leaders[sem] = ind
+                pending[i] = (ind, key, sem)
+                continue
+            # the fitness taken by semantics is approximate, so it is not cached under the phenotype
+            pending[i] = (ind, None, None)
+            self.generationProbeHits += 1
+        self.generationHits += self.generationProbeHits
+        self.probeHits += self.generationProbeHits
+        return copies
+
+    def store(self, pending:list[tuple], copies:list[tuple]):
+        '''cache the fitness of the individuals evaluated after lookup()'''
+        for ind, leader in copies:
+            ind.fitness = leader.fitness.clone()
+        evaluated = {}
+        for ind, key, sem in pending:
+            if key is not None and ind.evaluated:
+                self.entries[key] = ind.fitness.clone()
+                evaluated[key] = ind.fitness
+                if sem is not None:
+                    self.semantics[sem] = ind.fitness.clone()
+                    evaluated[('probe', sem)] = ind.fitness
+        if self.disk is not None:
+            self.disk.put(self.fingerprint, evaluated)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        while len(self.semantics) > self.size:
+            self.semantics.popitem(last=False)
+
+    def report(self) -> str:
+        rate = 100. * self.generationHits / self.generationLookups if self.generationLookups > 0 else 0.
+        total = 100. * self.hits / self.lookups if self.lookups > 0 else 0.
+        sources = []
+        if self.disk is not None:
+            sources.append(f"{self.generationDiskHits} from the disk, {self.diskHits} in the run")
+        if self.probeHits > 0:
+            sources.append(f"{self.generationProbeHits} by probe semantics, {self.probeHits} in the run")
+        sources = f" ({'; '.join(sources)})" if sources else ""
+        return (f"Fitness cache: {self.generationHits} hits of {self.generationLookups} ({rate:.1f}%), "
+                f"{self.hits} of {self.lookups} in the run ({total:.1f}%), {len(self.entries)} phenotypes{sources}")
@@ -91,4 +91,4 @@ class GPTree(GPNodeParent):
         return self.child.printRootedTreeInString()
 
     def buildTree(self, state:EvolutionState, thread:int):
-        self.child = state.builder.newRootedTree(state, 0, self, self.species.primitiveset, 0)
+        self.child = state.builder.newRootedTree(state, thread, self, self.species.primitiveset, 0)
@@ -0,0 +1,216 @@
+from src.ec import EvolutionState
+from src.ec.exchanger import Exchanger
+from src.ec.gp_individual import GPIndividual
+from src.ec.gp_species import GPSpecies
+from src.ec.gp_tree import GPTree
+from src.ec.population import Population
+from src.ec.statistics.statistics import Statistics
+from src.ec.util import Parameter, ParameterDatabase
+from functools import cmp_to_key
+import io
+import pickle
+import queue
+import multiprocessing
+
+class IslandExchanger(Exchanger):
+    """
+    the island model. Every subpopulation of the parameters is evolved by its own run in its own worker process
+    (an island), and every `exch.interval` generations each island sends copies of its `exch.size` best individuals
+    to other islands: the next one (`exch.topology = ring`) or a random one (`random`). The immigrants replace the
+    worst individuals of an island before breeding, keeping the fitness they were evaluated with.
+    the migration is asynchronous: the islands never wait for each other, and the immigrants are taken in at the
+    first generation after they arrive. The individuals travel in a compact form, see encodeMigrant.
+
+    parameters:
+        exch = src.ec.IslandExchanger
+        exch.interval = 10
+        exch.offset = 10     (the first generation of migration, the interval by default)
+        exch.size = 5
+        exch.topology = ring
+
+    each island reads the parameters of its subpopulation `pop.subpop.<i>` (or those of `pop.subpop.0` if they
+    are not defined) as its single subpopulation, and writes its statistics to files suffixed with `.island<i>`.
+    """
+
+    P_INTERVAL = "interval"
+    P_OFFSET = "offset"
+    P_SIZE = "size"
+    P_TOPOLOGY = "topology"
+
+    V_RING = "ring"
+    V_RANDOM = "random"
+    TOPOLOGIES = [V_RING, V_RANDOM]
+
+    # the island of the current worker process and the inboxes of all islands, set by _runIsland
+    island = -1
+    inboxes:list = None
+
+    def __init__(self):
+        self.interval = 10
+        self.offset = 10
+        self.size = 1
+        self.topology = self.V_RING
+
+    def setup(self, state:EvolutionState, base:Parameter):
+        self.interval = state.parameters.getIntWithDefault(base.push(self.P_INTERVAL), None, 10)
+        if self.interval < 1:
+            state.output.fatal(f"The migration interval must be >= 1: {base.push(self.P_INTERVAL)}")
+        self.offset = state.parameters.getIntWithDefault(base.push(self.P_OFFSET), None, self.interval)
+        if self.offset < 0:
+            state.output.fatal(f"The migration offset must be >= 0: {base.push(self.P_OFFSET)}")
+        self.size = state.parameters.getIntWithDefault(base.push(self.P_SIZE), None, 1)
+        if self.size < 1:
+            state.output.fatal(f"The number of migrants must be >= 1: {base.push(self.P_SIZE)}")
+        topology = state.parameters.getString(base.push(self.P_TOPOLOGY), None)
+        self.topology = topology.lower() if topology is not None else self.V_RING
+        if self.topology not in self.TOPOLOGIES:
+            state.output.fatal(f"The topology must be one of {self.TOPOLOGIES}: {base.push(self.P_TOPOLOGY)}")
+
+    def initializeContacts(self, state:EvolutionState):
+        if self.inboxes is None:
+            state.output.warning("The IslandExchanger is used in a single run, so it exchanges nothing. Start the run by Evolve.main to run the islands.")
+        elif len(state.population.subpops) != 1:
+            state.output.fatal("An island evolves exactly one subpopulation.")
+
+    def preBreedingExchangePopulation(self, state:EvolutionState) -> Population:
+        if self.inboxes is None or len(self.inboxes) < 2:
+            return state.population
+
+        from src.ec.breeder import compare
+
+        subpop = state.population.subpops[0]
+        # from the worst to the best
+        ranking = sorted(range(len(subpop.individuals)), key=cmp_to_key(lambda a, b: compare(subpop.individuals[a], subpop.individuals[b])))
+
+        if state.generation >= self.offset and (state.generation - self.offset) % self.interval == 0:
+            payload = [encodeMigrant(subpop.individuals[i]) for i in ranking[-self.size:]]
+            self.inboxes[self.destination(state)].put(payload)
+
+        # take in everything that arrived since the last generation
+        immigrants = []
+        while True:
+            try:
+                immigrants.extend(self.inboxes[self.island].get_nowait())
+            except queue.Empty:
+                break
+        template = subpop.individuals[ranking[-1]]
+        for index, data in zip(ranking, immigrants[-len(ranking):]):
+            subpop.individuals[index] = decodeMigrant(data, template)
+
+        return state.population
+
+    def destination(self, state:EvolutionState) -> int:
+        numIslands = len(self.inboxes)
+        if self.topology == self.V_RANDOM:
+            return (self.island + state.random[0].randint(1, numIslands - 1)) % numIslands
+        return (self.island + 1) % numIslands
+
+    def closeContacts(self, state:EvolutionState, result:int):
+        if self.inboxes is None:
+            return
+        # the other islands may have stopped reading, so do not wait for the migrants still being sent
+        for inbox in self.inboxes:
+            inbox.cancel_join_thread()
+
+    @staticmethod
+    def numIslands(parameters:ParameterDatabase) -> int:
+        '''the number of islands if the parameters define an island model, otherwise 0'''
+        if not parameters.exists(EvolutionState.P_EXCHANGER):
+            return 0
+        exchanger = parameters.getInstanceForParameter(Parameter(EvolutionState.P_EXCHANGER), None, Exchanger)
+        if not isinstance(exchanger, IslandExchanger):
+            return 0
+        return parameters.getInt(Parameter(EvolutionState.P_POP).push(Population.P_SIZE), None)
+
+    @staticmethod
+    def runIslands(args:list[str], job:int, numIslands:int):
+        '''run the islands of one job, each in its own process, and wait for all of them to finish'''
+        inboxes = [multiprocessing.Queue() for _ in range(numIslands)]
+        processes = [multiprocessing.Process(target=_runIsland, args=(args, job, island, inboxes), name=f"island{island}")
+                     for island in range(numIslands)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        failed = [process.name for process in processes if process.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"the islands {', '.join(failed)} of job {job} failed")
+
+    @staticmethod
+    def islandParameters(parameters:ParameterDatabase, island:int) -> ParameterDatabase:
+        '''turn the parameters of the whole model into those of one island, which evolves the subpopulation `island`'''
+        params = parameters.params
+        subpop = f"{EvolutionState.P_POP}.{Population.P_SUBPOP}"
+        source = island if f"{subpop}.{island}" in params else 0
+        for key, value in list(params.items()):
+            if key == f"{subpop}.{source}" or key.startswith(f"{subpop}.{source}."):
+                params[f"{subpop}.0" + key[len(f"{subpop}.{source}"):]] = value
+        for key, value in list(params.items()):
+            # e.g., breed.elite.<i>
+            if key.startswith("breed.") and key.endswith(f".{source}"):
+                params[key[:-len(str(source))] + "0"] = value
+        params[f"{EvolutionState.P_POP}.{Population.P_SIZE}"] = "1"
+
+        # every island writes its own statistics
+        return Statistics.suffixFiles(parameters, f".island{island}")
+
+
+def _runIsland(args:list[str], job:int, island:int, inboxes:list):
+    from src.ec.evolve import Evolve
+
+    IslandExchanger.island = island
+    IslandExchanger.inboxes = inboxes
+
+    parameters = IslandExchanger.islandParameters(Evolve.loadParameterDatabase(args), island)
+    # every island gets its own random seeds
+    state = Evolve.initialize(parameters, job * len(inboxes) + island)
+    state.output.message(f"Job: {job} Island: {island}")
+    state.job = [job]
+    state.runtimeArguments = args
+    state.startFresh()
+    state.run()
+
+
+class _MigrantPickler(pickle.Pickler):
+    # the trees, the individual and the species are left out, the receiving island has its own
+    def persistent_id(self, obj):
+        if isinstance(obj, (GPTree, GPIndividual, GPSpecies)):
+            return 0
+        return None
+
+class _MigrantUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        return None
+
+
+def encodeMigrant(ind:GPIndividual) -> bytes:
+    '''
+    the compact form of an individual to send to another island: its fitness value and the node graphs of its trees
+    (with the type of each LGP instruction), but none of the objects that the receiving island already has, such as
+    the species, the registers or the compiled program
+    '''
+    buffer = io.BytesIO()
+    trees = [(getattr(tree, 'type', None), tree.child) for tree in ind.treelist]
+    _MigrantPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump((ind.fitness.value, trees))
+    return buffer.getvalue()
+
+def decodeMigrant(data:bytes, template:GPIndividual) -> GPIndividual:
+    '''rebuild an individual encoded by encodeMigrant, using an individual of the receiving island as the template'''
+    value, trees = _MigrantUnpickler(io.BytesIO(data)).load()
+    ind = template.lightClone()
+    prototype = template.treelist[0]
+    ind.treelist = []
+    for type, root in trees:
+        tree = prototype.lightClone()
+        tree.child = root
+        tree.owner = ind
+        root.parent = tree
+        root.argposition = 0
+        if type is not None:
+            tree.type = type
+        ind.treelist.append(tree)
+    ind.fitness.value = value
+    ind.evaluated = True
+    if hasattr(ind, 'updateStatus'):
+        ind.updateStatus()
+    return ind
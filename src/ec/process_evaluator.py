@@ -0,0 +1,118 @@
+from tasks.problem import Problem
+from src.ec import EvolutionState
+from src.ec.evaluator import Evaluator
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+class ProcessEvaluator(Evaluator):
+    """
+    evaluating the individuals in `evalthreads` worker processes, so that the evaluation is not serialized by the GIL.
+    the large arrays of the problem (e.g., the training and validation data) are put into shared memory once per run,
+    and the workers receive a copy of the problem without them. The individuals are sent to the workers in the compact
+    form of Problem.remoteTask, and only their fitness values come back from Problem.remoteFitness, the paired hook
+    that computes them. The individuals that the problem gives no task are evaluated in the main process while the
+    workers are busy, and those whose task gives no fitness (None) are evaluated there afterwards.
+    """
+
+    # the number of task chunks per worker process, to balance the programs of different lengths
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, p_problem=None, numTests=1, cloneProblem=False):
+        super().__init__(p_problem, numTests, cloneProblem)
+        self.executor:ProcessPoolExecutor = None
+        self.blocks:list[SharedMemory] = []
+        self.shared = None  # the shared arrays of the problem that the workers currently map
+        self.workers = 0  # the number of running workers
+
+    def evaluateIndividuals(self, state:EvolutionState):
+        if state.evalthreads <= 1:
+            return super().evaluateIndividuals(state)
+
+        self.startWorkers(state, state.evalthreads)
+
+        for pop_index, subpop in enumerate(state.population.subpops):
+            self.evaluateSubpopulation(state, subpop.individuals, pop_index, state.evalthreads)
+
+    def evaluateSubpopulation(self, state:EvolutionState, individuals:list, pop_index:int, workers:int):
+        '''evaluate the individuals of a subpopulation in the running worker processes'''
+        remote = []
+        tasks = []
+        for ind in individuals:
+            task = self.p_problem.remoteTask(ind)
+            if task is not None:
+                remote.append(ind)
+                tasks.append(task)
+
+        size = max(1, -(-len(tasks) // (workers * self.CHUNKS_PER_WORKER)))
+        futures = [self.executor.submit(_evaluateTasks, tasks[i:i + size]) for i in range(0, len(tasks), size)]
+
+        # the other individuals are evaluated here in the meantime
+        sent = {id(ind) for ind in remote}
+        local = [ind for ind in individuals if id(ind) not in sent]
+        self.p_problem.evaluateBatch(state, local, pop_index, 0)
+
+        fitnesses = [f for future in futures for f in future.result()]
+        unevaluated = []
+        for ind, fitness in zip(remote, fitnesses):
+            if fitness is None:
+                unevaluated.append(ind)
+                continue
+            ind.fitness.setFitness(state, fitness)
+            ind.evaluated = True
+        if len(unevaluated) > 0:
+            self.p_problem.evaluateBatch(state, unevaluated, pop_index, 0)
+
+    def startWorkers(self, state:EvolutionState, workers:int):
+        '''
+        put the shared arrays of the problem into shared memory and start the given number of workers, unless they
+        are running
+        '''
+        arrays = self.p_problem.sharedArrays()
+        if self.executor is not None and self.shared is not None and arrays.keys() == self.shared.keys() \
+                and all(arrays[name] is self.shared[name] for name in arrays) and self.workers == workers:
+            return
+        self.closeWorkers()
+
+        specs = {}
+        for name, array in arrays.items():
+            block = SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            specs[name] = (block.name, array.shape, array.dtype.str)
+
+        self.shared = arrays
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                            initargs=(self.p_problem.workerCopy(), specs))
+
+    def closeWorkers(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+        self.shared = None
+        self.workers = 0
+
+    def closeContacts(self, state:EvolutionState, result:int):
+        self.closeWorkers()
+
+
+# the problem of a worker process, whose shared arrays are mapped from the shared memory of the main process
+_problem:Problem = None
+_blocks:list[SharedMemory] = []
+
+def _initWorker(problem:Problem, specs:dict):
+    global _problem
+    for name, (blockname, shape, dtype) in specs.items():
+        # the workers share the resource tracker of the main process, which unlinks the memory in closeWorkers
+        block = SharedMemory(name=blockname)
+        _blocks.append(block)
+        setattr(problem, name, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    _problem = problem
+
+def _evaluateTasks(tasks:list) -> list[float | None]:
+    return [_problem.remoteFitness(task) for task in tasks]
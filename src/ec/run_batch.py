@@ -0,0 +1,94 @@
+from src.ec import EvolutionState
+from src.ec.evaluator import Evaluator
+import threading
+
+class RunBatch:
+    """
+    advancing several independent runs (e.g., the jobs of one invocation) in lockstep in one process. Every run
+    keeps its own random number generators and statistics files, and breeds in its own thread, but the populations
+    of all runs are evaluated together: each generation waits until every unfinished run has bred, and the individuals
+    of all runs are then given at once to Problem.evaluateRuns, which pools their work into larger batches (e.g., the
+    programs of the runs on the same data are executed in one batch). The evaluators of the runs only look up their
+    fitness caches, so the individuals are evaluated in thread 0 of their run, as by a single evaluation thread.
+
+    parameters:
+        batch-runs = 10     (the number of jobs run together, see Evolve)
+    """
+
+    def __init__(self, states:list[EvolutionState]):
+        self.states = states
+        self.condition = threading.Condition()
+        self.active = len(states)  # the runs that are not finished
+        self.waiting = []  # the runs waiting for the evaluation of their population
+        self.round = 0
+        self.error = None
+
+    @staticmethod
+    def supports(state:EvolutionState) -> bool:
+        '''whether the run evaluates its whole population once per generation, which the lockstep relies on'''
+        return type(state).evolve is EvolutionState.evolve
+
+    def run(self):
+        '''start all runs fresh, and evolve them until all of them are finished'''
+        for state in self.states:
+            state.startFresh()
+            if type(state.evaluator) is not Evaluator:
+                state.output.warning(f"The run of job {state.job[0]} is evaluated together with the other runs of the batch instead of by {type(state.evaluator).__name__}.")
+            # the evaluation of the population (after the lookups in the fitness cache) is handed over to the batch
+            state.evaluator.evaluateIndividuals = self.evaluate
+
+        threads = [threading.Thread(target=self.runState, args=(state,), name=f"job{state.job[0]}") for state in self.states]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def runState(self, state:EvolutionState):
+        try:
+            state.run()
+        except BaseException as e:
+            with self.condition:
+                if self.error is None:
+                    self.error = e
+        finally:
+            self.leave()
+
+    def evaluate(self, state:EvolutionState):
+        '''wait until the other runs are ready, and evaluate the populations of all of them'''
+        with self.condition:
+            self.waiting.append(state)
+            current = self.round
+            if len(self.waiting) >= self.active:
+                self.evaluateAll()
+            else:
+                while self.round == current and self.error is None:
+                    self.condition.wait()
+            if self.error is not None:
+                raise RuntimeError("the evaluation of another run of the batch failed")
+
+    def leave(self):
+        '''a run is finished, so the others do not wait for it any more'''
+        with self.condition:
+            self.active -= 1
+            if len(self.waiting) > 0 and len(self.waiting) >= self.active:
+                self.evaluateAll()
+
+    def evaluateAll(self):
+        '''evaluate the populations of the waiting runs. Called with the condition held'''
+        try:
+            pools = {}
+            for state in self.waiting:
+                problem = state.evaluator.p_problem
+                for pop_index, subpop in enumerate(state.population.subpops):
+                    pools.setdefault(type(problem), []).append((problem, state, subpop.individuals, pop_index))
+            for problemClass, runs in pools.items():
+                problemClass.evaluateRuns(runs, 0)
+        except BaseException as e:
+            if self.error is None:
+                self.error = e
+        finally:
+            self.waiting = []
+            self.round += 1
+            self.condition.notify_all()
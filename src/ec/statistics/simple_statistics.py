@@ -113,6 +113,13 @@ class SimpleStatistics(Statistics):
                 state.output.message(
                     f"Subpop {x} best fitness of generation{eval_status}"
                     f"{self.best_i[x].fitness.value}")
+
+        if self.doGeneration and (state.generation % self.generation_skip == 0) \
+            or state.generation == 0 \
+            or state.generation == state.numGenerations-1:
+            report = state.evaluator.evaluationReport(state)
+            if report:
+                state.output.println(report, self.statisticslog)
             
             # if (self.doGeneration and self.doPerGenerationDescription and 
             #     isinstance(state.evaluator.p_problem, SimpleProblemForm)):
@@ -1,5 +1,6 @@
 
 from src.ec.util import *
+import os
 from src.ec.evolution_state import EvolutionState
 
 class Statistics:
@@ -53,6 +54,20 @@ class Statistics:
             )
             self.children[x].setup(state, p)
     
+    @staticmethod
+    def suffixFiles(parameters:ParameterDatabase, suffix:str) -> ParameterDatabase:
+        '''
+        add suffix (e.g., ".job3") to the names of the statistics files of the parameters, before their extensions, so
+        that several runs write their own files. The silent.file switches are not file names and are kept
+        '''
+        params = parameters.params
+        for key, value in list(params.items()):
+            if key.startswith(EvolutionState.P_STATISTICS + ".") and key.endswith(".file") \
+                    and not key.endswith("." + Statistics.P_SILENT_FILE):
+                root, ext = os.path.splitext(value)
+                params[key] = f"{root}{suffix}{ext}"
+        return parameters
+
     def preInitializationStatistics(self, state):
         for child in self.children:
             child.preInitializationStatistics(state)
@@ -0,0 +1,182 @@
+from src.ec.evolution_state import EvolutionState
+from src.ec.selection_method import SelectionMethod
+from src.ec.util.parameter import Parameter
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from random import Random
+
+class SteadyStateEvolutionState(EvolutionState):
+    '''
+    asynchronous steady-state evolution. After the initial population is evaluated, `evalthreads` offspring are
+    always being evaluated. Whenever one of them finishes, it replaces an individual chosen by the deselector
+    (e.g., a TournamentSelection with pick-worst = true), and a new offspring is bred by the breeding pipeline of the
+    species and sent to evaluation at once. So the breeding never waits for the slowest evaluation of a generation.
+
+    the statistics see a "generation" every `steady.interval` evaluations (the total population size by default).
+    The budget of evaluations is the number of evaluations, or the generations times the interval.
+
+    the offspring are looked up in the fitness cache of the evaluator (eval.cache-size, eval.disk-cache) and evaluated
+    by the evaluation threads of the state. So an evaluator that evaluates in another way (e.g., a ProcessEvaluator)
+    only evaluates the initial population.
+
+    parameters:
+        state = src.ec.SteadyStateEvolutionState
+        steady.deselector = src.lgp.individual.reproduce.TournamentSelection
+        steady.deselector.pick-worst = true
+        steady.interval = 250     (optional)
+    '''
+
+    P_STEADY = "steady"
+    P_DESELECTOR = "deselector"
+    P_INTERVAL = "interval"
+
+    def __init__(self):
+        super().__init__()
+        self.deselector:SelectionMethod = None
+        self.interval = 0
+        self.evaluations = 0  # the number of finished evaluations
+        self.budget = 0  # the total number of evaluations of the run
+        self.submitted = 0  # the number of individuals sent to evaluation
+        self.executor:ThreadPoolExecutor = None
+        self.inFlight:dict[Future, tuple] = {}
+        self.problems = []
+        self.breedthread = 0  # the index of the random number generator of the breeding
+
+    def setup(self, base:str=""):
+        super().setup(base)
+
+        p = Parameter(self.P_STEADY)
+        if not self.parameters.exists(p.push(self.P_DESELECTOR)):
+            self.output.fatal(f"Steady-state evolution needs a deselector: {p.push(self.P_DESELECTOR)}")
+        self.deselector = self.parameters.getInstanceForParameter(p.push(self.P_DESELECTOR), None, SelectionMethod)
+        self.deselector.setup(self, p.push(self.P_DESELECTOR))
+        if getattr(self.deselector, 'pickWorst', True) is False:
+            self.output.warning(f"The deselector of the steady-state evolution picks the better individuals to be replaced: {p.push(self.P_DESELECTOR)}")
+
+        self.interval = self.parameters.getIntWithDefault(p.push(self.P_INTERVAL), None, 0)
+        if self.interval < 0:
+            self.output.fatal(f"The interval of the steady-state statistics must be >= 1, or 0 for the population size: {p.push(self.P_INTERVAL)}")
+
+        from src.ec.evaluator import Evaluator
+        if type(self.evaluator).evaluateIndividuals is not Evaluator.evaluateIndividuals:
+            self.output.warning(f"The steady-state evolution evaluates the offspring in its own threads, "
+                                f"{type(self.evaluator).__name__} only evaluates the initial population")
+
+    def startFresh(self):
+        # the generations are counted in intervals of evaluations, which super().startFresh() cannot divide
+        numEvaluations = self.parameters.getInt(self.P_EVALUATIONS, None) if self.parameters.exists(self.P_EVALUATIONS) else self.UNDEFINED
+        super().startFresh()
+
+        popsize = sum(len(subpop.individuals) for subpop in self.population.subpops)
+        if self.interval == 0:
+            self.interval = popsize
+        if numEvaluations > self.UNDEFINED:
+            self.numGenerations = max(1, 1 + (numEvaluations - popsize) // self.interval)
+        self.budget = popsize + (self.numGenerations - 1) * self.interval
+        self.numEvaluations = self.budget
+        self.evaluations = 0
+        self.submitted = 0
+
+    def evolve(self):
+        if self.generation == 0:
+            # the initial population is evaluated as a whole
+            self.statistics.preEvaluationStatistics(self)
+            self.evaluator.evaluatePopulation(self)
+            self.evaluations = self.submitted = sum(len(subpop.individuals) for subpop in self.population.subpops)
+            self.statistics.postEvaluationStatistics(self)
+            self.startBreeding()
+        else:
+            self.output.message(f"Generation {self.generation} (evaluations {self.evaluations})")
+            self.statistics.preEvaluationStatistics(self)
+            target = min(self.budget, self.evaluations + self.interval)
+            if self.evaluator.fitnessCache is not None:
+                self.evaluator.fitnessCache.startGeneration()
+            while self.evaluations < target:
+                self.collect()
+            self.statistics.postEvaluationStatistics(self)
+
+        # record best fitness
+        tmp_best_of_run = None
+        for subpop in self.population.subpops:
+            for individual in subpop.individuals:
+                if tmp_best_of_run is None or individual.fitness.betterThan(tmp_best_of_run.fitness):
+                    tmp_best_of_run = individual
+        if self.previous_best_ind is None or tmp_best_of_run.fitness.betterThan(self.previous_best_ind.fitness):
+            self.previous_best_ind = tmp_best_of_run.clone()
+            self.num_gen_trap_fit = 0
+        else:
+            self.num_gen_trap_fit = self.num_gen_trap_fit + 1
+
+        # SHOULD WE QUIT?
+        if self.evaluator.runComplete(self) and self.quitOnRunComplete:
+            self.output.message("Found Ideal Individual")
+            return self.R_SUCCESS
+
+        if self.generation == self.numGenerations - 1:
+            return self.R_FAILURE
+
+        self.generation += 1
+        return self.R_NOTDONE
+
+    def startBreeding(self):
+        '''start the evaluation threads and fill them with offspring'''
+        threads = max(1, self.evalthreads)
+        self.executor = ThreadPoolExecutor(max_workers=threads)
+        self.problems = [self.evaluator.p_problem.threadCopy() for _ in range(threads)]
+
+        # the breeding runs alongside the evaluation threads, so it gets its own random number generator
+        self.breedthread = len(self.random)
+        self.random.append(Random(self.random[0].randrange(1 << 31)))
+
+        for subpop in range(len(self.population.subpops)):
+            self.population.subpops[subpop].species.pipe_prototype.prepareToProduce(self, subpop, self.breedthread)
+        for thread in range(threads):
+            self.submit(thread)
+
+    def submit(self, thread:int):
+        '''breed one offspring and evaluate it in the given evaluation thread, unless the budget is spent'''
+        if self.submitted >= self.budget:
+            return
+        # the subpopulations take turns
+        subpop = self.submitted % len(self.population.subpops)
+        self.submitted += 1
+
+        child = [None]
+        self.population.subpops[subpop].species.pipe_prototype.produce(1, 1, 0, subpop, child, self, self.breedthread)
+        # the offspring found in the fitness cache are marked evaluated, which the evaluation skips
+        cached = None
+        if self.evaluator.fitnessCache is not None:
+            cached = self.evaluator.fitnessCache.lookup(self.evaluator.p_problem, child, newGeneration=False)
+        future = self.executor.submit(self.problems[thread].evaluateBatch, self, child, subpop, thread)
+        self.inFlight[future] = (child[0], subpop, thread, cached)
+
+    def collect(self):
+        '''wait for evaluations to finish, put the evaluated offspring into the population and breed new ones'''
+        done, _ = wait(self.inFlight, return_when=FIRST_COMPLETED)
+        # in the order of submission, which keeps the run reproducible with a single evaluation thread
+        for future in [f for f in self.inFlight if f in done]:
+            child, subpop, thread, cached = self.inFlight.pop(future)
+            future.result()
+            if cached is not None:
+                self.evaluator.fitnessCache.store(*cached)
+            self.insert(child, subpop)
+            self.evaluations += 1
+            self.submit(thread)
+
+    def insert(self, child, subpop:int):
+        '''replace the individual picked by the deselector with the evaluated offspring'''
+        victim = self.deselector.produce_select(subpop, self, self.breedthread)
+        self.population.subpops[subpop].individuals[victim] = child
+        if hasattr(self.deselector, 'individualReplaced'):
+            self.deselector.individualReplaced(self, subpop, self.breedthread, victim)
+
+    def finish(self, result:int):
+        if self.executor is not None:
+            # the evaluations still running when the run stopped early are dropped
+            for future in self.inFlight:
+                future.cancel()
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self.inFlight = {}
+            for subpop in range(len(self.population.subpops)):
+                self.population.subpops[subpop].species.pipe_prototype.finishProducing(self, subpop, self.breedthread)
+        super().finish(result)
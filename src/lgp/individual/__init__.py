@@ -1,8 +1,15 @@
 from .gp_tree_struct import GPTreeStruct
+from .lgp_bytecode import LGPBytecode
+from .lgp_codegen import compileBytecode
+from .lgp_numba import runNumba, NUMBA_AVAILABLE
 from .lgp_individual import LGPIndividual, AtomicInteger, LGPDefaults
 
 __all__ = [
     'GPTreeStruct',
+    'LGPBytecode',
+    'compileBytecode',
+    'runNumba',
+    'NUMBA_AVAILABLE',
     'LGPIndividual',
     'AtomicInteger',
     'LGPDefaults'
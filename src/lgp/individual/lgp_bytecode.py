@@ -0,0 +1,627 @@
+from src.ec.gp_node import GPNode
+from src.lgp.individual.gp_tree_struct import GPTreeStruct
+from src.lgp.individual.primitive import *
+from src.lgp.individual.primitive.kernels import KERNELS, BOUND, getKernel, OP_MOV, OP_ADD, OP_SUB, OP_MUL, OP_MIN, OP_MAX
+
+from collections import OrderedDict
+from typing import Optional
+import math
+import threading
+import numpy as np
+
+# the maximum number of elements of the slot tensor of LGPBytecode.runBatch (i.e., 128 MB of float64)
+MAX_BATCH_ELEMENTS = 1 << 24
+
+
+class LGPBytecode:
+    '''
+    A flat register-machine form of the effective instructions of an LGPIndividual.
+
+    Every row of `code` is (op, dst, src1, src2). Operands index a single slot space:
+    [0, numRegs) are the registers, [numRegs, numRegs+numTemps) are temporaries for the
+    intermediate nodes of an instruction, followed by one slot per input feature in `features`
+    and one slot per constant in `constants`. Unary operations have src2 = -1.
+    '''
+
+    def __init__(self, numRegs: int):
+        self.numRegs = numRegs
+        self.numTemps = 0
+        self.code: np.ndarray = np.zeros((0, 4), dtype=np.int64)
+        self.features: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.constants: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.featureRanges: set[int] = set()
+        self.instrs: list[tuple] = []  # the code as python tuples, faster to iterate in the NumPy VM
+        self.numSimplified = 0  # the number of node evaluations saved by the simplification
+        self.boundaries: list[int] = []  # the positions in the code where an instruction ends, so no temporary is live
+
+    @property
+    def featureBase(self) -> int:
+        return self.numRegs + self.numTemps
+
+    @property
+    def constantBase(self) -> int:
+        return self.numRegs + self.numTemps + len(self.features)
+
+    @property
+    def numSlots(self) -> int:
+        return self.constantBase + len(self.constants)
+
+    def __len__(self):
+        return len(self.code)
+
+    @classmethod
+    def compile(cls, trees: list[GPTreeStruct], numRegs: int, simplify: bool = False) -> Optional['LGPBytecode']:
+        '''
+        lower the given instructions into bytecode.
+        return None if an instruction contains a primitive that has no opcode,
+        in which case the caller has to use the tree interpreter.
+        if simplify, constant subexpressions are folded and the operations that are exact identities are dropped.
+        the instructions themselves are not changed.
+        '''
+        prog = cls(numRegs)
+        compiler = _Compiler(numRegs, simplify)
+        try:
+            for tree in trees:
+                compiler.compileInstr(tree.child)
+                prog.boundaries.append(len(compiler.code))
+        except _Unsupported:
+            return None
+
+        # relocate the feature and constant operands behind the temporaries
+        prog.numTemps = compiler.maxTemps
+        fbase = prog.featureBase
+        cbase = fbase + len(compiler.features)
+
+        def relocate(operand):
+            kind, v = operand
+            if kind == _SLOT:
+                return v
+            if kind == _FEATURE:
+                return fbase + v
+            if kind == _CONST:
+                return cbase + v
+            return -1
+
+        prog.instrs = [(op, dst, relocate(a), relocate(b)) for op, dst, a, b in compiler.code]
+        if prog.instrs:
+            prog.code = np.array(prog.instrs, dtype=np.int64)
+        prog.features = np.array(compiler.features, dtype=np.int64)
+        prog.constants = np.array(compiler.constants, dtype=np.float64)
+        prog.featureRanges = compiler.featureRanges
+        prog.numSimplified = compiler.numSimplified
+        return prog
+
+    def key(self) -> tuple:
+        '''a canonical and hashable form of the program. Individuals with the same effective instructions share it'''
+        return (self.numRegs, self.numTemps, tuple(self.instrs), self.features.tobytes(), self.constants.tobytes())
+
+    @classmethod
+    def fromKey(cls, key: tuple) -> 'LGPBytecode':
+        '''rebuild the program from its canonical key, e.g., after sending the key to another process'''
+        numRegs, numTemps, instrs, features, constants = key
+        prog = cls(numRegs)
+        prog.numTemps = numTemps
+        prog.instrs = list(instrs)
+        if prog.instrs:
+            prog.code = np.array(prog.instrs, dtype=np.int64)
+        prog.features = np.frombuffer(features, dtype=np.int64).copy()
+        prog.constants = np.frombuffer(constants, dtype=np.float64).copy()
+        return prog
+
+    def resolvedCode(self) -> list[tuple]:
+        '''the code with the feature and constant operands replaced by the features and the constant values they read'''
+        fbase, cbase = self.featureBase, self.constantBase
+
+        def resolve(s):
+            if s < fbase:
+                return s
+            if s < cbase:
+                return ('x', int(self.features[s - fbase]))
+            return ('c', float(self.constants[s - cbase]))
+
+        return [(op, dst, resolve(a), resolve(b)) for op, dst, a, b in self.instrs]
+
+    def checkpoints(self, count: int) -> list[int]:
+        '''at most `count` boundaries spread over the code (including its end), at which the registers are saved'''
+        positions = sorted(set(b for b in self.boundaries if b > 0))
+        if len(positions) <= count:
+            return positions
+        return [positions[len(positions) * (i + 1) // count - 1] for i in range(count)]
+
+    def matches(self, problem) -> bool:
+        '''check if the input features were compiled against the data dimension of the problem'''
+        if not hasattr(problem, 'datadim'):
+            return True
+        return all(r == problem.datadim for r in self.featureRanges)
+
+    def run(self, registers: list, X: np.ndarray):
+        '''
+        execute the bytecode over all rows of X. `registers` holds the initial values (floats or columns) and is
+        updated in place.
+        the registers and temporaries live in the register file of the calling thread, which is reused by the
+        next execution in that thread. So the resulting registers are (n, 1) views that must be consumed (e.g.,
+        concatenated) before executing another program.
+        '''
+        n = X.shape[0]
+        regfile = RegisterFile.get()
+        XT = regfile.transposed(X)
+        slots = regfile.slots(self.numRegs + self.numTemps, n, XT.dtype)
+        scratch = regfile.scratch(n, XT.dtype)
+
+        vals = [slots[s, :n] for s in range(self.numRegs + self.numTemps)]
+        for r in range(self.numRegs):
+            v = registers[r]
+            vals[r][:] = v.reshape(n) if isinstance(v, np.ndarray) else v
+        vals.extend(XT[f] for f in self.features)
+        vals.extend(self.constants.tolist())
+
+        kernels = [k.kernel if k is not None else None for k in KERNELS]
+        with np.errstate(all='ignore'):
+            for op, dst, a, b in self.instrs:
+                kernels[op](vals[a], vals[b], vals[dst], True, scratch)
+
+        for r in range(self.numRegs):
+            registers[r] = vals[r][:, None]
+
+    def runScalar(self, registers: list, x):
+        '''execute the bytecode on one sample x (a sequence of features) with python floats. `registers` is updated in place'''
+        vals = list(registers)
+        vals.extend([None] * self.numTemps)
+        vals.extend(float(x[f]) for f in self.features)
+        vals.extend(self.constants.tolist())
+
+        for op, dst, a, b in self.instrs:
+            vals[dst] = KERNELS[op].scalar(vals[a], vals[b] if b >= 0 else None)
+
+        registers[:self.numRegs] = vals[:self.numRegs]
+
+    @staticmethod
+    def runBatch(programs: list['LGPBytecode'], X: np.ndarray, initial: float = 0.0, resume: list = None,
+                 snapshots: list = None, columns: 'ColumnCache' = None) -> np.ndarray:
+        '''
+        execute several programs over all rows of X at once, and return their registers as a (pop, numRegs, n) tensor.
+
+        the slot files of the programs are stacked into one (pop, numSlots, n) tensor. The instructions are executed
+        position by position, and the programs having the same opcode at a position are executed by one kernel call.
+        resume optionally gives every program a (position, registers) to start from instead of the beginning (or None),
+        and snapshots a Snapshots (or None) to save its registers at its checkpoints into. With a ColumnCache, the
+        input-only subexpressions of the programs are read from the columns of the cache instead of being computed.
+        '''
+        pop = len(programs)
+        n = X.shape[0]
+        dtype = np.result_type(X.dtype, np.float32)
+        resume = resume if resume is not None else [None] * pop
+        snapshots = snapshots if snapshots is not None else [None] * pop
+        # the code of every program, the subexpressions it reads behind its constants, and its positions in the code
+        rewritten = [p.withColumns(initial) if columns is not None else (p.code, [], None) for p in programs]
+        numRegs = max(p.numRegs for p in programs)
+        numSlots = max(p.numSlots + len(keys) for p, (_, keys, _) in zip(programs, rewritten))
+
+        # bound the size of the slot tensor by executing large populations part by part
+        if pop > 1 and pop * numSlots * n > MAX_BATCH_ELEMENTS:
+            half = pop // 2
+            first = LGPBytecode.runBatch(programs[:half], X, initial, resume[:half], snapshots[:half], columns)
+            second = LGPBytecode.runBatch(programs[half:], X, initial, resume[half:], snapshots[half:], columns)
+            res = np.full((pop, numRegs, n), initial, dtype=dtype)
+            res[:half, :first.shape[1]] = first
+            res[half:, :second.shape[1]] = second
+            return res
+
+        def position(i, pos):
+            where = rewritten[i][2]
+            return where[pos] if where is not None else pos
+
+        starts = [position(i, r[0]) if r is not None else 0 for i, r in enumerate(resume)]
+        length = max(len(c) - start for (c, _, _), start in zip(rewritten, starts))
+        slots = np.empty((pop, numSlots, n), dtype=dtype)
+        slots[:, :numRegs] = initial
+        code = np.full((pop, length, 4), -1, dtype=np.int64)  # positions behind the end of a program have op = -1
+        captures = {}  # the programs to save the registers of before each step
+        for i, (p, (pcode, keys, _)) in enumerate(zip(programs, rewritten)):
+            if starts[i] > 0:
+                slots[i, :p.numRegs] = resume[i][1]
+            slots[i, p.featureBase:p.constantBase] = X[:, p.features].T
+            slots[i, p.constantBase:p.numSlots] = p.constants[:, None]
+            for k, key in enumerate(keys):
+                slots[i, p.numSlots + k] = columns.column(key, X, dtype)
+            code[i, :len(pcode) - starts[i]] = pcode[starts[i]:]
+            if snapshots[i] is not None:
+                for pos in snapshots[i].positions:
+                    if position(i, pos) >= starts[i]:
+                        captures.setdefault(position(i, pos) - starts[i], []).append((i, pos))
+        code[:, :, 3] = np.maximum(code[:, :, 3], 0)  # unary operations simply ignore their second operand
+
+        saved = [{} for _ in programs]
+        with np.errstate(all='ignore'):
+            for t in range(length + 1):
+                for i, pos in captures.get(t, ()):
+                    saved[i][pos] = slots[i, :programs[i].numRegs].copy()
+                if t == length:
+                    break
+                ops = code[:, t, 0]
+                for op in np.unique(ops):
+                    if op < 0:
+                        continue
+                    sel = np.flatnonzero(ops == op)
+                    _, dst, a, b = code[sel, t].T
+                    slots[sel, dst] = KERNELS[op].kernel(slots[sel, a], slots[sel, b])
+
+        for snapshot, registers in zip(snapshots, saved):
+            if snapshot is not None:
+                snapshot.registers = registers
+        return slots[:, :numRegs]
+
+    def withColumns(self, initial: float = 0.0) -> tuple[np.ndarray, list[tuple], list[int]]:
+        '''
+        the code with its input-only subexpressions (the operations reading only features, constants, registers that
+        still hold their `initial` value and other input-only subexpressions) read from extra slots behind the constants
+        instead of being computed. return the code, the keys of the subexpressions in the extra slots (see
+        ColumnCache), and the position in the new code of every position of the code and of its end
+        '''
+        fbase, cbase = self.featureBase, self.constantBase
+        pending = {}  # the temporaries holding an input-only subexpression, which is not computed
+        written = set()  # the registers that no longer hold the initial value
+        keys = []
+        slotOf = {}
+
+        def keyOf(s):
+            if s in pending:
+                return pending[s]
+            if 0 <= s < self.numRegs and s not in written:
+                return ('c', float(initial))
+            if fbase <= s < cbase:
+                return ('x', int(self.features[s - fbase]))
+            if s >= cbase:
+                return ('c', float(self.constants[s - cbase]))
+            return None
+
+        def columnSlot(key):
+            if key not in slotOf:
+                slotOf[key] = self.numSlots + len(keys)
+                keys.append(key)
+            return slotOf[key]
+
+        def operand(s):
+            # an operand of a computed operation, reading a subexpression from its slot
+            return columnSlot(pending.pop(s)) if s in pending else s
+
+        code = []
+        where = []
+        for op, dst, a, b in self.instrs:
+            where.append(len(code))
+            ka = keyOf(a)
+            kb = keyOf(b) if b >= 0 else None
+            if op != OP_MOV and ka is not None and (b < 0 or kb is not None):
+                # the sum and the product are commutative, also in floating point
+                if op in (OP_ADD, OP_MUL) and repr(kb) < repr(ka):
+                    ka, kb = kb, ka
+                pending.pop(a, None)
+                pending.pop(b, None)
+                if dst >= self.numRegs:
+                    pending[dst] = (op, ka, kb)
+                else:
+                    code.append((OP_MOV, dst, columnSlot((op, ka, kb)), -1))
+                    written.add(dst)
+                continue
+            code.append((op, dst, operand(a), operand(b) if b >= 0 else b))
+            pending.pop(dst, None)
+            if dst < self.numRegs:
+                written.add(dst)
+        where.append(len(code))
+
+        array = np.array(code, dtype=np.int64) if code else np.zeros((0, 4), dtype=np.int64)
+        return array, keys, where
+
+
+class ColumnCache:
+    '''
+    the columns of the input-only subexpressions of the programs (keyed as by LGPBytecode.withColumns, e.g.,
+    (OP_SIN, ('x', 3), None) for sin(x3)) over the data X, shared by the programs of the population within a memory
+    budget in bytes. The least recently used columns are dropped first, and all of them when the data change.
+    '''
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.columns = OrderedDict()
+        self.size = 0
+        self.X = None
+        self.hits = 0
+        self.lookups = 0
+        self.lock = threading.Lock()
+
+    def column(self, key: tuple, X: np.ndarray, dtype) -> np.ndarray:
+        '''the values of the subexpression over the rows of X'''
+        if key[0] == 'x':
+            return X[:, key[1]]
+        if key[0] == 'c':
+            return np.full(len(X), key[1], dtype=dtype)
+
+        with self.lock:
+            if X is not self.X:
+                self.columns.clear()
+                self.size = 0
+                self.X = X
+            self.lookups += 1
+            column = self.columns.get((key, np.dtype(dtype).str))
+            if column is not None:
+                self.columns.move_to_end((key, np.dtype(dtype).str))
+                self.hits += 1
+                return column
+
+        op, ka, kb = key
+        a = self.column(ka, X, dtype)
+        b = self.column(kb, X, dtype) if kb is not None else a  # unary operations ignore their second operand
+        with np.errstate(all='ignore'):
+            column = np.asarray(KERNELS[op].kernel(a.astype(dtype, copy=False), b.astype(dtype, copy=False)), dtype=dtype)
+        column.setflags(write=False)
+
+        with self.lock:
+            if X is self.X and column.nbytes <= self.budget:
+                self.columns[(key, np.dtype(dtype).str)] = column
+                self.size += column.nbytes
+                while self.size > self.budget:
+                    _, old = self.columns.popitem(last=False)
+                    self.size -= old.nbytes
+        return column
+
+    def report(self) -> str:
+        '''the hit rate since the last report, and the memory held'''
+        with self.lock:
+            rate = 100. * self.hits / self.lookups if self.lookups > 0 else 0.
+            text = (f"Subexpression cache: {self.hits} hits of {self.lookups} ({rate:.1f}%), "
+                    f"{len(self.columns)} columns, {self.size / (1 << 20):.1f} MB")
+            self.hits = self.lookups = 0
+        return text
+
+
+class Snapshots:
+    '''
+    the registers of one execution of a program on the data X at some boundaries between its instructions. The
+    programs sharing a prefix of their code with it (e.g., the mutated offspring of the individual) resume their
+    execution from the last saved registers within the prefix instead of from the beginning.
+    '''
+
+    def __init__(self, code: list[tuple], X: np.ndarray, positions: list[int]):
+        self.code = code  # the resolved code of the program
+        self.X = X
+        self.positions = positions
+        self.registers: dict = {}  # the (numRegs, n) registers by position, emptied when they are dropped
+
+    def nbytes(self) -> int:
+        return sum(r.nbytes for r in self.registers.values())
+
+    def resumePoint(self, program: LGPBytecode, code: list[tuple], X: np.ndarray):
+        '''the (position, registers) from which the program with the resolved code can resume on X, or None'''
+        registers = self.registers
+        if X is not self.X or len(registers) == 0:
+            return None
+        common = 0
+        for a, b in zip(code, self.code):
+            if a != b:
+                break
+            common += 1
+        # the registers are only valid at the boundaries of the program itself, where no temporary is live
+        boundaries = set(program.boundaries)
+        positions = [pos for pos in registers if pos <= common and pos in boundaries
+                     and registers[pos].shape[0] == program.numRegs]
+        if len(positions) == 0:
+            return None
+        return max(positions), registers[max(positions)]
+
+
+class SnapshotStore:
+    '''the snapshots of the recent executions within a memory budget in bytes. The oldest ones are dropped first'''
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.snapshots = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def add(self, snapshots: Snapshots):
+        nbytes = snapshots.nbytes()
+        with self.lock:
+            self.snapshots[id(snapshots)] = (snapshots, nbytes)
+            self.size += nbytes
+            while self.size > self.budget and len(self.snapshots) > 0:
+                _, (old, oldbytes) = self.snapshots.popitem(last=False)
+                self.size -= oldbytes
+                # replaced rather than cleared, as another thread may be reading the registers
+                old.registers = {}
+
+
+class RegisterFile:
+    '''
+    the preallocated buffers of the register machine of one thread: a (slots, n) register file holding the
+    registers and temporaries, a scratch row, and a contiguous transposed copy of the input data.
+    the buffers only grow, so that evaluating programs of different sizes or data of different lengths
+    (e.g., training and validation data) does not allocate again. There is one set of buffers per floating point type.
+    '''
+
+    _local = threading.local()
+
+    def __init__(self):
+        self.buffers: dict = {}
+        self.scratchBuffers: dict = {}
+        self.X = None
+        self.XT = None
+
+    @classmethod
+    def get(cls) -> 'RegisterFile':
+        regfile = getattr(cls._local, 'regfile', None)
+        if regfile is None:
+            regfile = cls()
+            cls._local.regfile = regfile
+        return regfile
+
+    def slots(self, numSlots: int, n: int, dtype=np.float64) -> np.ndarray:
+        buffer = self.buffers.get(dtype)
+        if buffer is None or buffer.shape[0] < numSlots or buffer.shape[1] < n:
+            shape = (numSlots, n) if buffer is None else (max(numSlots, buffer.shape[0]), max(n, buffer.shape[1]))
+            buffer = np.empty(shape, dtype=dtype)
+            self.buffers[dtype] = buffer
+        return buffer
+
+    def scratch(self, n: int, dtype=np.float64):
+        buffer = self.scratchBuffers.get(dtype)
+        if buffer is None or len(buffer) < n:
+            buffer = np.empty(n, dtype=dtype)
+            self.scratchBuffers[dtype] = buffer
+        return buffer[:n]
+
+    def transposed(self, X: np.ndarray) -> np.ndarray:
+        # the features are read as contiguous rows. X is referenced here, so its identity is a valid cache key
+        if X is not self.X:
+            self.X = X
+            self.XT = np.ascontiguousarray(X.T, dtype=np.result_type(X.dtype, np.float32))
+        return self.XT
+
+
+_SLOT = 0
+_FEATURE = 1
+_CONST = 2
+_NONE = 3
+_VALUE = 4  # a constant that is not yet assigned to a constant slot, so that it can still be folded
+
+
+class _Unsupported(Exception):
+    pass
+
+
+class _Compiler:
+
+    def __init__(self, numRegs: int, simplify: bool = False):
+        self.numRegs = numRegs
+        self.simplify = simplify
+        self.code: list[tuple] = []
+        self.features: list[int] = []
+        self.constants: list[float] = []
+        self.constantIndex: dict = {}
+        self.featureRanges: set[int] = set()
+        self.numTemps = 0
+        self.maxTemps = 0
+        self.numSimplified = 0
+        # whether a register or temporary is known to be within the clip bounds (or NaN), so that clipping it again
+        # is a no-op. The registers start from the bounded initial value
+        self.bounded: dict[int, bool] = {r: True for r in range(numRegs)}
+
+    def newTemp(self) -> int:
+        t = self.numRegs + self.numTemps
+        self.numTemps += 1
+        self.maxTemps = max(self.maxTemps, self.numTemps)
+        return t
+
+    def releaseTemps(self, operands):
+        for kind, v in operands:
+            if kind == _SLOT and v >= self.numRegs:
+                self.numTemps -= 1
+
+    def leaf(self, node: GPNode):
+        if isinstance(node, ReadRegisterGPNode):
+            return (_SLOT, node.getIndex())
+        if isinstance(node, InputFeatureGPNode):
+            self.featureRanges.add(node.getRange())
+            if node.getIndex() not in self.features:
+                self.features.append(node.getIndex())
+            return (_FEATURE, self.features.index(node.getIndex()))
+        if isinstance(node, ConstantGPNode):
+            return (_VALUE, float(node.getValue()))
+        raise _Unsupported()
+
+    def isBounded(self, operand) -> bool:
+        kind, v = operand
+        if kind == _VALUE:
+            return abs(v) <= BOUND
+        if kind == _SLOT:
+            return self.bounded.get(v, False)
+        return False  # the input features can take any value
+
+    def emit(self, op: int, dst: int, a, b):
+        def materialize(operand):
+            kind, v = operand
+            if kind != _VALUE:
+                return operand
+            key = (v, math.copysign(1., v))  # keep 0. and -0. apart
+            if key not in self.constantIndex:
+                self.constantIndex[key] = len(self.constants)
+                self.constants.append(v)
+            return (_CONST, self.constantIndex[key])
+
+        self.bounded[dst] = self.isBounded(a) if op == OP_MOV else KERNELS[op].bounded
+        self.code.append((op, dst, materialize(a), materialize(b)))
+
+    def compileInstr(self, root: GPNode):
+        if not isinstance(root, WriteRegisterGPNode):
+            raise _Unsupported()
+        dst = root.getIndex()
+        child = root.children[0]
+        if len(child.children) == 0:
+            src = self.leaf(child)
+            if self.simplify and src == (_SLOT, dst):
+                # the instruction copies a register into itself
+                self.numSimplified += 1
+                return
+            self.emit(OP_MOV, dst, src, (_NONE, -1))
+        else:
+            self.compileNode(child, dst)
+
+    def compileNode(self, node: GPNode, dst: int = None):
+        '''emit the operations of the subtree rooted at node, post-order, and return its operand'''
+        if len(node.children) == 0:
+            return self.leaf(node)
+
+        kernel = getKernel(type(node))
+        if kernel is None or len(node.children) > 2:
+            raise _Unsupported()
+        op = kernel.opcode
+
+        args = [self.compileNode(c) for c in node.children]
+        a = args[0]
+        b = args[1] if len(args) > 1 else (_NONE, -1)
+
+        res = self.simplified(op, a, b) if self.simplify else None
+        if res is not None:
+            self.numSimplified += 1
+            self.releaseTemps([arg for arg in args if arg != res])
+            if dst is None or res == (_SLOT, dst):
+                return res
+            self.emit(OP_MOV, dst, res, (_NONE, -1))
+            return (_SLOT, dst)
+
+        self.releaseTemps(args)
+        if dst is None:
+            dst = self.newTemp()
+        self.emit(op, dst, a, b)
+        return (_SLOT, dst)
+
+    def simplified(self, op: int, a, b):
+        '''
+        return the operand that the operation is equivalent to, or None if it has to be executed.
+        constant subexpressions are folded with the kernels themselves. The identities only drop an operation
+        when the other operand is bounded, so that skipping the clip of the operation is exact. x - x and x * 0
+        are not identities for NaN or infinite inputs, so they are kept.
+        '''
+        unary = b[0] == _NONE
+        if a[0] == _VALUE and (unary or b[0] == _VALUE):
+            return (_VALUE, float(KERNELS[op].kernel(a[1], None if unary else b[1])))
+
+        def isValue(operand, value):
+            return operand[0] == _VALUE and operand[1] == value
+
+        if op == OP_ADD:
+            if isValue(b, 0.) and self.isBounded(a):
+                return a
+            if isValue(a, 0.) and self.isBounded(b):
+                return b
+        elif op == OP_SUB:
+            if isValue(b, 0.) and self.isBounded(a):
+                return a
+        elif op == OP_MUL:
+            if isValue(b, 1.) and self.isBounded(a):
+                return a
+            if isValue(a, 1.) and self.isBounded(b):
+                return b
+        elif op in (OP_MIN, OP_MAX):
+            if a == b and self.isBounded(a):
+                return a
+        return None
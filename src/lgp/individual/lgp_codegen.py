@@ -0,0 +1,70 @@
+from src.lgp.individual.lgp_bytecode import LGPBytecode
+from src.lgp.individual.primitive.kernels import KERNELS, OP_MOV
+
+from functools import lru_cache
+from typing import Callable
+import numpy as np
+
+# the maximum number of compiled programs kept in memory
+CODEGEN_CACHE_SIZE = 1024
+
+
+def _column(v, X):
+    # a register assigned by a constant becomes a column, as every other register
+    return v if isinstance(v, np.ndarray) and v.ndim == 2 else np.full((X.shape[0], 1), v, dtype=np.result_type(X.dtype, np.float32))
+
+_NAMESPACE = {'inf': np.inf, 'nan': np.nan, 'column': _column}
+
+
+def compileBytecode(program: LGPBytecode) -> Callable[[list, np.ndarray], None]:
+    '''
+    return a python function `f(registers, X)` specialised to the given bytecode, which executes the program over
+    all rows of X and updates `registers` in place, the same as `program.run(registers, X)`.
+    the functions are cached by the canonical key of the bytecode, so that the clones of an individual share them.
+    '''
+    return _compileKey(program.key())
+
+
+def generateSource(key: tuple) -> str:
+    '''generate the python source of the program of the given bytecode key'''
+    numRegs, numTemps, instrs, features, constants = key
+    features = np.frombuffer(features, dtype=np.int64).tolist()
+    constants = np.frombuffer(constants, dtype=np.float64).tolist()
+    fbase = numRegs + numTemps
+    cbase = fbase + len(features)
+
+    def name(slot):
+        if slot < numRegs:
+            return f'r{slot}'
+        if slot < fbase:
+            return f't{slot - numRegs}'
+        if slot < cbase:
+            return f'x{features[slot - fbase]}'
+        return f'c{slot - cbase}'
+
+    # bind the input features, the constants (in the precision of the data, as the register machine keeps them) and
+    # the registers read by the program to local variables
+    read = {s for _, _, a, b in instrs for s in (a, b) if 0 <= s < numRegs}
+    written = sorted({dst for _, dst, _, _ in instrs if dst < numRegs})
+    lines = ['def lgp_program(R, X):']
+    lines += [f'    x{f} = X[:, {f}:{f + 1}]' for f in features]
+    lines += [f'    c{i} = X.dtype.type({c!r})' for i, c in enumerate(constants)]
+    lines += [f'    r{r} = R[{r}]' for r in sorted(read)]
+    for op, dst, a, b in instrs:
+        if op == OP_MOV:
+            lines.append(f'    {name(dst)} = {name(a)}')
+        else:
+            # the operations call the registered kernels of the primitives
+            lines.append(f'    {name(dst)} = {KERNELS[op].name}({name(a)}, {name(b) if b >= 0 else None})')
+    lines += [f'    R[{r}] = column(r{r}, X)' for r in written]
+    lines.append('    return None')
+    return '\n'.join(lines) + '\n'
+
+
+@lru_cache(maxsize=CODEGEN_CACHE_SIZE)
+def _compileKey(key: tuple) -> Callable[[list, np.ndarray], None]:
+    code = compile(generateSource(key), f'<lgp program {hash(key) & 0xffffffff:08x}>', 'exec')
+    namespace = dict(_NAMESPACE)
+    namespace.update((k.name, k.kernel) for k in KERNELS if k is not None)
+    exec(code, namespace)
+    return namespace['lgp_program']
@@ -7,6 +7,9 @@ from typing import List, Optional, Set, override, Union
 
 from tasks.problem import Problem
 from src.lgp.individual.gp_tree_struct import GPTreeStruct
+from src.lgp.individual.lgp_bytecode import LGPBytecode
+from src.lgp.individual.lgp_codegen import compileBytecode
+from src.lgp.individual.lgp_numba import runNumba, NUMBA_AVAILABLE
 from src.lgp.individual.primitive import *
 # from src.lgp.util.linear_regression import LinearRegression
 
@@ -26,8 +29,17 @@ class LGPIndividual(GPIndividual):
     P_OUTPUTREGISTER = "output-register"
     # P_FLOATOUTPUT = "to-float-outputs"
     P_EFFECTIVE_INITIAL = "effective_initial"
+    P_EXECUTION = "execution"
+    P_SIMPLIFY = "simplify"
     INITIAL_VALUE = 0.0
 
+    # the ways of executing the effective instructions on vectorized inputs
+    V_EXEC_TREE = "tree"
+    V_EXEC_BYTECODE = "bytecode"
+    V_EXEC_CODEGEN = "codegen"
+    V_EXEC_NUMBA = "numba"
+    EXECUTIONS = [V_EXEC_TREE, V_EXEC_BYTECODE, V_EXEC_CODEGEN, V_EXEC_NUMBA]
+
     def __init__(self):
         super().__init__()
         self.privateParameter = None
@@ -47,6 +59,11 @@ class LGPIndividual(GPIndividual):
         self.fastFlag = False
         self.exec_trees:list[GPTreeStruct] = []
         self.preevaluated = False
+        self.execution = self.V_EXEC_TREE
+        self.simplify = True
+        self.program:LGPBytecode = None
+        self.function = None  # the python function generated from the bytecode, only used by the codegen execution
+        self.snapshots = None  # the registers saved during the last execution, which the offspring resume from
 
         # self.tmp_numOutputRegs = 0
         # self.float_numOutputRegs = False
@@ -112,6 +129,19 @@ class LGPIndividual(GPIndividual):
 
         self.eff_initialize = state.parameters.getBoolean(base.push(self.P_EFFECTIVE_INITIAL), def_base.push(self.P_EFFECTIVE_INITIAL), False)
 
+        self.execution = state.parameters.getString(base.push(self.P_EXECUTION), def_base.push(self.P_EXECUTION))
+        if self.execution is None:
+            # the tree interpreter, unless the compiled executions are chosen
+            self.execution = self.V_EXEC_TREE
+        if self.execution not in self.EXECUTIONS:
+            state.output.fatal(f"The execution of an LGPIndividual must be one of {self.EXECUTIONS}.",
+                            base.push(self.P_EXECUTION), def_base.push(self.P_EXECUTION))
+        if self.execution == self.V_EXEC_NUMBA and not NUMBA_AVAILABLE:
+            state.output.warnOnce("Numba is not installed, so the numba execution of LGPIndividual falls back to the NumPy register machine.",
+                            base.push(self.P_EXECUTION), def_base.push(self.P_EXECUTION))
+
+        self.simplify = state.parameters.getBoolean(base.push(self.P_SIMPLIFY), def_base.push(self.P_SIMPLIFY), True)
+
         self.numOutputRegs = state.parameters.getIntWithDefault(base.push(self.P_NUMOUTPUTREGISTERS), def_base.push(self.P_NUMOUTPUTREGISTERS), 1)
         if self.numOutputRegs <= 0:
             state.output.fatal("An LGPIndividual must have at least one output register.",
@@ -189,11 +219,20 @@ class LGPIndividual(GPIndividual):
         # if self.evaluated:
         #     return  [ self.getRegistersIndex(r) for r in self.getOutputRegisters()] 
         
-        # reset the registers
-        if not input.to_vectorize:
+        if input.to_vectorize and len(problem.X) != len(input.values):
+            # the compiled programs execute over the rows of problem.X, the tree interpreter would broadcast them
+            raise ValueError(f"the data of the problem have {len(problem.X)} rows, but the input has {len(input.values)} rows")
+
+        vectorized = input.to_vectorize and self.execution != self.V_EXEC_TREE
+        if vectorized and not self.preevaluated:
+            self.preExecution(state, thread)
+        compiled = vectorized and self.program is not None and self.program.matches(problem)
+
+        # reset the registers. The register machine copies the initial values into its own register file
+        if not input.to_vectorize or (compiled and self.execution in (self.V_EXEC_BYTECODE, self.V_EXEC_NUMBA)):
             self.resetRegisters(problem, self.INITIAL_VALUE)
         else:
-            self.resetRegisters(problem, np.full((len(input.values),1), self.INITIAL_VALUE))
+            self.resetRegisters(problem, np.full((len(input.values),1), self.INITIAL_VALUE, dtype=input.values.dtype))
 
         # check if the individual can be fast executed
         if not self.fastFlag:
@@ -202,22 +241,45 @@ class LGPIndividual(GPIndividual):
             # self.getFlowctrl().reset()
             pass
         
-        if not self.preevaluated or not self.fastFlag:
-            for tree in self.getTreelist():
-                if tree.status:
+        # the kernels of the primitives run under a single error state for the whole program
+        with np.errstate(all='ignore'):
+            if compiled:
+                if self.execution == self.V_EXEC_CODEGEN:
+                    if self.function is None:
+                        self.function = compileBytecode(self.program)
+                    self.function(self.registers, problem.X)
+                elif self.execution == self.V_EXEC_NUMBA:
+                    runNumba(self.program, self.registers, problem.X)
+                else:
+                    self.program.run(self.registers, problem.X)
+            elif vectorized:
+                if self.program is not None:
+                    # let the tree interpreter adapt the input features to the problem, and compile again next time
+                    self.preevaluated = False
+                for tree in self.exec_trees:
+                    tree.child.eval(state, thread, input, individual, problem)
+            elif not self.preevaluated or not self.fastFlag:
+                for tree in self.getTreelist():
+                    if tree.status:
+                        tree.child.eval(state, thread, input, individual, problem)
+                        # tree.postorder_execution(state, thread, input, individual, problem)
+            else:
+                for tree in self.exec_trees:
                     tree.child.eval(state, thread, input, individual, problem)
                     # tree.postorder_execution(state, thread, input, individual, problem)
-        else:
-            for tree in self.exec_trees:
-                tree.child.eval(state, thread, input, individual, problem)
-                # tree.postorder_execution(state, thread, input, individual, problem)
 
-        if self.IsWrap() and with_warp:
-            # if the individual is wrapped, we need to execute the wrapper
-            for instr in self.wraplist:
-                instr.child.eval(state, thread, input, individual, problem)
+            if self.IsWrap() and with_warp:
+                # if the individual is wrapped, we need to execute the wrapper
+                for instr in self.wraplist:
+                    instr.child.eval(state, thread, input, individual, problem)
 
-        return [ self.getRegistersIndex(r) for r in self.getOutputRegisters()] 
+        outputs = [ self.getRegistersIndex(r) for r in self.getOutputRegisters()]
+        if compiled and self.execution in (self.V_EXEC_BYTECODE, self.V_EXEC_NUMBA):
+            # the register machine leaves views of the register file of the thread, which the next program executed by
+            # the thread overwrites. So the outputs are copied out and the registers are not kept
+            outputs = [o.copy() if isinstance(o, np.ndarray) else o for o in outputs]
+            self.resetRegisters(problem, self.INITIAL_VALUE)
+        return outputs
     
     @override
     def preExecution(self, state:EvolutionState, thread:int):
@@ -231,8 +293,19 @@ class LGPIndividual(GPIndividual):
 
         # set the fastFlag to 1 if the individual is fast executable (i.e., no flow control)
         self.fastFlag = all(tree.type == GPTreeStruct.ARITHMETIC for tree in self.exec_trees)
+
+        # lower the effective instructions into bytecode. Primitives without an opcode stay on the tree interpreter
+        self.program = None
+        self.function = None
+        if self.fastFlag and self.execution != self.V_EXEC_TREE:
+            self.program = LGPBytecode.compile(self.exec_trees, self.getNumRegs(), self.simplify)
+
         self.preevaluated = True
 
+    def getNumSimplifiedNodes(self) -> int:
+        '''the number of node evaluations that the simplification of the bytecode saves in every execution'''
+        return self.program.numSimplified if self.program is not None else 0
+
     def getRegisters(self)->Union [List[float], List[np.array]]:
         return self.registers
 
@@ -370,6 +443,10 @@ class LGPIndividual(GPIndividual):
         self.towrap = obj.towrap
         self.batchsize = obj.batchsize
         self.eff_initialize = obj.eff_initialize
+        self.execution = obj.execution
+        self.simplify = obj.simplify
+        # the lineage: a clone resumes its execution from the registers saved during the execution of the original
+        self.snapshots = obj.snapshots
         self.setRegisters(obj.getRegisters())
         self.species = obj.species
         # self.flowctrl = LGPFlowController()
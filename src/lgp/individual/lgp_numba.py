@@ -0,0 +1,127 @@
+from src.lgp.individual.lgp_bytecode import LGPBytecode, RegisterFile
+from src.lgp.individual.primitive.kernels import OP_MOV, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MIN, OP_MAX, OP_LN, OP_SQRT, OP_EXP, OP_SIN, OP_COS
+from src.lgp.individual.primitive.kernels import NUM_BUILTIN_OPCODES, BOUND, DIV_EPSILON, LN_EPSILON, EXP_MAX
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Numba is optional. Without it, the programs are executed by the NumPy register machine
+NUMBA_AVAILABLE = njit is not None
+
+
+# the number of rows executed together. The slots of a block stay in the cache while the whole program runs on it
+BLOCK_ROWS = 256
+
+
+def _clip(v):
+    # NaN passes through, as in np.clip
+    if v < -BOUND:
+        return -BOUND
+    if v > BOUND:
+        return BOUND
+    return v
+
+
+def _executeRows(code, features, constants, literals, numRegs, numTemps, initial, X, out):
+    '''
+    the register machine executing one program over the rows of X. The rows are executed block by block, and all
+    instructions of the program are applied to a block before the next block is read, so no intermediate column is
+    ever materialized. The semantics of the opcodes are those of KERNELS.
+    the literals of the protected primitives are passed in the floating point type of `out`, so that single
+    precision programs are not promoted to double precision.
+    '''
+    divEps, lnEps, expMax = literals[0], literals[1], literals[2]
+    n = X.shape[0]
+    fbase = numRegs + numTemps
+    cbase = fbase + features.shape[0]
+    slots = np.empty((cbase + constants.shape[0], BLOCK_ROWS), dtype=out.dtype)
+    for c in range(constants.shape[0]):
+        slots[cbase + c, :] = constants[c]
+
+    for start in range(0, n, BLOCK_ROWS):
+        m = min(BLOCK_ROWS, n - start)
+        for r in range(numRegs):
+            slots[r, :m] = initial[r]
+        for f in range(features.shape[0]):
+            for j in range(m):
+                slots[fbase + f, j] = X[start + j, features[f]]
+
+        for k in range(code.shape[0]):
+            op = code[k, 0]
+            dst = slots[code[k, 1]]
+            a = slots[code[k, 2]]
+            b = slots[code[k, 3]] if code[k, 3] >= 0 else a
+            if op == OP_MOV:
+                for j in range(m):
+                    dst[j] = a[j]
+            elif op == OP_ADD:
+                for j in range(m):
+                    dst[j] = _clip(a[j] + b[j])
+            elif op == OP_SUB:
+                for j in range(m):
+                    dst[j] = _clip(a[j] - b[j])
+            elif op == OP_MUL:
+                for j in range(m):
+                    dst[j] = _clip(a[j] * b[j])
+            elif op == OP_DIV:
+                for j in range(m):
+                    q = a[j] / (abs(b[j]) + divEps)
+                    dst[j] = _clip(-q if b[j] < 0 else q)
+            elif op == OP_MIN:
+                for j in range(m):
+                    dst[j] = _clip(a[j] if a[j] < b[j] or a[j] != a[j] else b[j])
+            elif op == OP_MAX:
+                for j in range(m):
+                    dst[j] = _clip(a[j] if a[j] > b[j] or a[j] != a[j] else b[j])
+            elif op == OP_LN:
+                for j in range(m):
+                    dst[j] = _clip(math.log(abs(a[j]) + lnEps))
+            elif op == OP_SQRT:
+                for j in range(m):
+                    dst[j] = _clip(math.sqrt(abs(a[j])))
+            elif op == OP_EXP:
+                for j in range(m):
+                    dst[j] = _clip(math.exp(expMax if a[j] > expMax else a[j]))
+            elif op == OP_SIN:
+                for j in range(m):
+                    dst[j] = math.sin(a[j])
+            elif op == OP_COS:
+                for j in range(m):
+                    dst[j] = math.cos(a[j])
+
+        for r in range(numRegs):
+            out[r, start:start + m] = slots[r, :m]
+
+if NUMBA_AVAILABLE:
+    # the loop is compiled once for every floating point type, and releases the GIL for the evaluation threads
+    _clip = njit(inline='always')(_clip)
+    _executeRows = njit(cache=True, nogil=True)(_executeRows)
+
+
+def runNumba(program: LGPBytecode, registers: list, X: np.ndarray):
+    '''
+    execute the bytecode over all rows of X with the compiled register machine, the same as `program.run(registers, X)`.
+    the bytecode is passed to the register machine as arrays, so no compilation happens per program.
+    the resulting registers are (n, 1) views of the register file of the calling thread, as in `program.run`.
+    '''
+    # the primitives registered by users are only known to the NumPy register machine
+    if not NUMBA_AVAILABLE or any(isinstance(v, np.ndarray) for v in registers[:program.numRegs]) \
+            or (len(program) > 0 and program.code[:, 0].max() >= NUM_BUILTIN_OPCODES):
+        program.run(registers, X)
+        return
+
+    n = X.shape[0]
+    dtype = np.result_type(X.dtype, np.float32)
+    out = RegisterFile.get().slots(program.numRegs, n, dtype)
+    initial = np.array(registers[:program.numRegs], dtype=dtype)
+    literals = np.array([DIV_EPSILON, LN_EPSILON, EXP_MAX], dtype=dtype)
+    _executeRows(program.code, program.features, program.constants.astype(dtype), literals,
+                 program.numRegs, program.numTemps, initial, X, out)
+
+    for r in range(program.numRegs):
+        registers[r] = out[r, :n, None]
@@ -9,6 +9,7 @@ from .sqrt import Sqrt
 from .exp import Exp
 from .sin import Sin
 from .cos import Cos
+from .kernels import PrimitiveKernel, registerKernel, getKernel
 from .inputFeatureGPNode import InputFeatureGPNode
 from .flowOperator import FlowOperator
 from .constantGPNode import ConstantGPNode
@@ -17,5 +18,6 @@ from .writeRegisterGPNode import WriteRegisterGPNode
 
 
 __all__ = ["Add", "Sub", "Mul", "Div", "InputFeatureGPNode", "FlowOperator", "ConstantGPNode", "ReadRegisterGPNode",
-           "WriteRegisterGPNode", "Min", "Max", "Ln", "Sqrt", "Exp", "Sin", "Cos"
+           "WriteRegisterGPNode", "Min", "Max", "Ln", "Sqrt", "Exp", "Sin", "Cos",
+           "PrimitiveKernel", "registerKernel", "getKernel"
            ]
\ No newline at end of file
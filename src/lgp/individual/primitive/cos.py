@@ -3,6 +3,16 @@ import math
 from tasks.problem import Problem
 from typing import override
 import numpy as np
+from src.lgp.individual.primitive.kernels import registerKernel, OP_COS
+
+
+def cosKernel(a, b=None, out=None, where=True, scratch=None):
+    '''cos(a), NaN for infinite a'''
+    return np.cos(a, out=out, where=where)
+
+def cosScalar(a: float, b: float = None) -> float:
+    return math.cos(a) if math.isfinite(a) else math.nan
+
 
 class Cos(GPNode):
     @override
@@ -18,13 +28,13 @@ class Cos(GPNode):
             if not input.to_vectorize: 
                 input.value = math.cos(argval[0])
             else:
-                input.values = np.cos(argval[0])
+                input.values = cosKernel(argval[0])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             if not input.to_vectorize: 
                 input.value = math.cos(input.value)
             else:
-                input.values = np.cos(input.values)
+                input.values = cosKernel(input.values)
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -36,4 +46,7 @@ class Cos(GPNode):
         #     input.values = np.cos(input.values)
 
     def __str__(self):
-        return "cos"
\ No newline at end of file
+        return "cos"
+
+
+registerKernel(Cos, cosKernel, cosScalar, bounded=True, opcode=OP_COS)
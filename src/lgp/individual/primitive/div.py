@@ -6,6 +6,38 @@ import math
 
 # from src.ec.gp_node import GPNode
 # from src.ec.gp_data import GPData
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, saturateScalar, OP_DIV, DIV_EPSILON
+
+
+def divKernel(a, b, out=None, where=True, scratch=None):
+    '''
+    a / (|b| + 1e-4) with the sign of b (b = -0. counts as positive), saturated at ±1e6.
+    the sign is applied through the divisor, copysign(|b| + 1e-4, b + 0.), or by multiplying with ±1, which both give
+    exactly the negated quotient for b < 0 and avoid a masked negation.
+    '''
+    if scratch is not None and out is not None and np.may_share_memory(out, a) and not np.may_share_memory(out, b):
+        # out holds the dividend, so the quotient is computed first and b still gives the sign
+        divisor = np.absolute(b, out=scratch)
+        divisor = np.add(divisor, DIV_EPSILON, out=scratch)
+        out = np.divide(a, divisor, out=out, where=where)
+        sign = np.add(b, 0., out=scratch)
+        sign = np.copysign(1., sign, out=scratch)
+        out = np.multiply(out, sign, out=out, where=where)
+        return saturate(out, out=out, where=where)
+
+    # the magnitude of the divisor is computed in out, unless out holds the dividend
+    tmp = out if out is not None and not np.may_share_memory(out, a) else None
+    sign = np.add(b, 0., out=scratch)
+    divisor = np.absolute(sign, out=tmp)
+    divisor = np.add(divisor, DIV_EPSILON, out=tmp)
+    divisor = np.copysign(divisor, sign, out=scratch)
+    out = np.divide(a, divisor, out=out, where=where)
+    return saturate(out, out=out, where=where)
+
+def divScalar(a: float, b: float) -> float:
+    q = a / (abs(b) + DIV_EPSILON)
+    return saturateScalar(q if b >= 0 else -q)
+
 
 class Div(GPNode):
     
@@ -23,9 +55,9 @@ class Div(GPNode):
         if argval is not None and len(argval) == self.expectedChildren():
             # If argval is provided, use it for evaluation
             if not input.to_vectorize:
-                result = argval[0] / (abs(argval[1]) + 1e-4) * (1 if argval[1] >= 0 else -1)
+                result = argval[0] / (abs(argval[1]) + DIV_EPSILON) * (1 if argval[1] >= 0 else -1)
             else:
-                result = argval[0] / (np.abs(argval[1]) + 1e-4) * np.where(argval[1] >= 0, 1, -1)
+                result = divKernel(argval[0], argval[1])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             arg1 = input.value if not input.to_vectorize else input.values
@@ -33,15 +65,15 @@ class Div(GPNode):
             arg2 = input.value if not input.to_vectorize else input.values
             
             if not input.to_vectorize:
-                result = arg1 / (abs(arg2) + 1e-4) * (1 if arg2 >= 0 else -1)
+                result = arg1 / (abs(arg2) + DIV_EPSILON) * (1 if arg2 >= 0 else -1)
             else:
-                result = arg1 / (np.abs(arg2) + 1e-4) * np.where(arg2 >= 0, 1, -1)
+                result = divKernel(arg1, arg2)
 
         # Clip the result to ±1e6
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -66,4 +98,7 @@ class Div(GPNode):
 
         #     input.values = np.clip(input.values, -1e6, 1e6)
 
-        # input.value = child_result.value
\ No newline at end of file
+        # input.value = child_result.value
+
+
+registerKernel(Div, divKernel, divScalar, bounded=True, opcode=OP_DIV)
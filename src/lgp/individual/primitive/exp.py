@@ -3,6 +3,18 @@ import math
 from tasks.problem import Problem
 from typing import override
 import numpy as np
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, writable, saturateScalar, OP_EXP, EXP_MAX
+
+
+def expKernel(a, b=None, out=None, where=True, scratch=None):
+    '''exp(min(a, 10)), saturated at ±1e6'''
+    out = np.clip(a, None, EXP_MAX, out=out, where=where)
+    out = np.exp(out, out=writable(out), where=where)
+    return saturate(out, out=out, where=where)
+
+def expScalar(a: float, b: float = None) -> float:
+    return saturateScalar(math.exp(a if a <= EXP_MAX or a != a else EXP_MAX))
+
 
 class Exp(GPNode):
 
@@ -17,23 +29,22 @@ class Exp(GPNode):
         if argval is not None and len(argval) == self.expectedChildren():
             # If argval is provided, use it for evaluation
             if not input.to_vectorize:
-                argval[0] = min(argval[0], 10)  # Clip to 10
+                argval[0] = min(argval[0], EXP_MAX)  # Clip to EXP_MAX
                 result = math.exp(argval[0])
             else:
-                argval[0] = np.clip(argval[0], None, 10)  # Clip to 10
-                result = np.exp(argval[0])
+                result = expKernel(argval[0])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             if not input.to_vectorize:
-                result = math.exp(min(input.value, 10)) 
+                result = math.exp(min(input.value, EXP_MAX)) 
             else:
-                result = np.exp(np.clip(input.values, None, 10))
+                result = expKernel(input.values)
 
         # Clip the result to ±1e6
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -54,4 +65,7 @@ class Exp(GPNode):
         #     np.clip(input.values, -1e6, 1e6, out=input.values)
 
     def __str__(self):
-        return "exp"
\ No newline at end of file
+        return "exp"
+
+
+registerKernel(Exp, expKernel, expScalar, bounded=True, opcode=OP_EXP)
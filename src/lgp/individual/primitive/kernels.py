@@ -0,0 +1,112 @@
+'''
+the registry of the vectorized kernels of the primitives. Every execution backend (the tree interpreter, the
+bytecode register machine, the generated functions and the single-sample path) executes a primitive by its
+registered kernel, so a user-defined primitive only has to register its kernel once to be compiled by all of them.
+
+a kernel has the signature `kernel(a, b, out=None, where=True, scratch=None)`. It computes the primitive over the
+arrays (or floats) a and b, with the protection and the saturation of the primitive fused into one pass, writes the
+result into `out` (allocating it if None) and returns it. `out` may be the same array as a or b. `where` restricts
+the computation as in NumPy ufuncs. `scratch` is an optional work array of the shape of the result, which the kernel
+may overwrite. Unary kernels ignore b.
+the kernels do not set np.errstate themselves. The callers execute a whole program under a single np.errstate.
+'''
+
+from typing import Callable, Optional
+import numpy as np
+
+# the absolute bound of the saturated primitives
+BOUND = 1e6
+
+# the protection of the primitives: the offset of the divisor of Div, the offset of the argument of Ln and the cap of
+# the argument of Exp. Every backend reads them from here
+DIV_EPSILON = 1e-4
+LN_EPSILON = 1e-10
+EXP_MAX = 10.
+
+# opcodes of the register machine. The opcode 0 copies a register, the other built-in opcodes are the primitives
+OP_MOV = 0
+OP_ADD = 1
+OP_SUB = 2
+OP_MUL = 3
+OP_DIV = 4
+OP_MIN = 5
+OP_MAX = 6
+OP_LN = 7
+OP_SQRT = 8
+OP_EXP = 9
+OP_SIN = 10
+OP_COS = 11
+NUM_BUILTIN_OPCODES = 12
+
+
+def writable(x):
+    '''x if the next step of a kernel can write its result into x, i.e., x is an array and not a NumPy scalar'''
+    return x if isinstance(x, np.ndarray) else None
+
+def saturate(x, out=None, where=True):
+    '''clip x to ±BOUND. NaN passes through'''
+    return np.clip(x, -BOUND, BOUND, out=writable(out), where=where)
+
+def saturateScalar(v: float) -> float:
+    return -BOUND if v < -BOUND else (BOUND if v > BOUND else v)
+
+
+class PrimitiveKernel:
+    '''
+    the kernel of one primitive. `scalar(a, b)` is the same operation on python floats, used to execute a program on a
+    single sample. `bounded` tells that the results are always within ±BOUND (or NaN), which lets the bytecode
+    compiler drop operations that are exact identities.
+    '''
+
+    def __init__(self, primitive: Optional[type], opcode: int, kernel: Callable, scalar: Callable, bounded: bool):
+        self.primitive = primitive
+        self.opcode = opcode
+        self.kernel = kernel
+        self.scalar = scalar
+        self.bounded = bounded
+        self.name = f'op{opcode}_{primitive.__name__.lower()}' if primitive is not None else f'op{opcode}_mov'
+
+
+def _moveKernel(a, b, out=None, where=True, scratch=None):
+    if out is None:
+        return np.array(a, copy=True)
+    np.copyto(out, a, where=where)
+    return out
+
+# the kernels indexed by opcode
+KERNELS: list[PrimitiveKernel] = [PrimitiveKernel(None, OP_MOV, _moveKernel, lambda a, b: a, False)]
+
+# the kernels indexed by primitive class
+PRIMITIVE_KERNELS: dict[type, PrimitiveKernel] = {}
+
+
+def _scalarOf(kernel: Callable) -> Callable:
+    def scalar(a, b):
+        return float(kernel(np.float64(a), None if b is None else np.float64(b)))
+    return scalar
+
+
+def registerKernel(primitive: type, kernel: Callable, scalar: Callable = None, bounded: bool = False,
+                   opcode: int = None) -> PrimitiveKernel:
+    '''
+    register the vectorized kernel of a primitive class (a GPNode with one or two children), and return its entry.
+    without a scalar version, the kernel itself is applied to single samples.
+    the built-in primitives pass their fixed opcode. The other primitives get the next free opcode.
+    '''
+    if primitive in PRIMITIVE_KERNELS:
+        raise ValueError(f"the primitive {primitive.__name__} already has a kernel")
+    if opcode is None:
+        opcode = max(len(KERNELS), NUM_BUILTIN_OPCODES)
+    if opcode < len(KERNELS) and KERNELS[opcode] is not None:
+        raise ValueError(f"the opcode {opcode} is already taken by {KERNELS[opcode].name}")
+
+    entry = PrimitiveKernel(primitive, opcode, kernel, scalar if scalar is not None else _scalarOf(kernel), bounded)
+    KERNELS.extend([None] * (opcode + 1 - len(KERNELS)))
+    KERNELS[opcode] = entry
+    PRIMITIVE_KERNELS[primitive] = entry
+    return entry
+
+
+def getKernel(primitive: type) -> Optional[PrimitiveKernel]:
+    '''the kernel registered for exactly the given primitive class, or None'''
+    return PRIMITIVE_KERNELS.get(primitive)
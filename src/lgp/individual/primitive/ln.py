@@ -3,6 +3,16 @@ import math
 from tasks.problem import Problem
 from typing import override
 import numpy as np
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, writable, saturateScalar, OP_LN, LN_EPSILON
+
+
+def lnKernel(a, b=None, out=None, where=True, scratch=None):
+    '''log(|a| + 1e-10), saturated at ±1e6'''
+    out = np.absolute(a, out=out, where=where)
+    out = np.add(out, LN_EPSILON, out=writable(out), where=where)
+    out = np.log(out, out=writable(out), where=where)
+    return saturate(out, out=out, where=where)
+
 
 class Ln(GPNode):
 
@@ -16,20 +26,20 @@ class Ln(GPNode):
         if argval is not None and len(argval) == self.expectedChildren():
             # If argval is provided, use it for evaluation
             if not input.to_vectorize:
-                result = math.log(abs(argval[0]) + 1e-10)
+                result = math.log(abs(argval[0]) + LN_EPSILON)
             else:
-                result = np.log(np.abs(argval[0]) + 1e-10)
+                result = lnKernel(argval[0])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             if not input.to_vectorize:
-                result = math.log(abs(input.value) + 1e-10)
+                result = math.log(abs(input.value) + LN_EPSILON)
             else:
-                result = np.log(np.abs(input.values) + 1e-10)
+                result = lnKernel(input.values)
         # Clip the result to ±1e6
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -46,4 +56,7 @@ class Ln(GPNode):
         #     np.clip(input.values, -1e6, 1e6, out=input.values)
 
     def __str__(self):
-        return "ln"
\ No newline at end of file
+        return "ln"
+
+
+registerKernel(Ln, lnKernel, lambda a, b: saturateScalar(math.log(abs(a) + LN_EPSILON)), bounded=True, opcode=OP_LN)
@@ -4,6 +4,17 @@ from typing import override
 import numpy as np
 # from src.ec.gp_node import GPNode
 # from src.ec.gp_data import GPData
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, saturateScalar, OP_MIN
+
+
+def minKernel(a, b, out=None, where=True, scratch=None):
+    '''the minimum of a and b (NaN if either is NaN), saturated at ±1e6'''
+    out = np.minimum(a, b, out=out, where=where)
+    return saturate(out, out=out, where=where)
+
+def minScalar(a: float, b: float) -> float:
+    return saturateScalar(a if a < b or a != a else b)
+
 
 class Min(GPNode):
     
@@ -22,7 +33,7 @@ class Min(GPNode):
             if not input.to_vectorize:
                 result = min(argval[0], argval[1])
             else:
-                result = np.minimum(argval[0], argval[1])
+                result = minKernel(argval[0], argval[1])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             arg1 = input.value if not input.to_vectorize else input.values
@@ -31,12 +42,12 @@ class Min(GPNode):
             if not input.to_vectorize:
                 result = min(arg1, arg2)
             else:
-                result = np.minimum(arg1, arg2)
+                result = minKernel(arg1, arg2)
         # Clip the result to ±1e6
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -52,4 +63,7 @@ class Min(GPNode):
         #     self.children[1].eval(state, thread, input, individual, problem)
         #     input.values = np.minimum(result, input.values)
 
-        # input.value = child_result.value
\ No newline at end of file
+        # input.value = child_result.value
+
+
+registerKernel(Min, minKernel, minScalar, bounded=True, opcode=OP_MIN)
@@ -4,6 +4,14 @@ from typing import override
 import numpy as np
 # from src.ec.gp_node import GPNode
 # from src.ec.gp_data import GPData
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, saturateScalar, OP_MUL
+
+
+def mulKernel(a, b, out=None, where=True, scratch=None):
+    '''a * b, saturated at ±1e6'''
+    out = np.multiply(a, b, out=out, where=where)
+    return saturate(out, out=out, where=where)
+
 
 class Mul(GPNode):
     
@@ -22,7 +30,7 @@ class Mul(GPNode):
             if not input.to_vectorize:
                 result = argval[0] * argval[1]
             else:
-                result = np.multiply(argval[0], argval[1])
+                result = mulKernel(argval[0], argval[1])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             arg1 = input.value if not input.to_vectorize else input.values
@@ -31,13 +39,13 @@ class Mul(GPNode):
             if not input.to_vectorize:
                 result = arg1 * arg2
             else:
-                result = np.multiply(arg1, arg2)
+                result = mulKernel(arg1, arg2)
         
         # Clip the result to ±1e6
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -63,4 +71,7 @@ class Mul(GPNode):
 
         #     input.values = np.clip(input.values, -1e6, 1e6)
 
-        # input.value = child_result.value
\ No newline at end of file
+        # input.value = child_result.value
+
+
+registerKernel(Mul, mulKernel, lambda a, b: saturateScalar(a * b), bounded=True, opcode=OP_MUL)
@@ -3,6 +3,16 @@ import math
 from tasks.problem import Problem
 from typing import override
 import numpy as np
+from src.lgp.individual.primitive.kernels import registerKernel, OP_SIN
+
+
+def sinKernel(a, b=None, out=None, where=True, scratch=None):
+    '''sin(a), NaN for infinite a'''
+    return np.sin(a, out=out, where=where)
+
+def sinScalar(a: float, b: float = None) -> float:
+    return math.sin(a) if math.isfinite(a) else math.nan
+
 
 class Sin(GPNode):
 
@@ -18,13 +28,13 @@ class Sin(GPNode):
             if not input.to_vectorize:
                 input.value = math.sin(argval[0])
             else:
-                input.values = np.sin(argval[0])
+                input.values = sinKernel(argval[0])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             if not input.to_vectorize:
                 input.value = math.sin(input.value)
             else:
-                input.values = np.sin(input.values)
+                input.values = sinKernel(input.values)
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -36,4 +46,7 @@ class Sin(GPNode):
         #     input.values = np.sin(input.values)
 
     def __str__(self):
-        return "sin"
\ No newline at end of file
+        return "sin"
+
+
+registerKernel(Sin, sinKernel, sinScalar, bounded=True, opcode=OP_SIN)
@@ -3,6 +3,15 @@ import math
 from tasks.problem import Problem
 from typing import override
 import numpy as np
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, writable, saturateScalar, OP_SQRT
+
+
+def sqrtKernel(a, b=None, out=None, where=True, scratch=None):
+    '''sqrt(|a|), saturated at ±1e6'''
+    out = np.absolute(a, out=out, where=where)
+    out = np.sqrt(out, out=writable(out), where=where)
+    return saturate(out, out=out, where=where)
+
 
 class Sqrt(GPNode):
 
@@ -18,19 +27,19 @@ class Sqrt(GPNode):
             if not input.to_vectorize:
                 result = math.sqrt(abs(argval[0]))
             else:
-                result = np.sqrt(np.abs(argval[0]))
+                result = sqrtKernel(argval[0])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             if not input.to_vectorize:
                 result = math.sqrt(abs(input.value))
             else:
-                result = np.sqrt(np.abs(input.values))
+                result = sqrtKernel(input.values)
                 
         # Clip the result to ±1e6
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
             
         # if not input.to_vectorize:
@@ -46,4 +55,7 @@ class Sqrt(GPNode):
         #     input.values = np.sqrt(np.abs(result))
 
     def __str__(self):
-        return "sqr"
\ No newline at end of file
+        return "sqr"
+
+
+registerKernel(Sqrt, sqrtKernel, lambda a, b: saturateScalar(math.sqrt(abs(a))), bounded=True, opcode=OP_SQRT)
@@ -4,6 +4,14 @@ from typing import override
 import numpy as np
 # from src.ec.gp_node import GPNode
 # from src.ec.gp_data import GPData
+from src.lgp.individual.primitive.kernels import registerKernel, saturate, saturateScalar, OP_SUB
+
+
+def subKernel(a, b, out=None, where=True, scratch=None):
+    '''a - b, saturated at ±1e6'''
+    out = np.subtract(a, b, out=out, where=where)
+    return saturate(out, out=out, where=where)
+
 
 class Sub(GPNode):
     
@@ -20,19 +28,19 @@ class Sub(GPNode):
         
         if argval is not None and len(argval) == self.expectedChildren():
             # If argval is provided, use it for evaluation
-            result = argval[0] - argval[1]
+            result = argval[0] - argval[1] if not input.to_vectorize else subKernel(argval[0], argval[1])
         else:
             self.children[0].eval(state, thread, input, individual, problem)
             arg1 = input.value if not input.to_vectorize else input.values
             self.children[1].eval(state, thread, input, individual, problem)
             arg2 = input.value if not input.to_vectorize else input.values
-            result = arg1 - arg2
+            result = arg1 - arg2 if not input.to_vectorize else subKernel(arg1, arg2)
             
         # Clip the result to ±1e6   
         if not input.to_vectorize:
             input.value = max(-1e6, min(1e6, result))
         else:
-            input.values = np.clip(result, -1e6, 1e6)
+            input.values = result
 
         # if not input.to_vectorize:
         #     child_result = input
@@ -57,4 +65,7 @@ class Sub(GPNode):
         #     input.values = np.clip(input.values, -1e6, 1e6)
 
 
-        # input.value = child_result.value
\ No newline at end of file
+        # input.value = child_result.value
+
+
+registerKernel(Sub, subKernel, lambda a, b: saturateScalar(a - b), bounded=True, opcode=OP_SUB)
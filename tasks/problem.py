@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from src.ec import *
 from src.ec.gp_data import GPData
-from src.ec.util import Parameter
+from src.ec.util import Parameter, ParameterDatabase
 
 class Problem(ABC):
     
@@ -30,4 +30,87 @@ class Problem(ABC):
     
     @abstractmethod
     def evaluate(self, state:EvolutionState, ind, subpopulation:int, threadnum:int):
-        pass
\ No newline at end of file
+        pass
+
+    def evaluateBatch(self, state:EvolutionState, inds:list, subpopulation:int, threadnum:int):
+        '''evaluate a group of individuals. Problems that are able to evaluate many individuals at once override this'''
+        for ind in inds:
+            self.evaluate(state, ind, subpopulation, threadnum)
+
+    @staticmethod
+    def evaluateRuns(runs:list, threadnum:int):
+        '''
+        evaluate the individuals of several independent runs at once. runs is a list of (problem, state, individuals,
+        subpopulation) whose problems are of the same class. Problems that are able to pool the work of the runs
+        (e.g., on the same data) override this
+        '''
+        for problem, state, inds, subpopulation in runs:
+            problem.evaluateBatch(state, inds, subpopulation, threadnum)
+
+    def sharedArrays(self) -> dict:
+        '''
+        the large arrays of the problem by attribute name, which the worker processes of a ProcessEvaluator map from
+        shared memory instead of receiving a copy
+        '''
+        return {}
+
+    def preloadData(self, parameters:ParameterDatabase, base:Parameter):
+        '''
+        load the data that the runs of the parameters will read, before the runs are started in forked processes
+        which then share them. The problem is not set up when this is called
+        '''
+        pass
+
+    def threadCopy(self):
+        '''
+        a light copy of the problem for one evaluation thread. The data of the problem are shared with the copy and
+        must not be modified during the evaluation, only the small per-thread state (e.g., the input) is copied
+        '''
+        import copy
+        prob = copy.copy(self)
+        prob.input = copy.deepcopy(self.input)
+        return prob
+
+    def workerCopy(self):
+        '''a copy of the problem to send to the worker processes, without the shared arrays'''
+        prob = self.threadCopy()
+        for name in self.sharedArrays():
+            setattr(prob, name, None)
+        return prob
+
+    def phenotypeKey(self, ind):
+        '''
+        a hashable form of what the fitness of the individual depends on (e.g., its effective program), so that the
+        individuals with the same key get the same fitness, or None if the fitness of the individual cannot be cached
+        '''
+        return None
+
+    def dataFingerprint(self):
+        '''a hashable summary of the data and settings that the fitness depends on, or None to disable the fitness cache'''
+        return None
+
+    def semanticKeys(self, individuals:list) -> list:
+        '''
+        a hashable summary of the outputs of each individual on a few probe rows, or None, so that the individuals
+        with the same summary are deemed to get the same fitness (see FitnessCache). None for all by default
+        '''
+        return [None] * len(individuals)
+
+    def evaluationReport(self) -> str:
+        '''a line about the evaluation of the problem since the last report for the statistics, or an empty string'''
+        return ""
+
+    def remoteTask(self, ind):
+        '''
+        a compact and picklable form of the individual that a worker process can evaluate by remoteFitness,
+        or None if the individual has to be evaluated in the main process. The problems that give tasks override
+        remoteFitness as well
+        '''
+        return None
+
+    def remoteFitness(self, task) -> float:
+        '''
+        the fitness of the individual of a task made by remoteTask, computed in a worker process, or None if the
+        worker cannot compute it, so that the individual is evaluated in the main process
+        '''
+        return None
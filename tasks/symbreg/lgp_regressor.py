@@ -2,13 +2,14 @@ import os
 import sys
 from src.ec import *
 from src.ec.util import *
-# from src.lgp.individual import LGPIndividual
+from src.lgp.individual import LGPIndividual, LGPBytecode
 # from sklearn.base import BaseEstimator, RegressorMixin
 # from tasks.symbreg.optimization.gp_Xy_symbolic_regression import XySymbolicRegression
 from tasks.symbreg.optimization.gp_symbolic_regression import GPSymbolicRegression
 from tasks.lgp_template import LGP_Model_Template
 import numpy as np
 import time
+import math
 
 class LinearGP_Regressor(LGP_Model_Template):
 
@@ -49,10 +50,32 @@ class LinearGP_Regressor(LGP_Model_Template):
         self.state.run() 
 
         self.output_ind = self.state.statistics.best_of_run[0]  # Assuming single subpopulation
+        self.compile_output_ind()
 
         # If you have more complex algorithm, do training here
         return self  # fit must return self
     
+    def compile_output_ind(self):
+        """the output individual is executed by every prediction, so we execute it by a generated python function"""
+        if isinstance(self.output_ind, LGPIndividual) and self.output_ind.execution == LGPIndividual.V_EXEC_BYTECODE:
+            self.output_ind.execution = LGPIndividual.V_EXEC_CODEGEN
+        self.row_program = None
+
+    def get_row_program(self):
+        """compile the effective instructions (and the wrapper) of the output individual for predicting single samples.
+        return None if the output individual cannot be executed on python floats"""
+        ind = self.output_ind
+        if getattr(self, 'row_program', None) is None or self.row_program[0] is not ind:
+            program = wrapper = None
+            if isinstance(ind, LGPIndividual):
+                program = LGPBytecode.compile([t for t in ind.getTreelist() if t.status], ind.getNumRegs())
+                if ind.IsWrap() and program is not None:
+                    wrapper = LGPBytecode.compile(ind.getWrapper(), ind.getNumRegs())
+                    if wrapper is None:
+                        program = None
+            self.row_program = (ind, program, wrapper)
+        return self.row_program[1:]
+
     def predict(self, X)->np.ndarray:
         """
         Predict using the trained model.
@@ -64,9 +87,7 @@ class LinearGP_Regressor(LGP_Model_Template):
 
         X = np.asarray(X)
         
-        if isinstance(self.state.evaluator.p_problem, GPSymbolicRegression):
-            self.state.evaluator.p_problem.setX(X)
-        else:
+        if not isinstance(self.state.evaluator.p_problem, GPSymbolicRegression):
             raise ValueError(f"the optimization of LinearGP_Regressor must be type of {GPSymbolicRegression.__name__}")
         
         if not self.output_ind:
@@ -78,6 +99,54 @@ class LinearGP_Regressor(LGP_Model_Template):
 
         return predict
     
+    def predict_row(self, x)->list:
+        """
+        Predict one sample without going through the evaluation problem.
+        x: array-like of shape (n_features,)
+        Returns: a list of the outputs of the sample
+
+        The compiled effective instructions are executed on python floats, which is much faster than predict for
+        small inputs. Like predict, it does not change the data of the problem.
+        """
+
+        problem = self.state.evaluator.p_problem
+        if not isinstance(problem, GPSymbolicRegression):
+            raise ValueError(f"the optimization of LinearGP_Regressor must be type of {GPSymbolicRegression.__name__}")
+        
+        if not self.output_ind:
+            print("the linear genetic programming has not been trained. I found no output individual")
+            sys.exit(1)
+
+        program, wrapper = self.get_row_program()
+        if program is None or len(x) != problem.datadim or not program.matches(problem):
+            # fall back to the vectorized execution
+            X = np.asarray(x, dtype=np.float64).reshape(1, -1)
+            return problem.predictRows(self.output_ind, X)[0].tolist()
+
+        if problem.normalized:
+            # scale the sample by the statistics of the training data, like the vectorized execution does
+            x = [(float(v) - m) / s for v, m, s in zip(x, problem.norm_mean.tolist(), problem.norm_scale.tolist())]
+
+        ind = self.output_ind
+        registers = [ind.INITIAL_VALUE] * ind.getNumRegs()
+        program.runScalar(registers, x)
+        if wrapper is not None:
+            wrapper.runScalar(registers, x)
+
+        outputs = [registers[r] if math.isfinite(registers[r]) else 1e6 for r in ind.getOutputRegisters()]
+        if problem.normalized:
+            for od in range(min(problem.target_num, len(outputs))):
+                t = problem.targets[od]
+                outputs[od] = outputs[od] * float(problem.out_std[t]) + float(problem.out_mean[t])
+        return outputs
+
+    def predict_one(self, x)->float:
+        """
+        Predict the first output of one sample.
+        x: array-like of shape (n_features,)
+        """
+        return self.predict_row(x)[0]
+
     def score(self, X, y):
         """Return R^2 score, just like scikit-learn"""
         from sklearn.metrics import r2_score
@@ -103,6 +172,7 @@ class LinearGP_Regressor(LGP_Model_Template):
 
         # self.output_ind = self.state.statistics.best_of_run[0]  # Assuming single subpopulation
         self.output_ind = self.state.statistics.best_i[0]
+        self.compile_output_ind()
         self.train_fitness = self.output_ind.fitness.fitness()
 
         # If you have more complex algorithm, do training here
@@ -101,6 +101,11 @@ class XySymbolicRegression(GPSymbolicRegression):
         self.fitness = state.parameters.getString(base.push(self.FITNESS_P), def_param.push(self.FITNESS_P))
         self.normalized = state.parameters.getBoolean(base.push(self.NORMALIZE_P), def_param.push(self.NORMALIZE_P))
         self.doValidation = state.parameters.getBoolean(base.push(self.VALIDATION_P), def_param.push(self.NORMALIZE_P))
+        self.setupEvaluation(state, base)
+
+        # the data may be given before the precision is known
+        if getattr(self, 'data', None) is not None:
+            self.setX(self.data)
 
         self.target_num = state.parameters.getIntWithDefault(base.push(self.TARGETNUM_P), def_param.push(self.TARGETNUM_P), 1)
         if self.target_num <= 0:
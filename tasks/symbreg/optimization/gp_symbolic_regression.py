@@ -4,7 +4,11 @@
 
 import os
 import math
+import hashlib
+import threading
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from src.ec import *
@@ -12,9 +16,39 @@ from src.ec.util import Parameter,ParameterDatabase
 from tasks.problem import Problem
 from tasks.supervisedproblem import SupervisedProblem
 from tasks.symbreg.individual.lgpindividual4SR import LGPIndividual4SR
+from src.lgp.individual.lgp_individual import LGPIndividual
+from src.lgp.individual.lgp_bytecode import LGPBytecode, Snapshots, SnapshotStore, ColumnCache
+from src.lgp.individual.lgp_numba import runNumba
+from src.lgp.individual.lgp_codegen import compileBytecode
 
 from sklearn.metrics import mean_squared_error, root_mean_squared_error, r2_score
 
+# the parsed data files by path and precision, read once per process and shared by all its problems (e.g., the
+# jobs of Evolve started in forked processes share those parsed by the main process). At most DATASET_CACHE_SIZE
+# entries are kept, the least recently used ones are dropped first
+DATASET_CACHE_SIZE = 16
+_datasets:OrderedDict = OrderedDict()
+_datasetLock = threading.Lock()
+
+def _cacheDataset(key, value):
+    '''keep value under key in _datasets, dropping the least recently used entries. _datasetLock must be held'''
+    _datasets[key] = value
+    while len(_datasets) > DATASET_CACHE_SIZE:
+        _datasets.popitem(last=False)
+
+def cachedDataset(filepath:str, dtype, parse):
+    '''
+    the content of a data file parsed by parse(filepath), which is cached until the file changes. The arrays are
+    shared by the callers, so parse makes them read-only and a caller that modifies them in place must copy them first
+    '''
+    key = (os.path.abspath(filepath), os.path.getmtime(filepath), np.dtype(dtype).str)
+    with _datasetLock:
+        if key not in _datasets:
+            _cacheDataset(key, parse(filepath))
+        _datasets.move_to_end(key)
+        return _datasets[key]
+
+
 class GPSymbolicRegression(Problem, SupervisedProblem):
 
     PROBLEM_P = "SymbolicRegression"
@@ -27,6 +61,54 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
     TARGETNUM_P = "target_num"
     TARGETS_P = "targets"
     VALIDATION_P = "do-validation"
+    BATCH_P = "batch-evaluation"
+    PRECISION_P = "precision"
+    CHUNK_SIZE_P = "chunk-size"
+    ROW_THREADS_P = "row-threads"
+    SNAPSHOT_MEMORY_P = "snapshot-memory"
+    SUBEXPRESSION_MEMORY_P = "subexpression-memory"
+    PROBE_ROWS_P = "probe-rows"
+    C_AUTO = "auto"
+
+    # the fitness objectives that can be merged from the partial sums of row blocks
+    STREAMABLE_FITNESS = ["RMSE", "MSE", "R2", "RSE", "ERR"]
+
+    # the auto chunk size keeps the register file of a block within this many bytes (about the size of a L2 cache)
+    CHUNK_CACHE_BYTES = 1 << 20
+    MIN_CHUNK_ROWS = 1024
+
+    # the row threads execute slices of at least this many rows, below which the threads cost more than they save
+    MIN_THREAD_ROWS = 8192
+
+    # the number of boundaries between the instructions of a program at which its registers are saved
+    SNAPSHOT_CHECKPOINTS = 8
+
+    # the bits of the mantissas of the outputs on the probe rows that the semantics of the programs are compared by
+    PROBE_BITS = 32
+
+    # below this many probe rows, the programs with other outputs on the other rows are likely to match
+    MIN_PROBE_ROWS = 16
+
+    # the floating point types that the data and the registers can be stored in
+    PRECISIONS = {"float64": np.float64, "float32": np.float32}
+
+    # defaults of the evaluation settings, for the problems constructed without parameters
+    batchEvaluation = True
+    dtype = np.float64
+    chunkSize = 0
+    rowThreads = 1
+    snapshotStore:SnapshotStore = None
+    columnCache:ColumnCache = None
+    probeRows = 0
+
+    # serializing the creation of the row threads, which the copies of the problem share
+    _rowLock = threading.Lock()
+
+    # the digest of the data arrays, kept with the arrays it was computed from
+    _dataDigest = None
+
+    # the probe rows, kept with the data arrays they were taken from
+    _probe = None
 
     def __init__(self, loca:str=None, datan:str=None, fitn:str=None, istraining:bool=None, parameters:ParameterDatabase=None):
 
@@ -39,6 +121,12 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         self.istraining = False
         self.doValidation = False
         self.normalized = False
+        self.batchEvaluation = True
+        self.dtype = np.float64
+        self.chunkSize = 0  # the number of rows per block of the chunked evaluation, "auto", or 0 to evaluate all rows at once
+        self.rowThreads = 1  # the number of threads executing one program over slices of the rows
+        self.rowExecutors = []
+        self.rowBlockCache = {}
 
         self.foldnum = 0
         self.foldindex = 0
@@ -59,6 +147,7 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
 
         self.norm_mean = []
         self.norm_std = []
+        self.norm_scale = []
         self.out_mean = []
         self.out_std = []
         self.data_max = []
@@ -92,6 +181,10 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
 
         self.normalized = parameters.getBoolean(base.push(self.NORMALIZE_P), default.push(self.NORMALIZE_P))
         self.doValidation = parameters.getBoolean(self.VALIDATION_P, False)
+        self.batchEvaluation = parameters.getBoolean(base.push(self.BATCH_P), default.push(self.BATCH_P), True)
+        self.dtype = self.precisionType(parameters, base)
+        if self.dtype is None:
+            raise ValueError(f"The precision must be one of {list(self.PRECISIONS)}: {base.push(self.PRECISION_P)} or {default.push(self.PRECISION_P)}")
 
         
         self.setProblem(None, loca, datan, fitn, istraining)
@@ -107,6 +200,7 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         self.fitness = state.parameters.getString(base.push(self.FITNESS_P), def_param.push(self.FITNESS_P))
         self.normalized = state.parameters.getBoolean(base.push(self.NORMALIZE_P), def_param.push(self.NORMALIZE_P))
         self.doValidation = state.parameters.getBoolean(base.push(self.VALIDATION_P), def_param.push(self.NORMALIZE_P))
+        self.setupEvaluation(state, base)
 
         self.foldindex = state.parameters.getIntWithDefault(base.push(self.KFOLDINDEX_P), def_param.push(self.KFOLDINDEX_P), 0)
         self.foldnum = state.parameters.getIntWithDefault(base.push(self.KFOLDNUM_P), def_param.push(self.KFOLDNUM_P), 1)
@@ -136,19 +230,76 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
 
             self.setProblem(state, self.location, self.dataname, self.fitness, True)
 
+    def setupEvaluation(self, state:EvolutionState, base:Parameter):
+        '''read the parameters defining how the individuals are executed on the data'''
+        def_param = Parameter(self.PROBLEM_P)
+
+        self.batchEvaluation = state.parameters.getBoolean(base.push(self.BATCH_P), def_param.push(self.BATCH_P), True)
+
+        self.dtype = self.precisionType(state.parameters, base)
+        if self.dtype is None:
+            state.output.fatal(f"The precision must be one of {list(self.PRECISIONS)}: {base.push(self.PRECISION_P)} or {def_param.push(self.PRECISION_P)}")
+
+        if not state.parameters.exists(base.push(self.CHUNK_SIZE_P), def_param.push(self.CHUNK_SIZE_P)):
+            self.chunkSize = 0
+        else:
+            chunk_string = state.parameters.getString(base.push(self.CHUNK_SIZE_P), def_param.push(self.CHUNK_SIZE_P))
+            if chunk_string.lower() == self.C_AUTO:
+                self.chunkSize = self.C_AUTO
+            else:
+                self.chunkSize = state.parameters.getIntWithDefault(base.push(self.CHUNK_SIZE_P), def_param.push(self.CHUNK_SIZE_P), 0)
+                if self.chunkSize < 0:
+                    state.output.fatal(f"Chunk Size must be either an integer >= 0 or 'auto': {base.push(self.CHUNK_SIZE_P)} or {def_param.push(self.CHUNK_SIZE_P)}")
+
+        self.rowThreads = state.parameters.getIntWithDefault(base.push(self.ROW_THREADS_P), def_param.push(self.ROW_THREADS_P), 1)
+        if self.rowThreads < 1:
+            state.output.fatal(f"The number of row threads must be >= 1: {base.push(self.ROW_THREADS_P)} or {def_param.push(self.ROW_THREADS_P)}")
+        # shared by the thread copies of the problem
+        self.rowExecutors = []
+        self.rowBlockCache = {}
+
+        # the memory (in MB) of the registers saved during the batch executions, which the offspring resume from
+        memory = state.parameters.getDoubleWithDefault(base.push(self.SNAPSHOT_MEMORY_P), def_param.push(self.SNAPSHOT_MEMORY_P), 0.)
+        if memory < 0:
+            state.output.fatal(f"The snapshot memory must be >= 0: {base.push(self.SNAPSHOT_MEMORY_P)} or {def_param.push(self.SNAPSHOT_MEMORY_P)}")
+        self.snapshotStore = SnapshotStore(int(memory * (1 << 20))) if memory > 0 else None
+
+        # the memory (in MB) of the columns of the input-only subexpressions, which the batch executions share
+        memory = state.parameters.getDoubleWithDefault(base.push(self.SUBEXPRESSION_MEMORY_P), def_param.push(self.SUBEXPRESSION_MEMORY_P), 0.)
+        if memory < 0:
+            state.output.fatal(f"The subexpression memory must be >= 0: {base.push(self.SUBEXPRESSION_MEMORY_P)} or {def_param.push(self.SUBEXPRESSION_MEMORY_P)}")
+        self.columnCache = ColumnCache(int(memory * (1 << 20))) if memory > 0 else None
+
+        # the snapshots and the subexpression columns are kept for whole data arrays, not for the row slices
+        if self.rowThreads > 1 and (self.snapshotStore is not None or self.columnCache is not None):
+            state.output.warning(f"The snapshot memory and the subexpression memory are not used when the rows are "
+                                 f"split between {self.rowThreads} row threads (data of at least "
+                                 f"{2 * self.MIN_THREAD_ROWS} rows): {base.push(self.ROW_THREADS_P)}")
+
+        # the number of training (and validation) rows on which the offspring are compared by the fitness cache
+        # before they are evaluated, 0 to compare them by their programs only
+        self.probeRows = state.parameters.getIntWithDefault(base.push(self.PROBE_ROWS_P), def_param.push(self.PROBE_ROWS_P), 0)
+        if self.probeRows < 0:
+            state.output.fatal(f"The number of probe rows must be >= 0: {base.push(self.PROBE_ROWS_P)} or {def_param.push(self.PROBE_ROWS_P)}")
+        if 0 < self.probeRows < self.MIN_PROBE_ROWS:
+            state.output.warning(f"With {self.probeRows} probe rows, programs with other outputs on the other rows are "
+                                 f"likely to take the same fitness, at least {self.MIN_PROBE_ROWS} are recommended: "
+                                 f"{base.push(self.PROBE_ROWS_P)}")
+
+    def precisionType(self, parameters:ParameterDatabase, base:Parameter):
+        '''the floating point type of the precision parameter (float64 by default), or None if it is not one of PRECISIONS'''
+        def_param = Parameter(self.PROBLEM_P)
+        precision = parameters.getString(base.push(self.PRECISION_P), def_param.push(self.PRECISION_P))
+        return self.PRECISIONS.get(precision if precision is not None else "float64")
+
     def setProblem(self, state:EvolutionState, loca:str, datan:str, fitn:str, istraining:bool):
         self.location = loca
         self.dataname = datan
         self.istraining = istraining
 
-        sep = os.sep  # Use the OS-specific path separator, like '\\' for Windows or '/' for Unix-like systems
-        if not self.location.endswith(sep):
-            self.location += sep
-        dataname_address = f"{self.dataname}{sep}" if not self.dataname.endswith(sep) else ""
-
-        suffix = "train" if self.istraining else "test"
-        filename_X = f"{self.location}{dataname_address}{self.dataname}_X_{suffix}_F{self.foldindex}.txt"
-        filename_y = f"{self.location}{dataname_address}{self.dataname}_y_{suffix}_F{self.foldindex}.txt"
+        if not self.location.endswith(os.sep):
+            self.location += os.sep
+        filename_X, filename_y = self.datasetFiles(self.location, self.dataname, self.istraining)
 
         print(f"evaluating on X: {filename_X}, Y: {filename_y}")
 
@@ -177,14 +328,9 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         self.dataname = datan
         self.istraining = istraining
 
-        sep = os.sep  # Use the OS-specific path separator, like '\\' for Windows or '/' for Unix-like systems
-        if not self.location.endswith(sep):
-            self.location += sep
-        dataname_address = f"{self.dataname}{sep}" if not self.dataname.endswith(sep) else ""
-
-        suffix = "train" if self.istraining else "test"
-        filename_X = f"{self.location}{dataname_address}{self.dataname}_X_{suffix}_F{self.foldindex}.txt"
-        filename_y = f"{self.location}{dataname_address}{self.dataname}_y_{suffix}_F{self.foldindex}.txt"
+        if not self.location.endswith(os.sep):
+            self.location += os.sep
+        filename_X, filename_y = self.datasetFiles(self.location, self.dataname, self.istraining)
 
         print(f"evaluating on X: {filename_X}, Y: {filename_y}")
 
@@ -203,34 +349,76 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         if self.istraining and state is not None and self.doValidation:
             self.split_validation(state)
     
+    def datasetFiles(self, loca:str, datan:str, istraining:bool) -> tuple[str, str]:
+        '''the paths of the input and the output file of a data set'''
+        sep = os.sep  # Use the OS-specific path separator, like '\\' for Windows or '/' for Unix-like systems
+        if not loca.endswith(sep):
+            loca += sep
+        dataname_address = f"{datan}{sep}" if not datan.endswith(sep) else ""
+
+        suffix = "train" if istraining else "test"
+        filename_X = f"{loca}{dataname_address}{datan}_X_{suffix}_F{self.foldindex}.txt"
+        filename_y = f"{loca}{dataname_address}{datan}_y_{suffix}_F{self.foldindex}.txt"
+        return filename_X, filename_y
+
+    def preloadData(self, parameters:ParameterDatabase, base:Parameter):
+        def_param = Parameter(self.PROBLEM_P)
+        location = parameters.getString(base.push(self.LOCATION_P), def_param.push(self.LOCATION_P))
+        dataname = parameters.getString(base.push(self.DATA_NAME_P), def_param.push(self.DATA_NAME_P))
+        if not location or not dataname:
+            return
+        self.dtype = self.precisionType(parameters, base)
+        if self.dtype is None:
+            # the setup of the runs reports the invalid precision
+            return
+        self.foldindex = parameters.getIntWithDefault(base.push(self.KFOLDINDEX_P), def_param.push(self.KFOLDINDEX_P), 0)
+
+        filename_X, filename_y = self.datasetFiles(location, dataname, True)
+        if os.path.exists(filename_X) and os.path.exists(filename_y):
+            self.read_X_file(filename_X)
+            self.read_y_file(filename_y)
+
     def read_X_file(self, filepath):
+        # the data files are parsed once per process, and the parsed arrays are shared by all the problems
+        self.datanum, self.datadim, self.data, data_max, data_min = cachedDataset(filepath, self.dtype, self.parse_X_file)
+        self.data_max = list(data_max)
+        self.data_min = list(data_min)
+
+    def read_y_file(self, filepath):
+        self.outputnum, self.outputdim, self.data_output = cachedDataset(filepath, float, self.parse_y_file)
+
+    def parse_X_file(self, filepath):
         with open(filepath, 'r') as f:
             lines = f.readlines()
 
         header = lines[0].strip().split()
-        self.datanum, self.datadim = int(header[0]), int(header[1])
-        self.data = []
-        self.data_max = [-1e7] * self.datadim
-        self.data_min = [1e7] * self.datadim
+        datanum, datadim = int(header[0]), int(header[1])
+        data = []
+        data_max = [-1e7] * datadim
+        data_min = [1e7] * datadim
 
-        for line in lines[1:self.datanum+1]:
+        for line in lines[1:datanum+1]:
             instance = list(map(float, line.strip().split()))
-            for i in range(self.datadim):
-                self.data_max[i] = max(self.data_max[i], instance[i])
-                self.data_min[i] = min(self.data_min[i], instance[i])
-            self.data.append(instance)
+            for i in range(datadim):
+                data_max[i] = max(data_max[i], instance[i])
+                data_min[i] = min(data_min[i], instance[i])
+            data.append(instance)
 
-        self.data = np.array(self.data, dtype=float)
+        data = np.array(data, dtype=self.dtype)
+        data.setflags(write=False)
+        return datanum, datadim, data, data_max, data_min
 
-    def read_y_file(self, filepath):
+    def parse_y_file(self, filepath):
         with open(filepath, 'r') as f:
             lines = f.readlines()
 
         header = lines[0].strip().split()
-        self.outputnum, self.outputdim = int(header[0]), int(header[1])
-        self.data_output = [list(map(float, line.strip().split())) for line in lines[1:self.outputnum+1]]
+        outputnum, outputdim = int(header[0]), int(header[1])
+        data_output = [list(map(float, line.strip().split())) for line in lines[1:outputnum+1]]
 
-        self.data_output = np.array(self.data_output, dtype=float)
+        data_output = np.array(data_output, dtype=float)
+        data_output.setflags(write=False)
+        return outputnum, outputdim, data_output
 
     def split_validation(self, state: EvolutionState):
         self.validate_data = []
@@ -282,15 +470,37 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         #                 for col, mean in zip(zip(*self.data_output), self.out_mean)]
         
 
-        self.norm_mean = self.data.mean(axis=0)             
-        self.norm_std = self.data.std(axis=0, ddof=0)      
-
-        safe_std = np.where(self.norm_std > 0, self.norm_std, 1.0)
-        self.normdata = ((self.data - self.norm_mean) / safe_std)
+        # the statistics are always computed in float64, even if the data are stored in float32
+        self.norm_mean = self.data.mean(axis=0, dtype=np.float64)
+        self.norm_std = self.data.std(axis=0, ddof=0, dtype=np.float64)
+        self.norm_scale = np.where(self.norm_std > 0, self.norm_std, 1.0)
+
+        # the problems of the runs in one process normalize the same cached data into the same array, so that
+        # their programs can be executed together (see evaluateRuns)
+        key = ("normalized", id(self.data), np.dtype(self.dtype).str)
+        with _datasetLock:
+            cached = _datasets.get(key) if not self.data.flags.writeable else None
+            if cached is not None and cached[0] is self.data:
+                _datasets.move_to_end(key)
+                self.normdata = cached[1]
+            else:
+                self.normdata = self.normalizeRows(self.data)
+                if not self.data.flags.writeable:
+                    self.normdata.setflags(write=False)
+                    _cacheDataset(key, (self.data, self.normdata))
 
         self.out_mean = self.data_output.mean(axis=0)
         self.out_std = self.data_output.std(axis=0, ddof=0)
 
+    def normalizeRows(self, X:np.ndarray) -> np.ndarray:
+        '''the rows of X scaled by the statistics of the training data'''
+        return ((X - self.norm_mean) / self.norm_scale).astype(self.dtype, copy=False)
+
+    def denormalizeOutputs(self, predict:np.ndarray) -> np.ndarray:
+        '''the normalized predictions, shape (rows, target_num), in the scale of the targets'''
+        indices = np.array([self.targets[od] for od in range(self.target_num)])
+        return predict * self.out_std[indices] + self.out_mean[indices]
+
     def getRMSE(self, real, predict):
         # res = math.sqrt(sum((r - p) ** 2 for r, p in zip(real, predict)) / len(real))
         res = root_mean_squared_error(real, predict)
@@ -332,6 +542,9 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         res = sum(1 for r, p in zip(real, predict) if round(p) != r)
         return res / len(real)
 
+    def setX(self, X:np.ndarray):
+        super().setX(None if X is None else np.asarray(X, dtype=self.dtype))
+
     def getDatanum(self): return self.datanum
     def getDatadim(self): return self.datadim
     def getOutputnum(self): return self.outputnum
@@ -357,11 +570,6 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
             if self.data is None or self.data_output is None:
                 raise RuntimeError("we have an empty data source")
 
-            # hits = 0
-            result = 0
-            normwrap = 0
-            real = self.data_output
-
             # predict = []
             # for y in range(self.datanum):
             #     tmp = GPData()
@@ -372,62 +580,474 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
             #     pred = ind.execute(state, threadnum, tmp, ind, self, False)
             #     predict.append(pred)
 
-            tmp = GPData()
-            tmp.to_vectorize = True
-            tmp.values = np.zeros((self.datanum, 1))
-            self.X = self.normdata if self.normalized else self.data
             ind.preExecution(state, threadnum)
-            predict = ind.execute(state, threadnum, tmp, ind, self, False)
-            
-            predict = np.concatenate(predict, axis=1)
+            chunk = self.chunkRows(ind)
+            if chunk > 0:
+                self.streamFitness(state, ind, subpopulation, threadnum, chunk)
+                return
 
-            #convert "predict" as a list of 2d ndarray
-            if isinstance(predict, list) and isinstance(predict[0], list):
-                predict = np.array(predict)
+            self.X = self.normdata if self.normalized else self.data
+            predict = self.executeRows(ind, self.X)
+            if predict is None:
+                tmp = GPData()
+                tmp.to_vectorize = True
+                tmp.values = np.zeros((self.datanum, 1), dtype=self.dtype)
+                predict = ind.execute(state, threadnum, tmp, ind, self, False)
+
+                predict = np.concatenate(predict, axis=1, dtype=np.float64)
+
+            self.assignFitness(state, ind, predict, subpopulation, threadnum)
+
+    def chunkRows(self, ind:LGPIndividual4SR) -> int:
+        '''the number of rows per block when evaluating the individual chunk by chunk, or 0 to evaluate all rows at once'''
+        if not self.chunkSize or self.fitness not in self.STREAMABLE_FITNESS or ind.IsWrap():
+            # the wrapper fits its weights on the predictions of all rows
+            return 0
+        if self.chunkSize == self.C_AUTO:
+            slots = ind.getNumRegs() + 1  # registers and scratch
+            if getattr(ind, 'program', None) is not None:
+                slots += ind.program.numTemps
+            rows = max(self.MIN_CHUNK_ROWS, self.CHUNK_CACHE_BYTES // (slots * np.dtype(self.dtype).itemsize))
+        else:
+            rows = self.chunkSize
+        return rows if rows < self.datanum else 0
+
+    def streamFitness(self, state:EvolutionState, ind:LGPIndividual4SR, subpopulation:int, threadnum:int, chunk:int):
+        '''
+        execute the individual over blocks of `chunk` rows of the training data and merge the partial sums of the
+        fitness, so that the working set is bounded by the block size rather than by the data size.
+        '''
+        result = self.streamError(lambda X: self.predictBlock(state, ind, threadnum, X), chunk)
+        self.assignStreamedFitness(state, ind, result, subpopulation, threadnum)
+
+    def predictBlock(self, state:EvolutionState, ind:LGPIndividual4SR, threadnum:int, X:np.ndarray) -> np.ndarray:
+        '''the predictions of the individual on a block of rows of the training data, in float64'''
+        tmp = GPData()
+        tmp.to_vectorize = True
+        self.X = X
+        tmp.values = np.zeros((len(X), 1), dtype=self.dtype)
+        return np.concatenate(ind.execute(state, threadnum, tmp, ind, self, False), axis=1, dtype=np.float64)
 
-            mask = np.isnan(predict) | np.isinf(predict)
-            predict[mask] = 1e6
+    def assignStreamedFitness(self, state:EvolutionState, ind:LGPIndividual4SR, result:float, subpopulation:int, threadnum:int):
+        validate_res = self.validationevaluation(state, ind, subpopulation, threadnum)
+        ind.fitness.setFitness(state, result + 0.1 * validate_res)
+        ind.evaluated = True
 
-            if self.normalized:
-                indices = np.array([self.targets[od] for od in range(self.target_num)])
-                predict = predict * self.out_std[indices] + self.out_mean[indices]
+    def streamError(self, predictBlock, chunk:int) -> float:
+        '''the training error of the predictions `predictBlock(X)` of the blocks of `chunk` rows of the training data'''
+        data = self.normdata if self.normalized else self.data
 
-            if ind.IsWrap():
-                indices = np.array([self.targets[od] for od in range(self.target_num)])
-                real_care = real[:, indices]
+        sse = np.zeros(self.target_num)  # sum of squared errors
+        wrong = np.zeros(self.target_num)  # number of wrongly rounded predictions
+        for start in range(0, self.datanum, chunk):
+            self.accumulateBlock(predictBlock(data[start:start + chunk]), start, sse, wrong)
 
-                predict = ind.wrapper(predict, real_care, state, threadnum, self)
-                # normwrap = ind.getWeightNorm()
+        return self.streamedError(sse, wrong)
 
-            for od in range(self.target_num):
-                real_d = real[:, self.targets[od]] # convert the 2D array into 1D
-                predict_d = predict[:, od]
+    def accumulateBlock(self, predict:np.ndarray, start:int, sse:np.ndarray, wrong:np.ndarray):
+        '''add the partial sums of the predictions of the training rows from `start` on to sse and wrong'''
+        indices = np.array(self.targets[:self.target_num])
+        mask = np.isnan(predict) | np.isinf(predict)
+        predict[mask] = 1e6
+        if self.normalized:
+            predict = predict * self.out_std[indices] + self.out_mean[indices]
 
-                if self.fitness == "RMSE":
-                    result += self.getRMSE(real_d, predict_d) / self.target_num
-                elif self.fitness == "MSE":
-                    result += self.getMSE(real_d, predict_d) / self.target_num
-                elif self.fitness == "R2":
-                    result += self.getR2(real_d, predict_d) / self.target_num
-                elif self.fitness == "RSE":
-                    result += self.getRSE(real_d, predict_d) / self.target_num
-                elif self.fitness == "WRSE":
-                    result += self.getWRSE(real_d, predict_d, 1) / self.target_num
-                elif self.fitness == "ERR":
-                    result += self.getError(real_d, predict_d) / self.target_num
+        real_block = self.data_output[start:start + len(predict), indices]
+        sse += np.square(real_block - predict).sum(axis=0)
+        wrong += (np.round(predict) != real_block).sum(axis=0)
+
+    def streamedError(self, sse:np.ndarray, wrong:np.ndarray) -> float:
+        '''the training error from the sums of squared errors and of wrongly rounded predictions over all rows'''
+        indices = np.array(self.targets[:self.target_num])
+        real = self.data_output[:, indices]
+
+        def finite(res):
+            return 1e6 if math.isinf(res) or math.isnan(res) else res
+
+        result = 0
+        for od in range(self.target_num):
+            mse = sse[od] / self.datanum
+            if self.fitness in ["R2", "RSE"]:
+                # the total sum of squares only depends on the targets. Constant targets follow r2_score (force_finite)
+                sst = np.square(real[:, od] - real[:, od].mean()).sum()
+                if sst == 0:
+                    r2 = 1. if sse[od] == 0 else 0.
                 else:
-                    raise ValueError("unknown fitness objective " + self.fitness)
+                    r2 = finite(1. - sse[od] / sst)
 
-            validate_res = self.validationevaluation(state, ind, subpopulation, threadnum)
-            fitness_val = result + normwrap + 0.1 * validate_res
-            # f = ind.fitness
-            ind.fitness.setFitness(state, fitness_val)
-            ind.evaluated = True
+            if self.fitness == "RMSE":
+                result += finite(math.sqrt(mse)) / self.target_num
+            elif self.fitness == "MSE":
+                result += finite(mse) / self.target_num
+            elif self.fitness == "R2":
+                result += r2 / self.target_num
+            elif self.fitness == "RSE":
+                result += finite(1. - r2) / self.target_num
+            elif self.fitness == "ERR":
+                result += wrong[od] / self.datanum / self.target_num
+            else:
+                raise ValueError("unknown fitness objective " + self.fitness)
+
+        return result
+
+    @staticmethod
+    def tileErrors(tiled:list, threadnum:int) -> dict:
+        '''
+        the training errors of the individuals (problem, state, individual) that are evaluated chunk by chunk, whose
+        problems train on the same data, by individual id. The outer loop runs over tiles of rows and the inner loop
+        executes every individual on the tile, so that a tile is read from memory once for all the individuals
+        rather than once per individual. The tiles are as large as the smallest chunk of the individuals.
+        '''
+        if len(tiled) == 0:
+            return {}
+        problem = tiled[0][0]
+        data = problem.normdata if problem.normalized else problem.data
+        rows = min(p.chunkRows(ind) for p, _, ind in tiled)
+
+        sums = [(np.zeros(p.target_num), np.zeros(p.target_num)) for p, _, _ in tiled]
+        for start in range(0, problem.datanum, rows):
+            tile = data[start:start + rows]
+            for (p, state, ind), (sse, wrong) in zip(tiled, sums):
+                p.accumulateBlock(p.predictBlock(state, ind, threadnum, tile), start, sse, wrong)
+
+        return {id(ind): p.streamedError(sse, wrong) for (p, _, ind), (sse, wrong) in zip(tiled, sums)}
+
+    def evaluateBatch(self, state:EvolutionState, inds:list, subpopulation:int, threadnum:int):
+        if not self.batchEvaluation:
+            return super().evaluateBatch(state, inds, subpopulation, threadnum)
+        GPSymbolicRegression.evaluatePooled([(self, state, inds, subpopulation)], threadnum)
+
+    @staticmethod
+    def evaluateRuns(runs:list, threadnum:int):
+        # the runs training on the same data array execute their programs in one batch
+        pools = {}
+        for run in runs:
+            problem = run[0]
+            if not problem.batchEvaluation or problem.data is None:
+                problem.evaluateBatch(run[1], run[2], run[3], threadnum)
+                continue
+            X = problem.normdata if problem.normalized else problem.data
+            pools.setdefault(id(X), []).append(run)
+        for pool in pools.values():
+            GPSymbolicRegression.evaluatePooled(pool, threadnum)
+
+    @staticmethod
+    def evaluatePooled(runs:list, threadnum:int):
+        '''
+        evaluate the individuals of the runs (problem, state, individuals, subpopulation), whose problems train on
+        the same data. The individuals whose effective instructions are compiled into bytecode are executed all at once
+        '''
+        for problem, _, _, _ in runs:
+            if problem.data is None or problem.data_output is None:
+                raise RuntimeError("we have an empty data source")
+
+        batch = []
+        tiled = []
+        for problem, state, inds, _ in runs:
+            for ind in inds:
+                if ind.evaluated:
+                    continue
+                ind.preExecution(state, threadnum)
+                # the individuals evaluated chunk by chunk are evaluated tile by tile together
+                if problem.chunkRows(ind) > 0:
+                    tiled.append((problem, state, ind))
+                # the numba execution runs each program in one pass over the rows, so it is not batched
+                elif isinstance(ind, LGPIndividual) and ind.execution not in (ind.V_EXEC_TREE, ind.V_EXEC_NUMBA) \
+                        and ind.program is not None and ind.program.matches(problem):
+                    batch.append(ind)
+        errors = GPSymbolicRegression.tileErrors(tiled, threadnum)
+
+        predicts = {}
+        if len(batch) > 0:
+            problem = runs[0][0]
+            X = problem.normdata if problem.normalized else problem.data
+            for run in runs:
+                run[0].X = X
+            programs = [ind.program for ind in batch]
+            blocks = problem.rowBlocks(X)
+            if len(blocks) > 1:
+                # without the snapshots and the subexpression columns, see setupEvaluation
+                futures = [executor.submit(LGPBytecode.runBatch, programs, rows, LGPIndividual.INITIAL_VALUE)
+                           for executor, rows in zip(problem.getRowExecutors(), blocks)]
+                registers = np.concatenate([future.result() for future in futures], axis=2)
+            elif problem.snapshotStore is not None:
+                registers = problem.runResumed(batch, X)
+            else:
+                registers = LGPBytecode.runBatch(programs, X, LGPIndividual.INITIAL_VALUE, columns=problem.columnCache)
+            for ind, regs in zip(batch, registers):
+                predicts[id(ind)] = regs[ind.getOutputRegisters()].T
+
+        # assign the fitness in the order of the individuals, as the wrapper and the validation draw random numbers
+        for problem, state, inds, subpopulation in runs:
+            for ind in inds:
+                if id(ind) in predicts:
+                    problem.assignFitness(state, ind, predicts[id(ind)], subpopulation, threadnum)
+                elif id(ind) in errors:
+                    problem.assignStreamedFitness(state, ind, errors[id(ind)], subpopulation, threadnum)
+                else:
+                    problem.evaluate(state, ind, subpopulation, threadnum)
+
+    def runResumed(self, batch:list, X:np.ndarray) -> np.ndarray:
+        '''
+        execute the programs of the individuals by LGPBytecode.runBatch, each resuming from the registers saved during
+        the execution of its parent (see LGPIndividual.snapshots) just before its first changed instruction, and save
+        their own registers for their offspring
+        '''
+        resume = []
+        snapshots = []
+        for ind in batch:
+            code = ind.program.resolvedCode()
+            parent = ind.snapshots
+            resume.append(parent.resumePoint(ind.program, code, X) if parent is not None else None)
+            snapshots.append(Snapshots(code, X, ind.program.checkpoints(self.SNAPSHOT_CHECKPOINTS)))
+
+        registers = LGPBytecode.runBatch([ind.program for ind in batch], X, LGPIndividual.INITIAL_VALUE, resume, snapshots,
+                                         self.columnCache)
+        for ind, snapshot in zip(batch, snapshots):
+            ind.snapshots = snapshot
+            self.snapshotStore.add(snapshot)
+        return registers
+
+    def rowBlocks(self, X:np.ndarray) -> list[np.ndarray]:
+        '''
+        the slices of the rows of X that the row threads execute, at most one per row thread and of at least
+        MIN_THREAD_ROWS rows. The views are cached, so that every row thread keeps the transposed copy of its slice
+        '''
+        k = min(self.rowThreads, len(X) // self.MIN_THREAD_ROWS)
+        if k <= 1:
+            return [X]
+        cached = self.rowBlockCache.get(id(X))
+        if cached is None or cached[0] is not X or len(cached[1]) != k:
+            n = len(X)
+            cached = (X, [X[n * i // k:n * (i + 1) // k] for i in range(k)])
+            self.rowBlockCache[id(X)] = cached
+        return cached[1]
+
+    def getRowExecutors(self) -> list[ThreadPoolExecutor]:
+        '''one single-thread executor per row slice, so that a slice is always executed by the same thread'''
+        with self._rowLock:
+            while len(self.rowExecutors) < self.rowThreads:
+                self.rowExecutors.append(ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"row{len(self.rowExecutors)}"))
+        return self.rowExecutors
+
+    def executeRows(self, ind:LGPIndividual4SR, X:np.ndarray):
+        '''
+        execute the compiled program of the individual over slices of the rows of X in the row threads. NumPy and the
+        Numba register machine release the GIL in their loops, so one long program execution uses several cores.
+        return the predictions in float64, shape (n, outputs), or None if the individual is executed as usual
+        '''
+        if self.rowThreads <= 1 or not isinstance(ind, LGPIndividual) or ind.execution == ind.V_EXEC_TREE \
+                or ind.program is None or not ind.program.matches(self):
+            return None
+        blocks = self.rowBlocks(X)
+        if len(blocks) <= 1:
+            return None
+
+        program, outputs, execution = ind.program, ind.getOutputRegisters(), ind.execution
+        if execution == ind.V_EXEC_CODEGEN and ind.function is None:
+            ind.function = compileBytecode(program)
+        function = ind.function
+
+        def runSlice(rows):
+            registers = [LGPIndividual.INITIAL_VALUE] * program.numRegs
+            with np.errstate(all='ignore'):
+                if execution == LGPIndividual.V_EXEC_CODEGEN:
+                    function(registers, rows)
+                elif execution == LGPIndividual.V_EXEC_NUMBA:
+                    runNumba(program, registers, rows)
+                else:
+                    program.run(registers, rows)
+            # the registers are views of the register file of the row thread, so they are copied out here
+            return np.concatenate([registers[r] for r in outputs], axis=1, dtype=np.float64)
+
+        futures = [executor.submit(runSlice, rows) for executor, rows in zip(self.getRowExecutors(), blocks)]
+        return np.concatenate([future.result() for future in futures], axis=0)
+
+    def sharedArrays(self) -> dict:
+        names = ["data", "normdata", "data_output", "validate_data", "validate_data_output"]
+        return {name: getattr(self, name) for name in names if isinstance(getattr(self, name, None), np.ndarray)}
+
+    def threadCopy(self):
+        prob = super().threadCopy()
+        # the row threads and the views of the row slices belong to one evaluation thread, and the digest and the
+        # probe rows are computed again from the arrays of the copy
+        prob.rowExecutors = []
+        prob.rowBlockCache = {}
+        prob._dataDigest = None
+        prob._probe = None
+        return prob
+
+    def workerCopy(self):
+        prob = super().workerCopy()
+        prob.X = None
+        prob.snapshotStore = None
+        prob.columnCache = None
+        return prob
+
+    def evaluationReport(self) -> str:
+        return self.columnCache.report() if self.columnCache is not None else ""
+
+    def phenotypeKey(self, ind:LGPIndividual4SR):
+        # the task of a worker process holds everything that the fitness of the individual depends on
+        return self.remoteTask(ind)
+
+    def dataFingerprint(self):
+        arrays = [self.data, self.data_output]
+        if self.normalized:
+            arrays += [self.normdata, self.out_mean, self.out_std]
+        if self.doValidation:
+            arrays += [self.validate_data, self.validate_data_output]
+        if not all(isinstance(a, np.ndarray) for a in arrays):
+            return None
+
+        # the data are replaced rather than modified, so the digest is computed again only for new arrays
+        cached = self._dataDigest
+        if cached is None or len(cached[0]) != len(arrays) or any(a is not b for a, b in zip(cached[0], arrays)):
+            digest = hashlib.blake2b(digest_size=16)
+            for a in arrays:
+                digest.update(f"{a.shape}{a.dtype.str}".encode())
+                digest.update(np.ascontiguousarray(a).data)
+            cached = (arrays, digest.hexdigest())
+            self._dataDigest = cached
+        fingerprint = (cached[1], self.fitness, tuple(self.targets[:self.target_num]), self.normalized, self.doValidation)
+        # the semantics of the programs are their outputs on the probe rows, so they are only comparable (e.g., in the
+        # disk cache) with the same probe rows
+        return fingerprint + ((self.probeRows, self.PROBE_BITS) if self.probeRows > 0 else ())
+
+    def semanticKeys(self, individuals:list) -> list:
+        keys = [None] * len(individuals)
+        if self.probeRows <= 0 or not self.batchEvaluation:
+            return keys
+        # the wrapper draws random numbers, so the fitness of wrapped individuals is not given by their outputs
+        batch = [i for i, ind in enumerate(individuals) if isinstance(ind, LGPIndividual) and not ind.IsWrap()
+                 and ind.execution != ind.V_EXEC_TREE and ind.program is not None and ind.program.matches(self)]
+        if len(batch) == 0:
+            return keys
+
+        registers = LGPBytecode.runBatch([individuals[i].program for i in batch], self.probeData(), LGPIndividual.INITIAL_VALUE)
+        for i, regs in zip(batch, registers):
+            outputs = regs[individuals[i].getOutputRegisters()].astype(np.float64)
+            outputs[~np.isfinite(outputs)] = 1e6
+            # rounding the mantissas to PROBE_BITS bits, so that the programs only differing in the order of their
+            # operations (e.g., (a + b) + c and a + (b + c)) give the same summary
+            mantissa, exponent = np.frexp(outputs)
+            outputs = np.ldexp(np.round(np.ldexp(mantissa, self.PROBE_BITS)), exponent - self.PROBE_BITS)
+            keys[i] = (outputs.shape, (outputs + 0.).tobytes())
+        return keys
+
+    def probeData(self) -> np.ndarray:
+        '''the probe rows, evenly spread over the training rows (and the validation rows) that the fitness depends on'''
+        X = self.normdata if self.normalized else self.data
+        arrays = [X] + ([self.validate_data] if self.doValidation else [])
+        cached = self._probe
+        if cached is None or any(a is not b for a, b in zip(cached[0], arrays)):
+            rows = [np.asarray(a)[np.unique(np.linspace(0, len(a) - 1, min(self.probeRows, len(a))).astype(int))]
+                    for a in arrays if len(a) > 0]
+            cached = (arrays, np.ascontiguousarray(np.concatenate(rows).astype(X.dtype, copy=False)))
+            self._probe = cached
+        return cached[1]
+
+    def remoteTask(self, ind:LGPIndividual4SR):
+        # the wrapper draws random numbers from the evolution state, so wrapped individuals stay in the main process
+        if ind.evaluated or not isinstance(ind, LGPIndividual) or ind.execution == ind.V_EXEC_TREE or ind.IsWrap():
+            return None
+        if self.data is None or self.data_output is None:
+            raise RuntimeError("we have an empty data source")
+        ind.preExecution(None, 0)
+        if ind.program is None or not ind.program.matches(self):
+            return None
+        return (ind.program.key(), tuple(ind.getOutputRegisters()), ind.execution, self.chunkRows(ind))
+
+    def remoteFitness(self, task) -> float:
+        key, outputs, execution, chunk = task
+        program = LGPBytecode.fromKey(key)
+
+        def predictBlock(X):
+            registers = [LGPIndividual.INITIAL_VALUE] * program.numRegs
+            with np.errstate(all='ignore'):
+                if execution == LGPIndividual.V_EXEC_NUMBA:
+                    runNumba(program, registers, X)
+                else:
+                    program.run(registers, X)
+            return np.concatenate([registers[r] for r in outputs], axis=1, dtype=np.float64)
+
+        if chunk > 0:
+            result = self.streamError(predictBlock, chunk)
+        else:
+            result = self.predictionError(self.cleanPredictions(predictBlock(self.normdata if self.normalized else self.data)))
+
+        validate_res = self.validationError(predictBlock(self.validate_data)) if self.doValidation else 0.
+        return result + 0.1 * validate_res
+
+    def assignFitness(self, state:EvolutionState, ind:LGPIndividual4SR, predict:np.ndarray, subpopulation:int, threadnum:int):
+        '''compute the fitness of an individual based on its predictions on the training data, shape (datanum, target_num)'''
+        # hits = 0
+        normwrap = 0
+        real = self.data_output
+
+        predict = self.cleanPredictions(predict)
+
+        if ind.IsWrap():
+            indices = np.array([self.targets[od] for od in range(self.target_num)])
+            real_care = real[:, indices]
+
+            predict = ind.wrapper(predict, real_care, state, threadnum, self)
+            # normwrap = ind.getWeightNorm()
+
+        result = self.predictionError(predict)
+
+        validate_res = self.validationevaluation(state, ind, subpopulation, threadnum)
+        fitness_val = result + normwrap + 0.1 * validate_res
+        # f = ind.fitness
+        ind.fitness.setFitness(state, fitness_val)
+        ind.evaluated = True
+
+    def cleanPredictions(self, predict:np.ndarray) -> np.ndarray:
+        '''the predictions on the training data in float64 and in the scale of the targets, NaN and infinity replaced by 1e6'''
+        # the metrics are accumulated in float64
+        if isinstance(predict, np.ndarray) and predict.dtype != np.float64:
+            predict = predict.astype(np.float64)
+
+        #convert "predict" as a list of 2d ndarray
+        if isinstance(predict, list) and isinstance(predict[0], list):
+            predict = np.array(predict)
+
+        mask = np.isnan(predict) | np.isinf(predict)
+        predict[mask] = 1e6
+
+        if self.normalized:
+            predict = self.denormalizeOutputs(predict)
+
+        return predict
+
+    def predictionError(self, predict:np.ndarray) -> float:
+        '''the training error of the cleaned predictions, shape (datanum, target_num)'''
+        result = 0
+        real = self.data_output
+        for od in range(self.target_num):
+            real_d = real[:, self.targets[od]] # convert the 2D array into 1D
+            predict_d = predict[:, od]
+
+            if self.fitness == "RMSE":
+                result += self.getRMSE(real_d, predict_d) / self.target_num
+            elif self.fitness == "MSE":
+                result += self.getMSE(real_d, predict_d) / self.target_num
+            elif self.fitness == "R2":
+                result += self.getR2(real_d, predict_d) / self.target_num
+            elif self.fitness == "RSE":
+                result += self.getRSE(real_d, predict_d) / self.target_num
+            elif self.fitness == "WRSE":
+                result += self.getWRSE(real_d, predict_d, 1) / self.target_num
+            elif self.fitness == "ERR":
+                result += self.getError(real_d, predict_d) / self.target_num
+            else:
+                raise ValueError("unknown fitness objective " + self.fitness)
+
+        return result
 
     def validationevaluation(self, state:EvolutionState, ind:LGPIndividual4SR, subpopulation:int, threadnum:int):
         if not self.doValidation:
             return 0.
-        real = self.validate_data_output
         # predict = []
         # for y in range(self.validatenum):
         #     tmp = GPData()
@@ -438,12 +1058,18 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
 
         tmp = GPData()
         tmp.to_vectorize = True
-        tmp.values = np.zeros((self.datanum, 1))
+        tmp.values = np.zeros((len(self.validate_data), 1), dtype=self.dtype)
         self.X = self.validate_data
         # ind.preExecution(state, threadnum)
         predict = ind.execute(state, threadnum, tmp, ind, self, False)
         
-        predict = np.concatenate(predict, axis=1)
+        predict = np.concatenate(predict, axis=1, dtype=np.float64)
+
+        return self.validationError(predict)
+
+    def validationError(self, predict:np.ndarray) -> float:
+        '''the validation error of the predictions on the validation data, shape (validatenum, target_num)'''
+        real = self.validate_data_output
 
         #convert "predict" as a list of 2d ndarray
         if isinstance(predict, list) and isinstance(predict[0], list):
@@ -490,12 +1116,12 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
 
             tmp = GPData()
             tmp.to_vectorize = True
-            tmp.values = np.zeros((self.datanum, 1))
+            tmp.values = np.zeros((self.datanum, 1), dtype=self.dtype)
             self.X = self.normdata if self.normalized else self.data
             # ind.preExecution(None, 0)
             predict = ind.execute(None, 0, tmp, ind, self, False)
             
-            predict = np.concatenate(predict, axis=1)
+            predict = np.concatenate(predict, axis=1, dtype=np.float64)
 
             #convert "predict" as a list of 2d ndarray
             if isinstance(predict, list) and isinstance(predict[0], list):
@@ -530,9 +1156,12 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
             ind.evaluated = True
 
     def quickevaluate(self, ind:LGPIndividual4SR, X:np.ndarray=None):
-
+        '''
+        the predictions of the individual on the rows of X, or on the data of the problem if X is None, in the scale of
+        the targets (normalized problems denormalize them). The data of the problem are not replaced by X
+        '''
         if X is not None:
-            self.setX(X)
+            return self.predictRows(ind, X)
 
         if self.data is None:
             raise RuntimeError("we have an empty data source")
@@ -546,14 +1175,25 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         #     pred = ind.execute(None, 0, tmp, ind, self, True)
         #     predict.append(pred)
 
+        if self.normalized:
+            return self.predictRows(ind, self.normdata, scaled=True)
+        return self.predictRows(ind, self.data)
+
+    def predictRows(self, ind:LGPIndividual4SR, X:np.ndarray, scaled:bool=False) -> np.ndarray:
+        '''
+        the predictions of the individual (with its wrapper) on the rows of X, in the scale of the targets. The data of
+        the problem are not changed, normalized problems scale X by the statistics of their training data unless
+        the rows are already scaled
+        '''
+        X = np.asarray(X, dtype=self.dtype)
         tmp = GPData()
         tmp.to_vectorize = True
-        tmp.values = np.zeros((self.datanum, 1))
-        self.X = self.normdata if self.normalized else self.data
+        tmp.values = np.zeros((len(X), 1), dtype=self.dtype)
+        self.X = self.normalizeRows(X) if self.normalized and not scaled else X
         # ind.preExecution(None, 0)
         predict = ind.execute(None, 0, tmp, ind, self, True)
         
-        predict = np.concatenate(predict, axis=1)
+        predict = np.concatenate(predict, axis=1, dtype=np.float64)
 
         #convert "predict" as a list of 2d ndarray
         if isinstance(predict, list) and isinstance(predict[0], list):
@@ -562,6 +1202,9 @@ class GPSymbolicRegression(Problem, SupervisedProblem):
         mask = np.isnan(predict) | np.isinf(predict)
         predict[mask] = 1e6
 
+        if self.normalized:
+            predict[:, :self.target_num] = self.denormalizeOutputs(predict[:, :self.target_num])
+
         # res = []
         # for y in range(self.datanum):
         #     tmp = []
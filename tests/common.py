@@ -0,0 +1,164 @@
+'''the evolution state, the programs and the data shared by the tests'''
+
+from pathlib import Path
+import numpy as np
+
+from src.ec import Evolve
+from src.ec.gp_data import GPData
+from src.lgp.individual.lgp_individual import LGPIndividual
+from src.lgp.individual.primitive import *
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ARITHMETIC = [Add, Sub, Mul, Div, Min, Max, Sqrt]
+TRANSCENDENTAL = [Ln, Exp, Sin, Cos]
+UNARY = [Sqrt, Ln, Exp, Sin, Cos]
+
+# the inputs that the protected primitives have to handle like the tree interpreter does
+SPECIAL_VALUES = [np.nan, np.inf, -np.inf, 0., -0., 1e-300, -1e-300, 1e300, -1e300, 1e6, -1e6, 5e5, 20., -20.]
+
+# the constants of the random programs, including the identities of the simplifier and unbounded values
+CONSTANTS = [0., -0., 1., -1., 0.5, 2., 1e7, -1e7]
+
+
+def stateArguments(directory, extra=(), data="Airfoil") -> list[str]:
+    '''the command line of a short run on the first fold of a data set, which writes its statistics into directory'''
+    return ["-file", str(ROOT / "tasks/symbreg/parameters/LGP_test.params"),
+            f"-p SymbolicRegression.location={ROOT / 'tasks/symbreg/dataset'}/",
+            f"-p eval.problem.dataname={data}",
+            "-p generations=3", "-p pop.subpop.0.size=40",
+            f"-p stat.file=${directory}/out.stat", f"-p stat.child.0.file=${directory}/outtab.stat",
+            # the evaluation features (batches, caches, row threads) work on the compiled programs
+            f"-p pop.subpop.0.species.ind.execution={LGPIndividual.V_EXEC_BYTECODE}"] \
+        + [f"-p {e}" for e in extra]
+
+
+def makeState(directory, extra=(), data="Airfoil", fresh=True):
+    '''
+    an evolution state on the first fold of a data set, which writes its statistics into directory. It is started
+    fresh unless fresh is False (e.g., for a RunBatch, which starts its runs itself)
+    '''
+    args = stateArguments(directory, extra, data)
+    parameters = Evolve.loadParameterDatabase(args)
+    state = Evolve.initialize(parameters, 0)
+    state.job = [0]
+    state.runtimeArguments = args
+    state.output.message = lambda message: None
+    if fresh:
+        state.startFresh()
+    return state
+
+
+def specialData(rows, dims, seed=0, rate=0.2):
+    '''random data of the given shape, a fraction of whose values are replaced by SPECIAL_VALUES'''
+    rng = np.random.default_rng(seed)
+    X = rng.normal(scale=3., size=(rows, dims))
+    mask = rng.random((rows, dims)) < rate
+    X[mask] = rng.choice(SPECIAL_VALUES, size=int(mask.sum()))
+    return X
+
+
+def node(cls, *children):
+    '''a primitive with the given children'''
+    n = cls()
+    n.children = list(children)
+    for i, child in enumerate(children):
+        child.parent = n
+        child.argposition = i
+    return n
+
+
+def feature(index, dims):
+    return InputFeatureGPNode(index, dims)
+
+
+def constant(value):
+    return ConstantGPNode(value)
+
+
+def register(index, numRegs):
+    return ReadRegisterGPNode(index, numRegs)
+
+
+def individual(state, instructions, outputs=(0,)):
+    '''
+    an individual of the state made of the given instructions, as (destination register, expression) pairs, whose
+    output registers are outputs
+    '''
+    ind:LGPIndividual = state.population.subpops[0].individuals[0].clone()
+    prototype = state.population.subpops[0].species.instr_prototype
+    ind.treelist = []
+    for dst, expression in instructions:
+        tree = prototype.lightClone()
+        root = node(WriteRegisterGPNode, expression)
+        root.setIndex(dst)
+        root.setRange(ind.getNumRegs())
+        root.parent = tree
+        root.argposition = 0
+        tree.child = root
+        tree.owner = ind
+        ind.treelist.append(tree)
+    ind.setOutputRegisters(list(outputs))
+    ind.updateStatus()
+    ind.evaluated = False
+    return ind
+
+
+def randomInstructions(rng, length, numRegs, dims, primitives):
+    '''random instructions of at most two levels of the given primitives over registers, features and constants'''
+    def leaf():
+        kind = rng.integers(3)
+        if kind == 0:
+            return register(int(rng.integers(numRegs)), numRegs)
+        if kind == 1:
+            return feature(int(rng.integers(dims)), dims)
+        return constant(float(rng.choice(CONSTANTS)))
+
+    def expression(depth):
+        if depth == 0 or rng.random() < 0.2:
+            return leaf()
+        cls = primitives[rng.integers(len(primitives))]
+        arity = 1 if cls in UNARY else 2
+        return node(cls, *[expression(depth - 1) for _ in range(arity)])
+
+    return [(int(rng.integers(numRegs)), expression(2)) for _ in range(length)]
+
+
+def randomIndividuals(state, count, primitives, seed=0, length=12, outputs=(0, 1)):
+    '''random individuals of the state whose instructions are made of the given primitives'''
+    rng = np.random.default_rng(seed)
+    dims = state.evaluator.p_problem.datadim
+    numRegs = state.population.subpops[0].individuals[0].getNumRegs()
+    return [individual(state, randomInstructions(rng, length, numRegs, dims, primitives), outputs) for _ in range(count)]
+
+
+def randomProgram(state, seed, mutated=None, length=12):
+    '''
+    the compiled program of random instructions made from seed, with another instruction at the position mutated (e.g.,
+    to compare the offspring of a mutation with its parent). Every register is an output, so that the last instructions
+    are effective
+    '''
+    dims = state.evaluator.p_problem.datadim
+    numRegs = state.population.subpops[0].individuals[0].getNumRegs()
+    instructions = randomInstructions(np.random.default_rng(seed), length, numRegs, dims, ARITHMETIC + TRANSCENDENTAL)
+    if mutated is not None:
+        instructions[mutated] = randomInstructions(np.random.default_rng(seed + 1000), 1, numRegs, dims, ARITHMETIC)[0]
+    ind = individual(state, instructions, outputs=range(numRegs))
+    ind.execution = LGPIndividual.V_EXEC_BYTECODE
+    ind.preExecution(None, 0)
+    return ind.program
+
+
+def predict(state, ind, execution, X, simplify=True):
+    '''the outputs of the individual on the rows of X, shape (rows, outputs), executed in the given way'''
+    problem = state.evaluator.p_problem
+    ind.execution = execution
+    ind.simplify = simplify
+    ind.preevaluated = False
+    data = GPData()
+    data.to_vectorize = True
+    data.values = np.zeros((len(X), 1), dtype=X.dtype)
+    problem.X = X
+    outputs = ind.execute(state, 0, data, ind, problem, False)
+    return np.concatenate([np.broadcast_to(np.asarray(o, dtype=X.dtype).reshape(-1, 1), (len(X), 1)) for o in outputs],
+                          axis=1).copy()
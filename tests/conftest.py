@@ -0,0 +1,9 @@
+import pytest
+
+from tests.common import makeState
+
+
+@pytest.fixture(scope="session")
+def state(tmp_path_factory):
+    '''an evolution state on the Airfoil data, shared by the tests that do not evolve it'''
+    return makeState(tmp_path_factory.mktemp("state"))
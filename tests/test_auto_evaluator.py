@@ -0,0 +1,88 @@
+import pytest
+
+from src.ec.auto_evaluator import AutoEvaluator
+from tests.common import *
+
+
+def evaluator(problem, chunk):
+    auto = AutoEvaluator(problem)
+    auto.way = (AutoEvaluator.S_THREADS, 1, chunk)
+    return auto
+
+
+def test_chunk_sizes_with_the_same_row_blocks_are_benchmarked_once(state):
+    problem = state.evaluator.p_problem
+    groups = [(randomIndividuals(state, 10, ARITHMETIC, seed=11, outputs=(0,)), 0)]
+    # the automatic chunks hold all the rows of the small data
+    assert evaluator(problem, 0).chunkSizes(groups) == [0]
+    assert evaluator(problem, problem.C_AUTO).chunkSizes(groups) == [problem.C_AUTO]
+    assert evaluator(problem, 64).chunkSizes(groups) == [64, 0]
+
+
+def test_failed_calibration_restores_the_problem(state, monkeypatch):
+    problem = state.evaluator.p_problem
+    monkeypatch.setattr(problem, "chunkSize", 64)
+    monkeypatch.setattr(problem, "rowThreads", 3)
+    evaluateBatch = problem.evaluateBatch
+
+    def failing(state, inds, subpopulation, threadnum):
+        if problem.chunkSize == 0:
+            raise RuntimeError("the evaluation failed")
+        evaluateBatch(state, inds, subpopulation, threadnum)
+
+    monkeypatch.setattr(problem, "evaluateBatch", failing)
+    auto = evaluator(problem, 64)
+    with pytest.raises(RuntimeError):
+        auto.calibrate(state, [(randomIndividuals(state, 20, ARITHMETIC, seed=12, outputs=(0,)), 0)])
+    assert problem.chunkSize == 64 and problem.rowThreads == 3
+
+
+def test_calibration_benchmarks_every_way_on_its_own_slice(tmp_path, monkeypatch):
+    state = makeState(tmp_path, ["eval=src.ec.AutoEvaluator", "eval.max-workers=2", "evalthreads=2",
+                                 "seed.1=5", "eval.problem.chunk-size=64", "eval.problem.row-threads=1"])
+    auto = state.evaluator
+    problem = auto.p_problem
+    individuals = state.population.subpops[0].individuals
+    timings = []
+    timeWith = AutoEvaluator.timeWith
+
+    def timed(self, state, way, groups):
+        timings.append((way, [id(ind) for inds, _ in groups for ind in inds]))
+        if way[0] == self.S_PROCESSES:
+            # no worker processes in the tests, the slice is evaluated in the current process
+            self.evaluateWith(state, (self.S_THREADS, 1, way[2]), groups)
+            return 2.
+        timeWith(self, state, way, groups)
+        # the row threads are the fastest
+        return 1. if way[0] == self.S_ROWS else 2.
+
+    monkeypatch.setattr(AutoEvaluator, "timeWith", timed)
+    auto.evaluateIndividuals(state)
+
+    # the chunk sizes that split the rows into distinct blocks, then the ways with two workers
+    assert [way for way, _ in timings] == [(auto.S_THREADS, 1, 64), (auto.S_THREADS, 1, 0),
+                                           (auto.S_THREADS, 2, 64), (auto.S_PROCESSES, 2, 64), (auto.S_ROWS, 2, 64)]
+    # on distinct individuals, after the warm-up, and every individual is evaluated
+    ids = [i for _, slice in timings for i in slice]
+    assert all(ids) and len(ids) == len(set(ids)) and len(ids) <= len(individuals) - auto.WARMUP
+    assert all(ind.evaluated for ind in individuals)
+    # the fastest way is kept, and the problem is restored until the next evaluation sets it
+    assert auto.way == (auto.S_ROWS, 2, 64) and auto.calibrated == 0
+    assert problem.chunkSize == 64 and problem.rowThreads == 1
+
+    for ind in individuals:
+        ind.evaluated = False
+    state.generation = 1
+    auto.evaluateIndividuals(state)
+    assert len(timings) == 5 and auto.calibrated == 0
+    assert problem.rowThreads == 2 and all(ind.evaluated for ind in individuals)
+
+
+def test_too_few_individuals_are_not_calibrated(state):
+    problem = state.evaluator.p_problem
+    auto = evaluator(problem, 0)
+    auto.maxWorkers = 2
+    inds = randomIndividuals(state, auto.WARMUP + 1, ARITHMETIC, seed=13, outputs=(0,))
+    assert not auto.calibrate(state, [(inds, 0)])
+    # nothing is evaluated, the individuals are left to the current way
+    assert auto.way == (AutoEvaluator.S_THREADS, 1, 0) and not any(ind.evaluated for ind in inds)
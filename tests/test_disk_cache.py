@@ -0,0 +1,59 @@
+import multiprocessing
+import sqlite3
+
+from src.ec.disk_cache import DiskCache
+from src.ec.fitness import Fitness
+
+
+def fitness(value):
+    f = Fitness()
+    f.setFitness(None, value)
+    return f
+
+
+def entries(path):
+    with sqlite3.connect(path) as con:
+        return con.execute("SELECT COUNT(*) FROM fitness").fetchone()[0]
+
+
+def test_entries_over_the_size_are_evicted_periodically(tmp_path):
+    path = str(tmp_path / "fitness.db")
+    cache = DiskCache(path, 5)
+    for i in range(DiskCache.EVICTION_INTERVAL - 1):
+        cache.put("data", {("program", i): fitness(i)})
+    # the size is only checked every EVICTION_INTERVAL writes
+    assert entries(path) == DiskCache.EVICTION_INTERVAL - 1
+    cache.put("data", {("program", -1): fitness(-1)})
+    assert entries(path) == 5
+    assert cache.get("data", [("program", -1)])[("program", -1)].value == -1
+
+
+def writeAndRead(path, worker, workers, rounds, errors):
+    '''write the fitness of the programs of a worker in rounds, reading those of all the workers after each'''
+    try:
+        cache = DiskCache(path, 1000000)
+        for r in range(rounds):
+            cache.put("data", {(worker, r): fitness(worker * 1000 + r)})
+            found = cache.get("data", [(w, k) for w in range(workers) for k in range(r + 1)])
+            assert all(f.value == w * 1000 + k for (w, k), f in found.items())
+            assert all((worker, k) in found for k in range(r + 1))
+    except BaseException as e:
+        errors.put(repr(e))
+        raise
+
+
+def test_processes_share_the_file(tmp_path):
+    path = str(tmp_path / "fitness.db")
+    context = multiprocessing.get_context("fork")
+    errors = context.Queue()
+    workers, rounds = 2, 50
+    processes = [context.Process(target=writeAndRead, args=(path, w, workers, rounds, errors)) for w in range(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join(120)
+    assert errors.empty(), errors.get()
+    assert [p.exitcode for p in processes] == [0] * workers
+
+    found = DiskCache(path, 1000000).get("data", [(w, r) for w in range(workers) for r in range(rounds)])
+    assert {key: f.value for key, f in found.items()} == {(w, r): w * 1000 + r for w in range(workers) for r in range(rounds)}
@@ -0,0 +1,54 @@
+import pytest
+
+from tasks.symbreg.optimization.gp_symbolic_regression import GPSymbolicRegression
+from tests.common import *
+
+
+def test_threads_evaluate_their_own_chunks(tmp_path, monkeypatch):
+    state = makeState(tmp_path, ["evalthreads=2", "seed.1=5"])
+    evaluator = state.evaluator
+    individuals = state.population.subpops[0].individuals
+    # the first execution draws the input features of the initial individuals, so they are evaluated once before
+    evaluator.p_problem.evaluateBatch(state, individuals, 0, 0)
+    for ind in individuals:
+        ind.evaluated = False
+    expected = [ind.clone() for ind in individuals]
+    evaluator.p_problem.evaluateBatch(state, expected, 0, 0)
+
+    calls = []
+    evaluateBatch = GPSymbolicRegression.evaluateBatch
+
+    def countedBatch(problem, state, inds, subpopulation, threadnum):
+        calls.append((problem, threadnum, [id(ind) for ind in inds]))
+        evaluateBatch(problem, state, inds, subpopulation, threadnum)
+
+    monkeypatch.setattr(GPSymbolicRegression, "evaluateBatch", countedBatch)
+    evaluator.evaluatePopulation(state)
+
+    # every individual is evaluated once, by one of the threads, on its own copy of the problem
+    assert sorted(threadnum for _, threadnum, _ in calls) == [0, 1]
+    assert sorted(i for _, _, ids in calls for i in ids) == sorted(id(ind) for ind in individuals)
+    assert all(problem is not evaluator.p_problem for problem, _, _ in calls)
+    assert [ind.fitness.fitness() for ind in individuals] == [ind.fitness.fitness() for ind in expected]
+
+
+def test_thread_copies_share_the_data_only(tmp_path, monkeypatch):
+    state = makeState(tmp_path, ["eval.problem.row-threads=2"])
+    problem = state.evaluator.p_problem
+    monkeypatch.setattr(problem, "MIN_THREAD_ROWS", 100)
+    problem.rowBlocks(problem.data)
+    problem.getRowExecutors()
+    problem.dataFingerprint()
+
+    prob = problem.threadCopy()
+    assert prob.data is problem.data and prob.data_output is problem.data_output
+    assert prob.rowBlockCache == {} and problem.rowBlockCache != {}
+    assert prob.getRowExecutors() is not problem.rowExecutors
+    assert not set(prob.rowExecutors) & set(problem.rowExecutors)
+    assert prob.dataFingerprint() == problem.dataFingerprint()
+
+
+def test_breeding_threads_require_a_cloned_problem(tmp_path):
+    with pytest.raises(SystemExit, match="not cloning its Problem"):
+        makeState(tmp_path, ["breedthreads=2", "seed.1=5"])
+    makeState(tmp_path, ["breedthreads=2", "seed.1=5", "eval.clone-problem=true"])
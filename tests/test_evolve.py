@@ -0,0 +1,25 @@
+import sys
+
+from src.ec import Evolve
+from tests.common import *
+
+
+def test_job_parameters_suffix_the_statistics_files_only(tmp_path):
+    parameters = Evolve.loadParameterDatabase(stateArguments(tmp_path, ["stat.silent.file=true"]))
+    params = Evolve.jobParameters(parameters, 3).params
+    assert params["stat.file"] == f"${tmp_path}/out.job3.stat"
+    assert params["stat.child.0.file"] == f"${tmp_path}/outtab.job3.stat"
+    # the switch to silence the statistics file is not a file name
+    assert params["stat.silent.file"] == "true"
+    assert params["stat.child.0.silent.file"] == "false"
+
+
+def test_parallel_jobs_write_their_own_statistics(tmp_path, monkeypatch):
+    args = stateArguments(tmp_path, ["jobs=2", "parallel-jobs=2", "stat.child.0.silent.file=true"])
+    monkeypatch.setattr(sys, "argv", ["evolve"] + args)
+    Evolve.main()
+    for job in range(2):
+        assert (tmp_path / f"out.job{job}.stat").stat().st_size > 0
+    # the silenced statistics stay silent
+    assert not list(tmp_path.glob("outtab*"))
+    assert not list(tmp_path.glob("true*")) and not list(tmp_path.glob("false*"))
@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+from src.ec.disk_cache import DiskCache
+from src.ec.fitness import Fitness
+from src.ec.fitness_cache import FitnessCache
+
+
+class KeyProblem:
+    '''the phenotype of an individual is its key attribute, the fitness its value attribute'''
+
+    def __init__(self):
+        self.fingerprint = "data"
+        self.evaluated = []
+
+    def dataFingerprint(self):
+        return self.fingerprint
+
+    def phenotypeKey(self, ind):
+        return ind.key
+
+    def semanticKeys(self, inds):
+        return [None] * len(inds)
+
+    def evaluate(self, inds):
+        for ind in inds:
+            if ind.evaluated:
+                continue
+            self.evaluated.append(ind.key)
+            ind.fitness.setFitness(None, ind.value)
+            ind.evaluated = True
+
+
+class TrialFitness(Fitness):
+    '''a fitness with more state than its value'''
+
+    def __init__(self):
+        super().__init__()
+        self.trials = []
+
+
+def individuals(*keys, fitness=Fitness):
+    return [SimpleNamespace(key=key, value=float(len(key)) if key is not None else 0., fitness=fitness(), evaluated=False)
+            for key in keys]
+
+
+def evaluate(cache, problem, inds):
+    pending, copies = cache.lookup(problem, inds)
+    # as the evaluator, which evaluates the unevaluated individuals of the population
+    problem.evaluate(inds)
+    cache.store(pending, copies)
+
+
+def test_phenotypes_are_evaluated_once():
+    problem = KeyProblem()
+    cache = FitnessCache(10)
+    inds = individuals("a", "bb", "a", None, "a")
+    evaluate(cache, problem, inds)
+    # the individuals without a phenotype are evaluated, the copies take the fitness of the first of theirs
+    assert problem.evaluated == ["a", "bb", None]
+    assert [ind.fitness.value for ind in inds] == [1., 2., 1., 0., 1.]
+    assert all(ind.evaluated for ind in inds)
+    assert inds[2].fitness is not inds[0].fitness
+    assert (cache.hits, cache.lookups) == (2, 4)
+
+    again = individuals("bb", "a")
+    evaluate(cache, problem, again)
+    assert problem.evaluated == ["a", "bb", None]
+    assert [ind.fitness.value for ind in again] == [2., 1.]
+    assert (cache.hits, cache.lookups) == (4, 6)
+
+
+def test_least_recently_used_phenotypes_are_evicted():
+    problem = KeyProblem()
+    cache = FitnessCache(2)
+    evaluate(cache, problem, individuals("a", "bb"))
+    evaluate(cache, problem, individuals("a"))
+    evaluate(cache, problem, individuals("ccc"))
+    assert list(cache.entries) == ["a", "ccc"]
+    evaluate(cache, problem, individuals("bb", "a"))
+    assert problem.evaluated == ["a", "bb", "ccc", "bb"]
+
+
+def test_new_data_invalidate_the_cache():
+    problem = KeyProblem()
+    cache = FitnessCache(10)
+    evaluate(cache, problem, individuals("a"))
+    problem.fingerprint = "other data"
+    evaluate(cache, problem, individuals("a"))
+    assert problem.evaluated == ["a", "a"]
+    # without a fingerprint the fitness is not cached
+    problem.fingerprint = None
+    evaluate(cache, problem, individuals("a", "a"))
+    assert problem.evaluated == ["a", "a", "a", "a"]
+
+
+def test_disk_cache_keeps_the_whole_fitness(tmp_path):
+    problem = KeyProblem()
+    path = str(tmp_path / "fitness.db")
+    inds = individuals("a", "bb", fitness=TrialFitness)
+    for ind in inds:
+        ind.fitness.trials = [ind.key]
+    evaluate(FitnessCache(10, DiskCache(path, 100)), problem, inds)
+
+    # another run on the same data reads them from the file
+    cache = FitnessCache(10, DiskCache(path, 100))
+    again = individuals("bb", "a", "ccc", fitness=TrialFitness)
+    evaluate(cache, problem, again)
+    assert problem.evaluated == ["a", "bb", "ccc"]
+    assert [(ind.fitness.value, ind.fitness.trials) for ind in again[:2]] == [(2., ["bb"]), (1., ["a"])]
+    assert cache.diskHits == 2
+
+    problem.fingerprint = "other data"
+    evaluate(FitnessCache(10, DiskCache(path, 100)), problem, individuals("a"))
+    assert problem.evaluated == ["a", "bb", "ccc", "a"]
+
+
+class SemanticProblem(KeyProblem):
+    '''the semantics of an individual is its sem attribute'''
+
+    def semanticKeys(self, inds):
+        return [ind.sem for ind in inds]
+
+
+def test_fitness_taken_by_semantics_is_not_cached_by_phenotype(tmp_path):
+    problem = SemanticProblem()
+    cache = FitnessCache(10, DiskCache(str(tmp_path / "fitness.db"), 100))
+    inds = individuals("a", "bb", "ccc")
+    for ind, sem in zip(inds, ["s", "s", "t"]):
+        ind.sem = sem
+    evaluate(cache, problem, inds)
+    # the second individual takes the fitness of the first one with the same semantics
+    assert problem.evaluated == ["a", "ccc"]
+    assert [ind.fitness.value for ind in inds] == [1., 1., 3.]
+    assert cache.probeHits == 1
+    assert list(cache.entries) == ["a", "ccc"]
+    assert set(cache.disk.get(problem.fingerprint, ["a", "bb", "ccc"])) == {"a", "ccc"}
+
+    # the phenotype is still evaluated for real when its semantics is gone
+    again = individuals("bb")
+    again[0].sem = None
+    evaluate(cache, problem, again)
+    assert problem.evaluated == ["a", "ccc", "bb"]
+    assert again[0].fitness.value == 2.
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+from tasks.symbreg.optimization import gp_symbolic_regression as sr
+from tests.common import *
+
+
+def test_dataset_cache_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(sr, "_datasets", type(sr._datasets)())
+    monkeypatch.setattr(sr, "DATASET_CACHE_SIZE", 2)
+    parsed = []
+
+    def parse(filepath):
+        parsed.append(filepath)
+        data = np.zeros(3)
+        data.setflags(write=False)
+        return data
+
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"data{i}.txt"))
+        open(paths[-1], "w").close()
+    for path in [paths[0], paths[1], paths[0], paths[2], paths[0], paths[1]]:
+        assert not sr.cachedDataset(path, np.float64, parse).flags.writeable
+    # the third file drops the second, the least recently used one
+    assert parsed == [paths[0], paths[1], paths[2], paths[1]]
+    assert len(sr._datasets) == 2
+
+
+@pytest.mark.parametrize("memory, cache", [
+    ("snapshot-memory", "snapshotStore"),
+    ("subexpression-memory", "columnCache"),
+])
+def test_evolution_with_memory_matches_plain_evolution(tmp_path, memory, cache):
+    fitness = []
+    for extra in [[], [f"eval.problem.{memory}=64"]]:
+        directory = tmp_path / str(len(fitness))
+        directory.mkdir()
+        state = makeState(directory, extra)
+        state.run()
+        fitness.append([ind.fitness.value for ind in state.population.subpops[0].individuals])
+    assert getattr(state.evaluator.p_problem, cache).size > 0
+    assert fitness[0] == fitness[1]
+
+
+@pytest.mark.parametrize("memory", ["snapshot-memory", "subexpression-memory"])
+def test_memory_with_row_threads_gives_a_warning(tmp_path, capsys, memory):
+    makeState(tmp_path, [f"eval.problem.{memory}=64", "eval.problem.row-threads=2"])
+    assert "not used when the rows are split" in capsys.readouterr().err
+    makeState(tmp_path, [f"eval.problem.{memory}=64"])
+    makeState(tmp_path, ["eval.problem.row-threads=2"])
+    assert "not used when the rows are split" not in capsys.readouterr().err
+
+
+def test_evolution_in_single_precision(tmp_path):
+    single = makeState(tmp_path, ["eval.problem.precision=float32"])
+    assert single.evaluator.p_problem.data.dtype == np.float32
+    single.run()
+    individuals = single.population.subpops[0].individuals
+
+    # the fitness of the individuals in double precision
+    state = makeState(tmp_path)
+    clones = [ind.clone() for ind in individuals]
+    for ind in clones:
+        ind.evaluated = False
+    state.evaluator.p_problem.evaluateBatch(state, clones, 0, 0)
+    np.testing.assert_allclose([ind.fitness.fitness() for ind in individuals],
+                               [ind.fitness.fitness() for ind in clones], rtol=1e-5)
+
+
+def test_evolution_with_validation(tmp_path):
+    state = makeState(tmp_path, ["eval.problem.do-validation=true"])
+    problem = state.evaluator.p_problem
+    assert 0 < len(problem.validate_data) < problem.datanum
+    state.run()
+    assert all(ind.evaluated for ind in state.population.subpops[0].individuals)
+
+
+def test_probe_rows_are_part_of_the_data_fingerprint(state, monkeypatch):
+    problem = state.evaluator.p_problem
+    fingerprint = problem.dataFingerprint()
+    monkeypatch.setattr(problem, "probeRows", problem.MIN_PROBE_ROWS)
+    withProbes = problem.dataFingerprint()
+    monkeypatch.setattr(problem, "probeRows", 2 * problem.MIN_PROBE_ROWS)
+    assert len({fingerprint, withProbes, problem.dataFingerprint()}) == 3
+
+
+def test_few_probe_rows_give_a_warning(tmp_path, capsys):
+    makeState(tmp_path, ["eval.problem.probe-rows=4"])
+    assert "probe rows" in capsys.readouterr().err
+    makeState(tmp_path, ["eval.problem.probe-rows=16"])
+    assert "probe rows" not in capsys.readouterr().err
+
+
+def fitnessOf(state, individuals, batch):
+    '''the fitness of fresh clones of the individuals, evaluated one by one or in one batch'''
+    problem = state.evaluator.p_problem
+    clones = [ind.clone() for ind in individuals]
+    for ind in clones:
+        ind.evaluated = False
+    if batch:
+        problem.evaluateBatch(state, clones, 0, 0)
+    else:
+        for ind in clones:
+            problem.evaluate(state, ind, 0, 0)
+    return [ind.fitness.fitness() for ind in clones]
+
+
+@pytest.mark.parametrize("fitness", ["RMSE", "MSE", "R2"])
+def test_tiles_match_evaluation_of_all_rows(tmp_path, monkeypatch, fitness):
+    state = makeState(tmp_path, [f"eval.problem.fitness={fitness}"])
+    problem = state.evaluator.p_problem
+    individuals = randomIndividuals(state, 20, ARITHMETIC + TRANSCENDENTAL, seed=5, outputs=(0,))
+    expected = fitnessOf(state, individuals, batch=False)
+
+    # the individuals of a batch are evaluated tile by tile over several chunks
+    monkeypatch.setattr(problem, "chunkSize", 100)
+    assert problem.chunkRows(individuals[0]) == 100 < problem.datanum
+    np.testing.assert_allclose(fitnessOf(state, individuals, batch=True), expected, rtol=1e-10)
+    np.testing.assert_allclose(fitnessOf(state, individuals, batch=False), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize("fitness", ["RMSE", "MSE", "R2"])
+def test_row_threads_match_evaluation_of_all_rows(tmp_path, monkeypatch, fitness):
+    state = makeState(tmp_path, [f"eval.problem.fitness={fitness}"])
+    problem = state.evaluator.p_problem
+    individuals = randomIndividuals(state, 20, ARITHMETIC + TRANSCENDENTAL, seed=5, outputs=(0,))
+    expected = fitnessOf(state, individuals, batch=False)
+
+    # the programs are executed over slices of the rows in the row threads
+    monkeypatch.setattr(problem, "rowThreads", 3)
+    monkeypatch.setattr(problem, "MIN_THREAD_ROWS", 100)
+    assert len(problem.rowBlocks(problem.data)) == 3
+    np.testing.assert_allclose(fitnessOf(state, individuals, batch=False), expected, rtol=1e-10)
+    np.testing.assert_allclose(fitnessOf(state, individuals, batch=True), expected, rtol=1e-10)
@@ -0,0 +1,28 @@
+from src.ec import Evolve
+from src.ec.island_exchanger import IslandExchanger, encodeMigrant, decodeMigrant
+from tests.common import *
+
+
+def test_migrants_round_trip(tmp_path):
+    state = makeState(tmp_path)
+    state.run()
+    problem = state.evaluator.p_problem
+    migrants = state.population.subpops[0].individuals[:20]
+    template = state.population.subpops[0].individuals[-1]
+    for ind in migrants:
+        migrant = decodeMigrant(encodeMigrant(ind), template)
+        assert migrant.printTrees() == ind.printTrees()
+        assert migrant.evaluated and migrant.fitness.fitness() == ind.fitness.fitness()
+        # the receiving island evaluates the migrant the same
+        migrant.evaluated = False
+        problem.evaluate(state, migrant, 0, 0)
+        assert migrant.fitness.fitness() == ind.fitness.fitness()
+
+
+def test_island_parameters_suffix_the_statistics_files_only(tmp_path):
+    parameters = Evolve.loadParameterDatabase(stateArguments(tmp_path, ["stat.silent.file=true"]))
+    params = IslandExchanger.islandParameters(parameters, 1).params
+    assert params["stat.file"] == f"${tmp_path}/out.island1.stat"
+    assert params["stat.child.0.file"] == f"${tmp_path}/outtab.island1.stat"
+    assert params["stat.silent.file"] == "true"
+    assert params["stat.child.0.silent.file"] == "false"
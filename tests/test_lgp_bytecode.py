@@ -0,0 +1,266 @@
+import pickle
+import numpy as np
+import pytest
+
+from src.ec.gp_node import GPNode
+from src.lgp.individual.lgp_bytecode import LGPBytecode, ColumnCache
+from src.lgp.individual.lgp_individual import LGPIndividual
+from src.lgp.individual.primitive.kernels import OP_MOV, BOUND, NUM_BUILTIN_OPCODES, KERNELS, PRIMITIVE_KERNELS, \
+    registerKernel, getKernel, saturate, writable
+from tests.common import *
+
+TREE = LGPIndividual.V_EXEC_TREE
+BYTECODE = LGPIndividual.V_EXEC_BYTECODE
+INITIAL = LGPIndividual.INITIAL_VALUE
+
+
+@pytest.fixture(scope="module")
+def individuals(state):
+    return randomIndividuals(state, 60, ARITHMETIC + TRANSCENDENTAL, seed=1)
+
+
+@pytest.fixture(scope="module")
+def X(state):
+    return specialData(300, state.evaluator.p_problem.datadim, seed=2)
+
+
+def meanKernel(a, b, out=None, where=True, scratch=None):
+    '''(a + b) / 2, saturated at ±1e6'''
+    out = np.add(a, b, out=out, where=where)
+    out = np.multiply(out, 0.5, out=writable(out), where=where)
+    return saturate(out, out=out, where=where)
+
+
+class Mean(GPNode):
+    '''a user-defined primitive, which the backends only know by its registered kernel'''
+
+    def __str__(self):
+        return "mean"
+
+    def expectedChildren(self) -> int:
+        return 2
+
+    def eval(self, state, thread, input, individual, problem, argval=None):
+        self.children[0].eval(state, thread, input, individual, problem)
+        arg1 = input.value if not input.to_vectorize else input.values
+        self.children[1].eval(state, thread, input, individual, problem)
+        arg2 = input.value if not input.to_vectorize else input.values
+        result = meanKernel(np.float64(arg1), np.float64(arg2)) if not input.to_vectorize else meanKernel(arg1, arg2)
+        if not input.to_vectorize:
+            input.value = float(result)
+        else:
+            input.values = result
+
+
+@pytest.fixture
+def mean():
+    '''the kernel of Mean, registered for the test only'''
+    numKernels = len(KERNELS)
+    entry = registerKernel(Mean, meanKernel, bounded=True)
+    yield entry
+    del KERNELS[numKernels:]
+    del PRIMITIVE_KERNELS[Mean]
+
+
+def compiled(ind, simplify=True) -> LGPBytecode:
+    ind.execution = BYTECODE
+    ind.simplify = simplify
+    ind.preExecution(None, 0)
+    assert ind.program is not None
+    return ind.program
+
+
+@pytest.mark.parametrize("simplify", [False, True])
+@pytest.mark.parametrize("execution", [BYTECODE, LGPIndividual.V_EXEC_CODEGEN])
+def test_compiled_execution_matches_tree(state, individuals, X, simplify, execution):
+    for ind in individuals:
+        expected = predict(state, ind, TREE, X)
+        np.testing.assert_array_equal(predict(state, ind, execution, X, simplify), expected)
+        # the generated function was executed, not the tree interpreter
+        assert ind.program is not None and (execution == BYTECODE or ind.function is not None)
+
+
+@pytest.mark.parametrize("simplify", [False, True])
+@pytest.mark.parametrize("columns", [False, True])
+def test_batch_matches_tree(state, individuals, X, simplify, columns):
+    expected = [predict(state, ind, TREE, X) for ind in individuals]
+    cache = ColumnCache(1 << 24) if columns else None
+    # the second execution reads the columns cached by the first one
+    for _ in range(2):
+        registers = LGPBytecode.runBatch([compiled(ind, simplify) for ind in individuals], X, INITIAL, columns=cache)
+        for ind, regs, outputs in zip(individuals, registers, expected):
+            np.testing.assert_array_equal(regs[ind.getOutputRegisters()].T, outputs)
+    if cache is not None:
+        assert cache.hits > 0
+
+
+@pytest.mark.parametrize("execution", [BYTECODE, LGPIndividual.V_EXEC_CODEGEN])
+def test_compiled_execution_in_single_precision(state, individuals, X, execution):
+    with np.errstate(over='ignore'):
+        # the values beyond the range of float32 become infinite
+        X = X.astype(np.float32)
+    for ind in individuals:
+        actual = predict(state, ind, execution, X)
+        # the registers are kept in the precision of the data
+        assert all(np.asarray(r).dtype == np.float32 for r in ind.getRegisters() if isinstance(r, np.ndarray))
+        # the tree interpreter computes the constants in double precision, which promotes part of the program
+        np.testing.assert_allclose(actual, predict(state, ind, TREE, X), rtol=1e-5, atol=BOUND * np.finfo(np.float32).eps)
+
+
+def test_batch_in_single_precision(state, individuals, X):
+    with np.errstate(over='ignore'):
+        X = X.astype(np.float32)
+    registers = LGPBytecode.runBatch([compiled(ind) for ind in individuals], X, INITIAL)
+    assert registers.dtype == np.float32
+    for ind, regs in zip(individuals, registers):
+        np.testing.assert_array_equal(regs[ind.getOutputRegisters()].T, predict(state, ind, BYTECODE, X))
+
+
+def test_user_primitives_are_compiled_by_their_kernel(state, X, mean):
+    assert mean.opcode == NUM_BUILTIN_OPCODES and getKernel(Mean) is mean and KERNELS[mean.opcode] is mean
+    with pytest.raises(ValueError, match="already has a kernel"):
+        registerKernel(Mean, meanKernel)
+    with pytest.raises(ValueError, match="already taken"):
+        registerKernel(GPNode, meanKernel, opcode=mean.opcode)
+
+    individuals = randomIndividuals(state, 20, ARITHMETIC + TRANSCENDENTAL + [Mean], seed=7)
+    assert any(mean.opcode in [row[0] for row in compiled(ind).instrs] for ind in individuals)
+    for ind in individuals:
+        expected = predict(state, ind, TREE, X)
+        for execution in [BYTECODE, LGPIndividual.V_EXEC_CODEGEN]:
+            np.testing.assert_array_equal(predict(state, ind, execution, X), expected)
+            assert ind.program is not None
+        # the single-sample path applies the kernel to python floats
+        for x, row in zip(X[:20], expected):
+            registers = [INITIAL] * ind.getNumRegs()
+            compiled(ind).runScalar(registers, x)
+            np.testing.assert_allclose([registers[r] for r in ind.getOutputRegisters()], row, rtol=1e-12)
+
+
+def test_with_columns_reads_register_free_subexpressions(state):
+    dims = state.evaluator.p_problem.datadim
+    ind = individual(state, [(0, node(Add, node(Sin, feature(0, dims)), register(2, 8))),
+                             (0, node(Mul, register(0, 8), register(0, 8)))])
+    program = compiled(ind)
+    code, keys, where = program.withColumns(INITIAL)
+    # sin(x0) + initial is read from a column, only the product is computed
+    assert len(program) == 3 and len(keys) == 1
+    assert [row[0] for row in code] == [OP_MOV, program.instrs[-1][0]]
+    assert where == [0, 0, 1, 2]
+
+
+def test_outputs_survive_the_next_execution(state, individuals, X):
+    first = predict(state, individuals[0], BYTECODE, X)
+    data = GPData()
+    data.to_vectorize = True
+    data.values = np.zeros((len(X), 1))
+    state.evaluator.p_problem.X = X
+    outputs = individuals[0].execute(state, 0, data, individuals[0], state.evaluator.p_problem, False)
+    # the next program executed by the thread reuses its register file
+    individuals[1].execution = BYTECODE
+    individuals[1].execute(state, 0, data, individuals[1], state.evaluator.p_problem, False)
+    np.testing.assert_array_equal(np.concatenate(outputs, axis=1), first)
+    assert all(not isinstance(r, np.ndarray) for r in individuals[0].getRegisters())
+
+
+def test_tree_execution_is_the_default(tmp_path):
+    parameters = Evolve.loadParameterDatabase(stateArguments(tmp_path))
+    del parameters.params["pop.subpop.0.species.ind.execution"]
+    state = Evolve.initialize(parameters, 0)
+    state.output.message = lambda message: None
+    state.startFresh()
+    assert all(ind.execution == TREE and ind.program is None for ind in state.population.subpops[0].individuals)
+
+
+@pytest.mark.parametrize("execution", [TREE, BYTECODE, LGPIndividual.V_EXEC_CODEGEN])
+def test_input_rows_must_match_the_data(state, individuals, X, execution):
+    ind = individuals[0]
+    ind.execution = execution
+    ind.preevaluated = False
+    data = GPData()
+    data.to_vectorize = True
+    data.values = np.zeros((30, 1))
+    state.evaluator.p_problem.X = X
+    with pytest.raises(ValueError, match="rows"):
+        ind.execute(state, 0, data, ind, state.evaluator.p_problem, False)
+
+
+@pytest.mark.parametrize("expression", [
+    # x - x and x * 0 are NaN for infinite x
+    lambda dims: node(Sub, feature(0, dims), feature(0, dims)),
+    lambda dims: node(Mul, feature(0, dims), constant(0.)),
+    # the identities of unbounded operands still clip them
+    lambda dims: node(Add, feature(0, dims), constant(0.)),
+    lambda dims: node(Sub, feature(0, dims), constant(-0.)),
+    lambda dims: node(Mul, constant(1.), feature(0, dims)),
+    lambda dims: node(Max, feature(0, dims), feature(0, dims)),
+])
+def test_simplifier_keeps_operations_on_unbounded_operands(state, expression):
+    dims = state.evaluator.p_problem.datadim
+    X = np.array([[v] * dims for v in [np.nan, np.inf, -np.inf, 1e300, -1e300, -0., 2.]])
+    ind = individual(state, [(0, expression(dims))])
+    program = compiled(ind)
+    assert program.numSimplified == 0 and len(program) == 1 and program.instrs[0][0] != OP_MOV
+    np.testing.assert_array_equal(predict(state, ind, BYTECODE, X), predict(state, ind, TREE, X))
+
+
+@pytest.mark.parametrize("expression", [
+    lambda: node(Add, register(1, 8), constant(0.)),
+    lambda: node(Add, constant(-0.), register(1, 8)),
+    lambda: node(Sub, register(1, 8), constant(0.)),
+    lambda: node(Mul, register(1, 8), constant(1.)),
+    lambda: node(Min, register(1, 8), register(1, 8)),
+])
+def test_simplifier_drops_identities_of_bounded_operands(state, expression):
+    dims = state.evaluator.p_problem.datadim
+    X = specialData(50, dims, seed=3)
+    # the quotient is saturated, so the register is bounded
+    ind = individual(state, [(1, node(Div, feature(0, dims), feature(1, dims))), (0, expression())])
+    program = compiled(ind)
+    assert program.numSimplified == 1
+    assert [row[0] for row in program.instrs][1:] == [OP_MOV]
+    np.testing.assert_array_equal(predict(state, ind, BYTECODE, X), predict(state, ind, TREE, X))
+
+
+def test_simplifier_folds_constant_subexpressions(state):
+    dims = state.evaluator.p_problem.datadim
+    X = specialData(50, dims, seed=4)
+    ind = individual(state, [(0, node(Add, node(Div, constant(1.), constant(0.)), feature(2, dims))),
+                             (0, node(Mul, node(Exp, constant(20.)), register(0, 8)))])
+    program = compiled(ind)
+    assert program.numSimplified == 2 and len(program) == 2
+    np.testing.assert_array_equal(predict(state, ind, BYTECODE, X), predict(state, ind, TREE, X))
+
+
+def test_key_round_trip(individuals, X):
+    for ind in individuals:
+        program = compiled(ind)
+        key = pickle.loads(pickle.dumps(program.key()))
+        copy = LGPBytecode.fromKey(key)
+        assert copy.key() == program.key()
+        np.testing.assert_array_equal(LGPBytecode.runBatch([copy], X, INITIAL), LGPBytecode.runBatch([program], X, INITIAL))
+
+
+@pytest.mark.parametrize("mutated", [0, 6, 11])
+def test_columns_of_mutated_programs_match_execution_from_scratch(state, X, mutated):
+    parents = [randomProgram(state, seed) for seed in range(20)]
+    children = [randomProgram(state, seed, mutated) for seed in range(20)]
+    cache = ColumnCache(1 << 24)
+    LGPBytecode.runBatch(parents, X, INITIAL, columns=cache)
+    # the offspring read the columns of the subexpressions they share with their parents
+    registers = LGPBytecode.runBatch(children, X, INITIAL, columns=cache)
+    assert cache.hits > 0
+    np.testing.assert_array_equal(registers, LGPBytecode.runBatch(children, X, INITIAL))
+
+
+def test_columns_are_dropped_with_the_data(state, individuals, X):
+    programs = [compiled(ind) for ind in individuals]
+    cache = ColumnCache(1 << 24)
+    LGPBytecode.runBatch(programs, X, INITIAL, columns=cache)
+    size = len(cache.columns)
+    assert size > 0
+    # other data of the same shape, e.g., after the training data are replaced
+    Y = specialData(len(X), X.shape[1], seed=13)
+    np.testing.assert_array_equal(LGPBytecode.runBatch(programs, Y, INITIAL, columns=cache),
+                                  LGPBytecode.runBatch(programs, Y, INITIAL))
+    assert cache.X is Y and len(cache.columns) == size
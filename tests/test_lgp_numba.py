@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from src.lgp.individual.lgp_individual import LGPIndividual
+from src.lgp.individual.lgp_numba import NUMBA_AVAILABLE, BLOCK_ROWS
+from src.lgp.individual.primitive.kernels import BOUND
+from tests.common import *
+
+pytestmark = pytest.mark.skipif(not NUMBA_AVAILABLE, reason="Numba is not installed")
+
+TREE = LGPIndividual.V_EXEC_TREE
+BYTECODE = LGPIndividual.V_EXEC_BYTECODE
+NUMBA = LGPIndividual.V_EXEC_NUMBA
+
+
+def assertIdentical(actual, expected):
+    '''the same values, with the same signs of the zeros'''
+    np.testing.assert_array_equal(actual, expected)
+    numbers = ~np.isnan(expected)
+    np.testing.assert_array_equal(np.signbit(actual[numbers]), np.signbit(expected[numbers]))
+
+
+def assertClose(actual, expected, maxulp):
+    '''the same non-finite values, and finite values within maxulp units in the last place'''
+    finite = np.isfinite(expected)
+    np.testing.assert_array_equal(actual[~finite], expected[~finite])
+    np.testing.assert_array_max_ulp(actual[finite], expected[finite], maxulp)
+
+
+def test_arithmetic_programs_match_tree_exactly(state):
+    # more rows than a block of the compiled register machine, and a partial last block
+    X = specialData(2 * BLOCK_ROWS + 37, state.evaluator.p_problem.datadim, seed=5)
+    for ind in randomIndividuals(state, 60, ARITHMETIC, seed=6):
+        assertIdentical(predict(state, ind, NUMBA, X), predict(state, ind, TREE, X))
+
+
+def test_arithmetic_programs_in_single_precision(state):
+    X = specialData(2 * BLOCK_ROWS + 37, state.evaluator.p_problem.datadim, seed=5).astype(np.float32)
+    for ind in randomIndividuals(state, 60, ARITHMETIC, seed=6):
+        actual = predict(state, ind, NUMBA, X)
+        assertIdentical(actual, predict(state, ind, BYTECODE, X))
+        # the tree interpreter computes the constants in double precision, which promotes part of the program, so the
+        # results differ by the rounding of the values up to the saturation bound
+        np.testing.assert_allclose(actual, predict(state, ind, TREE, X), rtol=1e-5, atol=BOUND * np.finfo(np.float32).eps)
+
+
+@pytest.mark.parametrize("primitive", TRANSCENDENTAL)
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_transcendental_primitives_match_tree_within_ulps(state, primitive, dtype):
+    dims = state.evaluator.p_problem.datadim
+    X = specialData(2 * BLOCK_ROWS + 37, dims, seed=7, rate=0.4).astype(dtype)
+    ind = individual(state, [(0, node(primitive, feature(0, dims))),
+                             (1, node(primitive, node(Mul, feature(1, dims), feature(2, dims))))], outputs=(0, 1))
+    assertClose(predict(state, ind, NUMBA, X), predict(state, ind, TREE, X), maxulp=2)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from tasks.symbreg.lgp_regressor import LinearGP_Regressor
+from tests.common import *
+
+
+def regressor(state, ind) -> LinearGP_Regressor:
+    '''a regressor of the state that was trained into ind, without running the evolution'''
+    reg = LinearGP_Regressor.__new__(LinearGP_Regressor)
+    reg.state = state
+    reg.output_ind = ind
+    reg.compile_output_ind()
+    return reg
+
+
+@pytest.mark.parametrize("normalize", [False, True])
+def test_predict_row_matches_predict(tmp_path, normalize):
+    state = makeState(tmp_path, [f"eval.problem.normalize={str(normalize).lower()}"])
+    problem = state.evaluator.p_problem
+    assert problem.normalized == normalize
+    data = problem.data
+    X = np.concatenate([data[:20], specialData(10, problem.datadim, seed=3)])
+    for ind in randomIndividuals(state, 20, ARITHMETIC + TRANSCENDENTAL, seed=4, outputs=(0,)):
+        reg = regressor(state, ind)
+        rows = [reg.predict_row(x) for x in X]
+        one = [reg.predict_one(x) for x in X]
+        np.testing.assert_array_equal(np.array(rows)[:, 0], reg.predict(X))
+        np.testing.assert_array_equal(one, reg.predict(X))
+        # the predictions on the data of the problem are in the scale of the targets too
+        np.testing.assert_array_equal(problem.quickevaluate(reg.output_ind)[:, 0], reg.predict(data))
+        # the predictions do not replace the data of the problem
+        assert problem.data is data and problem.datanum == len(data)
@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from src.ec.process_evaluator import ProcessEvaluator
+from tasks.problem import Problem
+
+
+class Fitness:
+    def __init__(self):
+        self.value = None
+
+    def setFitness(self, state, value):
+        self.value = value
+
+
+class HalfRemoteProblem(Problem):
+    '''gives a task for every individual, but computes the fitness of the odd ones only in the workers'''
+
+    def __init__(self):
+        super().__init__()
+        self.local = []
+
+    def remoteTask(self, ind):
+        return ind.number
+
+    def remoteFitness(self, task):
+        return float(task) if task % 2 == 1 else None
+
+    def evaluate(self, state, ind, subpopulation, threadnum):
+        self.local.append(ind.number)
+        ind.fitness.setFitness(state, -float(ind.number))
+        ind.evaluated = True
+
+
+def test_tasks_without_remote_fitness_are_evaluated_locally():
+    problem = HalfRemoteProblem()
+    evaluator = ProcessEvaluator(problem)
+    individuals = [SimpleNamespace(number=i, fitness=Fitness(), evaluated=False) for i in range(10)]
+    try:
+        evaluator.startWorkers(None, 2)
+        evaluator.evaluateSubpopulation(None, individuals, 0, 2)
+    finally:
+        evaluator.closeWorkers()
+    assert all(ind.evaluated for ind in individuals)
+    assert [ind.fitness.value for ind in individuals] == [float(i) if i % 2 == 1 else -float(i) for i in range(10)]
+    assert sorted(problem.local) == [0, 2, 4, 6, 8]
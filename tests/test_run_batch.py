@@ -0,0 +1,26 @@
+from src.ec.run_batch import RunBatch
+from tests.common import *
+
+
+def test_batched_runs_match_independent_runs(tmp_path):
+    seeds = [4, 9]
+    independent = []
+    for seed in seeds:
+        directory = tmp_path / f"alone{seed}"
+        directory.mkdir()
+        state = makeState(directory, [f"seed.0={seed}"])
+        state.run()
+        independent.append(state)
+
+    batched = []
+    for seed in seeds:
+        directory = tmp_path / f"batch{seed}"
+        directory.mkdir()
+        batched.append(makeState(directory, [f"seed.0={seed}"], fresh=False))
+    RunBatch(batched).run()
+
+    for alone, batch in zip(independent, batched):
+        assert [ind.fitness.fitness() for ind in batch.population.subpops[0].individuals] == \
+               [ind.fitness.fitness() for ind in alone.population.subpops[0].individuals]
+        assert batch.statistics.best_of_run[0].fitness.fitness() == alone.statistics.best_of_run[0].fitness.fitness()
+    assert independent[0].statistics.best_of_run[0].fitness.fitness() != independent[1].statistics.best_of_run[0].fitness.fitness()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from src.lgp.individual.lgp_bytecode import LGPBytecode, Snapshots, SnapshotStore
+from src.lgp.individual.lgp_individual import LGPIndividual
+from tests.common import *
+
+INITIAL = LGPIndividual.INITIAL_VALUE
+LENGTH = 12
+CHECKPOINTS = 4
+
+
+def execute(program, X) -> Snapshots:
+    '''the snapshots of an execution of the program from the beginning'''
+    snapshots = Snapshots(program.resolvedCode(), X, program.checkpoints(CHECKPOINTS))
+    LGPBytecode.runBatch([program], X, INITIAL, snapshots=[snapshots])
+    return snapshots
+
+
+@pytest.mark.parametrize("mutated", [0, LENGTH // 2, LENGTH - 1])
+def test_offspring_resumed_from_their_parent_match_execution_from_scratch(state, mutated):
+    X = specialData(200, state.evaluator.p_problem.datadim, seed=8)
+    children = []
+    resume = []
+    for seed in range(20):
+        parent = execute(randomProgram(state, seed, length=LENGTH), X)
+        child = randomProgram(state, seed, mutated, LENGTH)
+        children.append(child)
+        resume.append(parent.resumePoint(child, child.resolvedCode(), X))
+    if mutated > 0:
+        assert any(r is not None and r[0] > 0 for r in resume)
+
+    expected = LGPBytecode.runBatch(children, X, INITIAL)
+    # resumed one by one, and together from their different positions
+    for child, r, e in zip(children, resume, expected):
+        np.testing.assert_array_equal(LGPBytecode.runBatch([child], X, INITIAL, [r])[0], e)
+    np.testing.assert_array_equal(LGPBytecode.runBatch(children, X, INITIAL, resume), expected)
+
+
+def test_new_data_are_executed_from_scratch(state):
+    X = specialData(200, state.evaluator.p_problem.datadim, seed=9)
+    parent = randomProgram(state, 1)
+    snapshots = execute(parent, X)
+    assert snapshots.resumePoint(parent, parent.resolvedCode(), X) is not None
+    # the identity of the data is compared, not their values
+    assert snapshots.resumePoint(parent, parent.resolvedCode(), X.copy()) is None
+
+
+def test_dropped_snapshots_are_not_resumed(state):
+    X = specialData(200, state.evaluator.p_problem.datadim, seed=10)
+    first = execute(randomProgram(state, 1), X)
+    second = execute(randomProgram(state, 2), X)
+    store = SnapshotStore(first.nbytes() + second.nbytes() - 1)
+    store.add(first)
+    store.add(second)
+    assert first.registers == {} and len(second.registers) > 0
+    parent = randomProgram(state, 1)
+    assert first.resumePoint(parent, parent.resolvedCode(), X) is None
@@ -0,0 +1,49 @@
+from tests.common import *
+
+STEADY = ["state=src.ec.SteadyStateEvolutionState",
+          "steady.deselector=src.lgp.individual.reproduce.TournamentSelection",
+          "steady.deselector.pick-worst=true", "steady.interval=15"]
+
+
+def steadyRun(directory, extra=()):
+    '''a steady-state run over 40 + 2 * 15 evaluations, and the number of evaluations at each call of the statistics'''
+    state = makeState(directory, STEADY + list(extra))
+    calls = []
+    post = state.statistics.postEvaluationStatistics
+
+    def postEvaluationStatistics(s):
+        calls.append(s.evaluations)
+        post(s)
+
+    state.statistics.postEvaluationStatistics = postEvaluationStatistics
+    state.run()
+    return state, calls
+
+
+def test_steady_state_spends_its_budget(tmp_path):
+    state, calls = steadyRun(tmp_path)
+    assert state.budget == 70 and state.evaluations == 70
+    # the statistics see a generation every steady.interval evaluations
+    assert calls == [40, 55, 70]
+    assert all(ind.evaluated for ind in state.population.subpops[0].individuals)
+
+
+def test_steady_state_offspring_use_the_fitness_cache(tmp_path):
+    fitness = []
+    for extra in [[], ["eval.cache-size=1000"]]:
+        directory = tmp_path / str(len(fitness))
+        directory.mkdir()
+        state, calls = steadyRun(directory, extra)
+        assert calls == [40, 55, 70]
+        fitness.append([ind.fitness.value for ind in state.population.subpops[0].individuals])
+    # the offspring are looked up too, not only the initial population, and the report counts those of the interval
+    cache = state.evaluator.fitnessCache
+    assert 1 < cache.generationLookups <= 15 and cache.hits > 0
+    assert fitness[0] == fitness[1]
+
+
+def test_steady_state_warns_about_other_evaluators(tmp_path, capsys):
+    makeState(tmp_path, STEADY + ["eval=src.ec.ProcessEvaluator"])
+    assert "only evaluates the initial population" in capsys.readouterr().err
+    makeState(tmp_path, STEADY)
+    assert "only evaluates the initial population" not in capsys.readouterr().err